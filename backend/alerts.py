@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from backend.user_store import UserStore
+
+# Tier assumed for a district that has never been notified: only an elevated tier alerts.
+BASELINE_TIER = "LOW"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    district TEXT PRIMARY KEY,
+    risk_tier TEXT NOT NULL,
+    probability REAL,
+    data_version TEXT,
+    notified_at TEXT NOT NULL
+)
+"""
+
+# One row per data version that some worker process has taken on; see ``AlertService._claim``.
+_RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_runs (
+    data_version TEXT PRIMARY KEY,
+    claimed_by TEXT NOT NULL,
+    claimed_at TEXT NOT NULL
+)
+"""
+
+
+class AlertSink:
+    """Destination for notification batches. ``send`` raises to signal a failed delivery."""
+
+    def send(self, notifications: list[dict]) -> None:
+        raise NotImplementedError
+
+
+class MemorySink(AlertSink):
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+
+    def send(self, notifications: list[dict]) -> None:
+        self.batches.append(list(notifications))
+
+
+class JsonlFileSink(AlertSink):
+    """Appends one JSON line per notification; a local stand-in for a queue."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, notifications: list[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in notifications)
+        with self._lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class WebhookSink(AlertSink):
+    """POSTs each batch as ``{"notifications": [...]}`` to a webhook or queue gateway."""
+
+    def __init__(self, url: str, timeout: float = 10.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, notifications: list[dict]) -> None:
+        body = json.dumps({"notifications": notifications}, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def sink_from_spec(spec: str | None, base_dir: Path) -> AlertSink | None:
+    """Build a sink from ``CLOUDBURST_ALERT_SINK``: ``memory``, ``file:<path>`` or an http(s) URL."""
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    if spec == "memory":
+        return MemorySink()
+    if spec.startswith("file:"):
+        path = Path(spec.removeprefix("file:"))
+        return JsonlFileSink(path if path.is_absolute() else base_dir / path)
+    if spec.startswith(("http://", "https://")):
+        return WebhookSink(spec)
+    raise ValueError(f"Unsupported alert sink '{spec}'. Use memory, file:<path> or an http(s) URL.")
+
+
+class AlertService:
+    """Notifies subscribed users when their district's risk tier changes.
+
+    Each run scores every subscribed district once (users only affect the fan-out), diffs the
+    tier against the last notified tier stored in ``alert_state`` and delivers notifications
+    to the sink in batches. A district's state is only advanced once all of its notifications
+    were delivered, so a failed batch is retried on the next snapshot.
+
+    Every API worker runs the service on the same snapshot, so a run first claims its data
+    version in ``alert_runs``. Only the process whose claim wins scores and sends; the others
+    skip that version. A failed delivery releases the claim so the version can be retried.
+    """
+
+    def __init__(
+        self,
+        users: UserStore,
+        scorer: Callable[[list[str]], dict[str, dict]],
+        sink: AlertSink,
+        batch_size: int = 500,
+    ) -> None:
+        self.users = users
+        self.scorer = scorer
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.last_run: dict | None = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(users.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_RUNS_SCHEMA)
+        self._conn.commit()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _claim(self, data_version: str, claimed_at: str) -> str:
+        """Claim ``data_version`` for this process; returns the worker id that holds the claim."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO alert_runs (data_version, claimed_by, claimed_at) VALUES (?, ?, ?)",
+                (data_version, self.worker_id, claimed_at),
+            )
+            (holder,) = self._conn.execute(
+                "SELECT claimed_by FROM alert_runs WHERE data_version = ?", (data_version,)
+            ).fetchone()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+        return holder
+
+    def _release(self, data_version: str) -> None:
+        self._conn.execute(
+            "DELETE FROM alert_runs WHERE data_version = ? AND claimed_by = ?", (data_version, self.worker_id)
+        )
+        self._conn.commit()
+
+    def _notified_tiers(self) -> dict[str, str]:
+        return dict(self._conn.execute("SELECT district, risk_tier FROM alert_state"))
+
+    def _mark_notified(self, scores: list[dict], data_version: str, notified_at: str) -> None:
+        self._conn.executemany(
+            """
+            INSERT INTO alert_state (district, risk_tier, probability, data_version, notified_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(district) DO UPDATE SET
+                risk_tier=excluded.risk_tier,
+                probability=excluded.probability,
+                data_version=excluded.data_version,
+                notified_at=excluded.notified_at
+            """,
+            [(s["district"], s["risk_tier"], s["probability"], data_version, notified_at) for s in scores],
+        )
+        self._conn.commit()
+
+    def run(self, data_version: str) -> dict:
+        with self._lock:
+            started = pd.Timestamp.utcnow()
+            holder = self._claim(data_version, started.isoformat())
+            if holder != self.worker_id:
+                self.last_run = {
+                    "data_version": data_version,
+                    "started_at": started.isoformat(),
+                    "skipped": True,
+                    "claimed_by": holder,
+                    "notifications_sent": 0,
+                }
+                return self.last_run
+
+            subscribers = self.users.subscribers_by_district()
+            scores = self.scorer(list(subscribers))
+            previous = self._notified_tiers()
+
+            changed = []
+            for district, score in scores.items():
+                before = previous.get(score["district"], BASELINE_TIER)
+                if score["risk_tier"] != before:
+                    changed.append((district, score, before))
+
+            notified_at = started.isoformat()
+            pending: list[dict] = []
+            # Districts whose last notification sits in ``pending``; committed once that batch is sent.
+            completing: list[dict] = []
+            delivered = 0
+            failed = None
+            for district, score, before in changed:
+                for user_id in subscribers[district]:
+                    pending.append(
+                        {
+                            "user_id": user_id,
+                            "district": score["district"],
+                            "state": score["state"],
+                            "chunk": score["chunk"],
+                            "previous_tier": before,
+                            "risk_tier": score["risk_tier"],
+                            "alert_tier": score["alert_tier"],
+                            "probability": score["probability"],
+                            "feature_time": score["feature_time"],
+                            "data_version": data_version,
+                            "notified_at": notified_at,
+                        }
+                    )
+                    if len(pending) >= self.batch_size:
+                        try:
+                            self.sink.send(pending)
+                        except Exception as exc:
+                            failed = exc
+                            break
+                        delivered += len(pending)
+                        self._mark_notified(completing, data_version, notified_at)
+                        pending, completing = [], []
+                if failed is not None:
+                    break
+                completing.append(score)
+            if failed is None and pending:
+                try:
+                    self.sink.send(pending)
+                    delivered += len(pending)
+                except Exception as exc:
+                    failed = exc
+            if failed is None:
+                self._mark_notified(completing, data_version, notified_at)
+            else:
+                self._release(data_version)
+
+            self.last_run = {
+                "data_version": data_version,
+                "started_at": notified_at,
+                "skipped": False,
+                "claimed_by": self.worker_id,
+                "duration_ms": round((pd.Timestamp.utcnow() - started).total_seconds() * 1000, 1),
+                "subscribed_districts": len(subscribers),
+                "scored_districts": len(scores),
+                "changed_districts": len(changed),
+                "notifications_sent": delivered,
+                "error": repr(failed) if failed is not None else None,
+            }
+            return self.last_run
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,18 +1,67 @@
 from __future__ import annotations
 
-import sqlite3
+import asyncio
 import json
+import logging
+import os
+import threading
+import time
 from datetime import datetime
-from functools import lru_cache
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="Cloudburst Risk Prediction API")
+from backend.alerts import AlertService, sink_from_spec
+from backend.district_index import DistrictSearchIndex
+from backend.executors import BoundedExecutor, env_flag, env_int
+from backend.feature_store import SharedFeatureStore
+from backend.metrics import MetricsMiddleware, MetricsRegistry, stage
+from backend.response_cache import CachedResponse, ResponseCache, files_fingerprint
+from backend.pagination import EXPORT_MEDIA_TYPES, decode_cursor, iter_csv_export, next_cursor
+from backend.results_registry import IndexedTable, ResultsRegistry
+from backend.serialization import FastJSONResponse, dumps, frame_records
+from backend.snapshot_watcher import SnapshotWatcher
+from backend.streaming import RiskUpdateBroker
+from backend.timeseries import lttb_indices, normalized_composite
+from backend.user_store import UserStore
+from backend.warmup import StageTimer, WarmupTracker
+from src.common.spatial_index import DistrictLocator
+from src.common.student_model import StudentModel
+from src.labels.segment_events import EventIndex
+
+_IMPORT_STARTED = time.perf_counter()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    warmup = None
+    if env_flag("CLOUDBURST_WARMUP", True):
+        # Warm in the background so liveness answers immediately; readiness waits for this.
+        warmup = asyncio.create_task(IO_EXECUTOR.run(_warm_up))
+    else:
+        WARMUP.skip()
+    SNAPSHOT_WATCHER.start()
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    SNAPSHOT_WATCHER.stop()
+    if ALERT_SERVICE is not None:
+        ALERT_SERVICE.close()
+    # Commit queued user-preference writes before the process exits.
+    USER_STORE.close()
+
+
+app = FastAPI(title="Cloudburst Risk Prediction API", default_response_class=FastJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,12 +69,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+COMPRESSION_MIN_BYTES = env_int("CLOUDBURST_COMPRESSION_MIN_BYTES", 1024)
+try:
+    from brotli_asgi import BrotliMiddleware
+except ModuleNotFoundError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+else:
+    # Serves br to clients that accept it and falls back to gzip for the rest.
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter(
+    "cloudburst_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = METRICS.histogram(
+    "cloudburst_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+STAGE_LATENCY = METRICS.histogram(
+    "cloudburst_stage_duration_seconds", "Time spent per request-handling stage.", ("stage",)
+)
+ASSET_LOAD_LATENCY = METRICS.histogram(
+    "cloudburst_asset_load_seconds", "Model bundle and latest-feature load times.", ("asset", "chunk")
+)
+# Outermost middleware, so request latency includes compression.
+app.add_middleware(
+    MetricsMiddleware,
+    requests=HTTP_REQUESTS,
+    latency=HTTP_LATENCY,
+    server_timing=env_flag("CLOUDBURST_SERVER_TIMING", False),
+)
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DISTRICT_LOOKUP_CANDIDATES = [
     BASE_DIR / "data" / "processed" / "himalaya_district_lookup.csv",
     BASE_DIR / "data" / "processed" / "himalaya_districts_with_chunks.geojson",
 ]
+DISTRICT_BOUNDARIES_PATH = BASE_DIR / "data" / "processed" / "himalaya_districts_with_chunks.geojson"
+MAX_LOCATE_POINTS = 10000
 
 FEATURES = [
     "t2m",
@@ -46,6 +126,10 @@ CHUNK_TO_MODEL = {
     "eastern": BASE_DIR / "models" / "eastern_model.pkl",
 }
 
+# Distilled students written by src/models/distill_chunk_ensemble.py, served when CLOUDBURST_STUDENT_MODEL=1.
+CHUNK_TO_STUDENT = {chunk: BASE_DIR / "models" / f"{chunk}_student.json" for chunk in CHUNK_TO_MODEL}
+USE_STUDENT_MODEL = env_flag("CLOUDBURST_STUDENT_MODEL", False)
+
 CHUNK_TO_LATEST_FEATURES = {
     "western": BASE_DIR / "data" / "processed" / "latest_features_western.csv",
     "central": BASE_DIR / "data" / "processed" / "latest_features_central.csv",
@@ -55,6 +139,40 @@ CHUNK_TO_LATEST_FEATURES = {
 DB_PATH = BASE_DIR / "data" / "app_users.db"
 RESULTS_DIR = BASE_DIR / "results"
 HISTORIC_EVENTS_PATH = BASE_DIR / "data" / "historic_events.csv"
+DETECTED_EVENTS_PATH = BASE_DIR / "data" / "processed" / "cloudburst_events.csv"
+REPLAY_WINDOW_HOURS = env_int("CLOUDBURST_REPLAY_WINDOW_HOURS", 48)
+
+# Model inference and file/database work run on separate, bounded pools so slow model loads
+# or CSV reads cannot starve cheap in-memory routes such as /health and /districts.
+INFERENCE_EXECUTOR = BoundedExecutor(
+    "inference",
+    max_workers=env_int("CLOUDBURST_INFERENCE_WORKERS", min(4, os.cpu_count() or 1), minimum=1),
+    max_pending=env_int("CLOUDBURST_INFERENCE_MAX_PENDING", 32, minimum=1),
+)
+IO_EXECUTOR = BoundedExecutor(
+    "io",
+    max_workers=env_int("CLOUDBURST_IO_WORKERS", 8, minimum=1),
+    max_pending=env_int("CLOUDBURST_IO_MAX_PENDING", 64, minimum=1),
+)
+RESPONSE_CACHE = ResponseCache(
+    max_entries=env_int("CLOUDBURST_RESPONSE_CACHE_ENTRIES", 256),
+    max_age=env_int("CLOUDBURST_CACHE_MAX_AGE", 60),
+)
+INSIGHT_RESULT_FILES = ["model_performance.csv", "chunk_ensemble_performance.csv", "risk_probabilities.csv"]
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_ENSEMBLE_WEIGHTS = {"rf": 0.5, "xgb": 0.5}
+MAX_PAGE_SIZE = 1000
+EXPORT_CHUNK_ROWS = env_int("CLOUDBURST_EXPORT_CHUNK_ROWS", 5000, minimum=1)
+EXPORT_DATASETS = {
+    "risk_tier_predictions": RESULTS_DIR / "risk_tier_predictions.csv",
+    "risk_probabilities": RESULTS_DIR / "risk_probabilities.csv",
+    "risk_tier_summary": RESULTS_DIR / "risk_tier_summary.csv",
+    "model_performance": RESULTS_DIR / "model_performance.csv",
+    "chunk_ensemble_performance": RESULTS_DIR / "chunk_ensemble_performance.csv",
+    "lead_time_analysis": RESULTS_DIR / "lead_time_analysis.csv",
+    "historic_events": HISTORIC_EVENTS_PATH,
+    "detected_events": DETECTED_EVENTS_PATH,
+}
 
 
 class DistrictRequest(BaseModel):
@@ -66,6 +184,15 @@ class UserDistrictSelection(BaseModel):
     district: str = Field(..., min_length=2)
 
 
+class LocationPoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class LocateRequest(BaseModel):
+    points: list[LocationPoint] = Field(..., min_length=1, max_length=MAX_LOCATE_POINTS)
+
+
 def _zone_name_from_chunk(chunk: str) -> str:
     chunk_norm = chunk.strip().lower()
     if chunk_norm == "western":
@@ -168,99 +295,111 @@ def _load_lead_time() -> dict:
     return {"estimated_hours": estimated, "yellow_hr": yellow, "orange_hr": orange, "red_hr": red}
 
 
-def _ensure_user_db() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                user_id TEXT PRIMARY KEY,
-                district TEXT NOT NULL,
-                state TEXT,
-                chunk TEXT,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        conn.commit()
-
-
-def _save_user_district(user_id: str, district: str, state: str, chunk: str) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            INSERT INTO user_preferences (user_id, district, state, chunk, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(user_id) DO UPDATE SET
-                district=excluded.district,
-                state=excluded.state,
-                chunk=excluded.chunk,
-                updated_at=excluded.updated_at
-            """,
-            (user_id, district, state, chunk, pd.Timestamp.utcnow().isoformat()),
-        )
-        conn.commit()
+DISTRICTS_DF, DISTRICT_LOOKUP_USED = _load_districts()
+DISTRICT_LOCATOR = (
+    DistrictLocator.from_frame(DISTRICTS_DF, DISTRICT_BOUNDARIES_PATH) if not DISTRICTS_DF.empty else None
+)
+DISTRICT_INDEX = DistrictSearchIndex(DISTRICTS_DF) if not DISTRICTS_DF.empty else None
+LEAD = _load_lead_time()
+USER_STORE = UserStore(
+    DB_PATH,
+    pool_size=env_int("CLOUDBURST_USER_DB_POOL", 4, minimum=1),
+    cache_entries=env_int("CLOUDBURST_USER_CACHE_ENTRIES", 10000),
+    batch_size=env_int("CLOUDBURST_USER_WRITE_BATCH", 256, minimum=1),
+    flush_interval=env_int("CLOUDBURST_USER_WRITE_DELAY_MS", 200) / 1000,
+    write_retries=env_int("CLOUDBURST_USER_WRITE_RETRIES", 3),
+)
 
 
-def _get_user_district(user_id: str) -> dict | None:
-    with sqlite3.connect(DB_PATH) as conn:
-        row = conn.execute(
-            "SELECT user_id, district, state, chunk, updated_at FROM user_preferences WHERE user_id = ?",
-            (user_id,),
-        ).fetchone()
-    if row is None:
-        return None
-    return {
-        "user_id": row[0],
-        "district": row[1],
-        "state": row[2],
-        "chunk": row[3],
-        "updated_at": row[4],
-    }
+def _district_search(query: str) -> pd.DataFrame:
+    if DISTRICT_INDEX is None:
+        return DISTRICTS_DF.iloc[0:0]
+    # Name resolution for predictions stays literal (exact/prefix/substring); fuzzy matching is
+    # reserved for the /districts autocomplete so a typo never silently picks another district.
+    return DISTRICTS_DF.iloc[DISTRICT_INDEX.search(query, fuzzy=False)]
 
 
-DISTRICTS_DF, DISTRICT_LOOKUP_USED = _load_districts()
-LEAD = _load_lead_time()
-_ensure_user_db()
+def _read_latest_features_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    if "district" not in df.columns and "district_name" in df.columns:
+        df = df.rename(columns={"district_name": "district"})
+    if "district" not in df.columns:
+        raise ValueError(f"{path.name} must include a 'district' or 'district_name' column.")
+    return df
 
 
-def _district_search(query: str) -> pd.DataFrame:
-    q = query.strip().lower()
-    exact = DISTRICTS_DF[DISTRICTS_DF["district"].str.lower() == q]
-    if not exact.empty:
-        return exact
-    return DISTRICTS_DF[DISTRICTS_DF["district"].str.lower().str.contains(q, regex=False)]
+# Opt-in for multi-worker deployments: workers memory-map one shared copy of features and models.
+SHARED_STORE_DIR = os.getenv("CLOUDBURST_SHARED_STORE_DIR", "").strip()
+FEATURE_STORE = (
+    SharedFeatureStore(
+        Path(SHARED_STORE_DIR) if Path(SHARED_STORE_DIR).is_absolute() else BASE_DIR / SHARED_STORE_DIR,
+        CHUNK_TO_LATEST_FEATURES,
+        CHUNK_TO_MODEL,
+        read_features=_read_latest_features_csv,
+    )
+    if SHARED_STORE_DIR
+    else None
+)
 
 
 @lru_cache(maxsize=3)
 def _load_model_bundle(chunk: str) -> dict:
-    model_path = CHUNK_TO_MODEL.get(chunk)
-    if model_path is None or not model_path.exists():
-        raise FileNotFoundError(f"Missing model for chunk '{chunk}'.")
-    return joblib.load(model_path)
+    with ASSET_LOAD_LATENCY.time(asset="model", chunk=chunk):
+        if FEATURE_STORE is not None:
+            return FEATURE_STORE.model(chunk)
+        model_path = CHUNK_TO_MODEL.get(chunk)
+        if model_path is None or not model_path.exists():
+            raise FileNotFoundError(f"Missing model for chunk '{chunk}'.")
+        return joblib.load(model_path)
+
+
+@lru_cache(maxsize=3)
+def _load_student_model(chunk: str) -> StudentModel | None:
+    """The chunk's distilled student when the fast path is on and one matches the deployed bundle.
+
+    A student distilled from a different bundle (the ensemble was retrained or re-optimized
+    since) is ignored, so the chunk falls back to the ensemble. Without a bundle on disk the
+    student is the only model deployed and is served as is.
+    """
+    path = CHUNK_TO_STUDENT.get(chunk)
+    if not USE_STUDENT_MODEL or path is None or not path.exists():
+        return None
+    with ASSET_LOAD_LATENCY.time(asset="student", chunk=chunk):
+        student = StudentModel.from_json(path)
+        bundle_path = CHUNK_TO_MODEL.get(chunk)
+        if bundle_path is not None and bundle_path.exists() and not student.distilled_from(bundle_path):
+            logger.warning("Ignoring stale student %s: it was not distilled from %s", path.name, bundle_path.name)
+            return None
+    return student
 
 
 @lru_cache(maxsize=3)
 def _load_chunk_latest_features(chunk: str) -> pd.DataFrame:
-    path = CHUNK_TO_LATEST_FEATURES.get(chunk)
-    if path is None or not path.exists():
-        raise FileNotFoundError(
-            f"Missing precomputed latest features for chunk '{chunk}'. "
-            "Run the offline pipeline to generate latest_features_<chunk>.csv."
-        )
-    df = pd.read_csv(path)
-    if "district" not in df.columns and "district_name" in df.columns:
-        df = df.rename(columns={"district_name": "district"})
-    if "district" not in df.columns:
-        raise ValueError(f"{path.name} must include a 'district' or 'district_name' column.")
-    return df
+    with ASSET_LOAD_LATENCY.time(asset="features", chunk=chunk):
+        if FEATURE_STORE is not None:
+            return FEATURE_STORE.features(chunk)
+        path = CHUNK_TO_LATEST_FEATURES.get(chunk)
+        if path is None or not path.exists():
+            raise FileNotFoundError(
+                f"Missing precomputed latest features for chunk '{chunk}'. "
+                "Run the offline pipeline to generate latest_features_<chunk>.csv."
+            )
+        return _read_latest_features_csv(path)
+
+
+@lru_cache(maxsize=3)
+def _chunk_feature_index(chunk: str) -> dict[str, np.ndarray]:
+    """Lowercase district name -> row positions in the chunk's latest-features table."""
+    latest_df = _load_chunk_latest_features(chunk)
+    return latest_df.groupby(latest_df["district"].astype(str).str.lower(), sort=False).indices
 
 
 def load_latest_features(district: str) -> tuple[pd.Series, pd.DataFrame, dict]:
     if DISTRICTS_DF.empty:
         raise HTTPException(status_code=404, detail="District lookup table is not loaded.")
 
-    matches = _district_search(district)
+    with stage(STAGE_LATENCY, "district_search"):
+        matches = _district_search(district)
     if matches.empty:
         raise HTTPException(status_code=404, detail=f"District '{district}' not found.")
 
@@ -271,29 +410,31 @@ def load_latest_features(district: str) -> tuple[pd.Series, pd.DataFrame, dict]:
     lat = float(district_row["centroid_lat"])
     lon = float(district_row["centroid_lon"])
 
-    try:
-        latest_df = _load_chunk_latest_features(chunk)
-    except (FileNotFoundError, ValueError) as exc:
-        raise HTTPException(status_code=503, detail=str(exc)) from exc
-
-    district_latest = latest_df[latest_df["district"].astype(str).str.lower() == resolved_district.lower()]
-    if district_latest.empty:
-        raise HTTPException(
-            status_code=404,
-            detail=(
-                f"No latest precomputed features found for district '{resolved_district}' in chunk '{chunk}'. "
-                "Run the offline pipeline and regenerate latest features."
-            ),
-        )
+    with stage(STAGE_LATENCY, "feature_lookup"):
+        try:
+            latest_df = _load_chunk_latest_features(chunk)
+            positions = _chunk_feature_index(chunk).get(resolved_district.lower())
+        except (FileNotFoundError, ValueError) as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+        district_latest = latest_df.iloc[positions] if positions is not None else latest_df.iloc[0:0]
+        if district_latest.empty:
+            raise HTTPException(
+                status_code=404,
+                detail=(
+                    f"No latest precomputed features found for district '{resolved_district}' in chunk '{chunk}'. "
+                    "Run the offline pipeline and regenerate latest features."
+                ),
+            )
 
-    if "feature_time" in district_latest.columns:
-        district_latest = district_latest.copy()
-        district_latest["_sort_time"] = pd.to_datetime(district_latest["feature_time"], errors="coerce")
-        district_latest = district_latest.sort_values("_sort_time").drop(columns="_sort_time")
-    elif "time" in district_latest.columns:
-        district_latest = district_latest.copy()
-        district_latest["_sort_time"] = pd.to_datetime(district_latest["time"], errors="coerce")
-        district_latest = district_latest.sort_values("_sort_time").drop(columns="_sort_time")
+        if "feature_time" in district_latest.columns:
+            district_latest = district_latest.copy()
+            district_latest["_sort_time"] = pd.to_datetime(district_latest["feature_time"], errors="coerce")
+            district_latest = district_latest.sort_values("_sort_time").drop(columns="_sort_time")
+        elif "time" in district_latest.columns:
+            district_latest = district_latest.copy()
+            district_latest["_sort_time"] = pd.to_datetime(district_latest["time"], errors="coerce")
+            district_latest = district_latest.sort_values("_sort_time").drop(columns="_sort_time")
 
     row = district_latest.iloc[-1]
     metadata = {
@@ -348,43 +489,56 @@ def _layman_explanation(score_100: float, row: pd.Series, lead_text: str) -> str
     )
 
 
-def _build_visualization(history: pd.DataFrame) -> tuple[dict, list[dict]]:
-    timestamps: list[str] = []
-    rain_trend: list[float] = []
-    moisture_trend: list[float] = []
-    pressure_drop_trend: list[float] = []
-    wind_trend: list[float] = []
-    timeline: list[dict] = []
-
-    for _, row in history.iterrows():
-        timestamp = str(row.get("feature_time", row.get("time", pd.Timestamp.utcnow().isoformat())))
-        rain = round(_safe_float(row, "rain_mm", 0.0), 4)
-        moisture = round(_safe_float(row, "tcwv_3h", _safe_float(row, "tcwv", 0.0)), 4)
-        pressure_drop = round(_safe_float(row, "sp_drop_3h", 0.0), 4)
-        wind = round(_safe_float(row, "wind_speed", 0.0), 4)
-
-        timestamps.append(timestamp)
-        rain_trend.append(rain)
-        moisture_trend.append(moisture)
-        pressure_drop_trend.append(pressure_drop)
-        wind_trend.append(wind)
-        timeline.append(
-            {
-                "timestamp": timestamp,
-                "rainfall": rain,
-                "moisture": moisture,
-                "pressure_drop": pressure_drop,
-                "wind": wind,
-            }
-        )
+# (visualization key, timeline key, source columns in priority order)
+VISUALIZATION_SERIES = [
+    ("rain_trend", "rainfall", ("rain_mm",)),
+    ("moisture_trend", "moisture", ("tcwv_3h", "tcwv")),
+    ("pressure_drop_trend", "pressure_drop", ("sp_drop_3h",)),
+    ("wind_convergence_trend", "wind", ("wind_speed",)),
+]
 
-    visualization = {
-        "timestamps": timestamps,
-        "rain_trend": rain_trend,
-        "moisture_trend": moisture_trend,
-        "pressure_drop_trend": pressure_drop_trend,
-        "wind_convergence_trend": wind_trend,
-    }
+
+def _numeric_column(history: pd.DataFrame, candidates: tuple[str, ...]) -> np.ndarray:
+    # Missing or non-numeric cells fall back to the next candidate column, then to 0.
+    values = np.full(len(history), np.nan)
+    for col in candidates:
+        if col in history.columns:
+            fallback = pd.to_numeric(history[col], errors="coerce").to_numpy(dtype=float)
+            values = np.where(np.isnan(values), fallback, values)
+    return np.round(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0), 4)
+
+
+def _build_visualization(
+    history: pd.DataFrame,
+    window_hours: int | None = None,
+    max_points: int | None = None,
+    compact: bool = False,
+) -> tuple[dict, list[dict] | None]:
+    time_col = next((col for col in ("feature_time", "time") if col in history.columns), None)
+    if time_col is None:
+        timestamps = np.full(len(history), pd.Timestamp.utcnow().isoformat(), dtype=object)
+    else:
+        timestamps = history[time_col].astype(str).to_numpy()
+    columns = [_numeric_column(history, sources) for _, _, sources in VISUALIZATION_SERIES]
+
+    positions = np.arange(len(history))
+    if window_hours is not None and time_col is not None and len(history):
+        parsed = pd.to_datetime(history[time_col], errors="coerce")
+        positions = np.flatnonzero((parsed >= parsed.max() - pd.Timedelta(hours=window_hours)).to_numpy())
+    if max_points is not None and len(positions) > max_points:
+        picked = lttb_indices(normalized_composite([values[positions] for values in columns]), max_points)
+        positions = positions[picked]
+
+    timestamps = timestamps[positions].tolist()
+    series = [values[positions].tolist() for values in columns]
+
+    visualization = {"timestamps": timestamps}
+    visualization.update({key: values for (key, _, _), values in zip(VISUALIZATION_SERIES, series)})
+    if compact:
+        return visualization, None
+
+    timeline_keys = ("timestamp", *(key for _, key, _ in VISUALIZATION_SERIES))
+    timeline = [dict(zip(timeline_keys, row)) for row in zip(timestamps, *series)]
     return visualization, timeline
 
 
@@ -392,38 +546,17 @@ def _results_csv(name: str) -> Path:
     return RESULTS_DIR / name
 
 
-def _clean_json_value(value):
-    if pd.isna(value):
-        return None
-    if isinstance(value, pd.Timestamp):
-        return value.isoformat()
-    if hasattr(value, "item"):
-        try:
-            value = value.item()
-        except Exception:
-            pass
-    return value
-
-
-def _frame_records(df: pd.DataFrame) -> list[dict]:
-    records: list[dict] = []
-    for row in df.to_dict(orient="records"):
-        records.append({str(key): _clean_json_value(value) for key, value in row.items()})
-    return records
-
-
-def _load_result_records(file_name: str) -> list[dict]:
-    path = _results_csv(file_name)
+def _read_result_records(path: Path) -> list[dict]:
     if not path.exists():
         return []
-    return _frame_records(pd.read_csv(path))
+    return frame_records(pd.read_csv(path))
 
 
-def _load_historic_events() -> pd.DataFrame:
-    if not HISTORIC_EVENTS_PATH.exists():
-        return pd.DataFrame(columns=["event_id", "date", "location", "district", "state", "severity"])
+def _load_result_records(file_name: str) -> list[dict]:
+    return RESULTS.get(file_name)
 
-    frame = pd.read_csv(HISTORIC_EVENTS_PATH)
+
+def _normalize_historic_events(frame: pd.DataFrame, first_row: int = 0) -> pd.DataFrame:
     rename_map = {
         "Date": "date",
         "Location": "location",
@@ -442,12 +575,18 @@ def _load_historic_events() -> pd.DataFrame:
         "Elevation_Zone": "elevation_zone",
     }
     frame = frame.rename(columns=rename_map).copy()
-    frame.insert(0, "event_id", range(1, len(frame) + 1))
+    frame.insert(0, "event_id", range(first_row + 1, first_row + len(frame) + 1))
     if "date" in frame.columns:
         frame["date"] = pd.to_datetime(frame["date"], errors="coerce", dayfirst=True)
     return frame
 
 
+def _load_historic_events() -> pd.DataFrame:
+    if not HISTORIC_EVENTS_PATH.exists():
+        return pd.DataFrame(columns=["event_id", "date", "location", "district", "state", "severity"])
+    return _normalize_historic_events(pd.read_csv(HISTORIC_EVENTS_PATH))
+
+
 def _load_replay_events() -> pd.DataFrame:
     path = _results_csv("lead_time_analysis.csv")
     if not path.exists():
@@ -460,16 +599,80 @@ def _load_replay_events() -> pd.DataFrame:
     return frame
 
 
-def _predict_for_district(district: str) -> dict:
-    row, history, metadata = load_latest_features(district)
-    chunk = metadata["chunk"]
+def _historic_events_table(_: Path) -> IndexedTable:
+    frame = _load_historic_events()
+    if "date" in frame.columns:
+        frame = frame.sort_values("date", ascending=False, na_position="last", kind="mergesort")
+    frame = frame.reset_index(drop=True)
+    return IndexedTable(frame, frame_records(frame), index_columns=("district", "state", "severity"))
+
+
+@dataclass(frozen=True)
+class DetectedEvents:
+    """Label-derived events served newest first, with an ``EventIndex`` for time-overlap queries.
+
+    ``index.events`` is sorted by start time ascending and ``table`` is the same rows reversed,
+    so table position ``p`` is index row ``len - 1 - p``.
+    """
+
+    table: IndexedTable
+    index: EventIndex
+
+    def overlapping(self, positions: np.ndarray, start: pd.Timestamp | None, end: pd.Timestamp | None) -> np.ndarray:
+        """Table positions among ``positions`` whose events overlap ``[start, end]``; either bound may be open."""
+        if len(positions) == 0 or (start is None and end is None):
+            return positions
+        last = len(self.table) - 1
+        rows = self.index.overlap_rows(start, end, rows=last - positions[::-1])
+        return last - rows[::-1]
+
+
+def _detected_events_table(path: Path) -> DetectedEvents:
+    if not path.exists():
+        frame = pd.DataFrame(columns=["event_id", "region", "district", "start_time", "end_time", "peak_rain_mm"])
+    else:
+        frame = pd.read_csv(path, parse_dates=["start_time", "end_time", "peak_time"])
+    index = EventIndex(frame.rename(columns={"district_name": "district"}), district_col="district")
+    frame = index.events.iloc[::-1].reset_index(drop=True)
+    return DetectedEvents(IndexedTable(frame, frame_records(frame), index_columns=("district", "region")), index)
+
 
+def _replay_events_table(_: Path) -> IndexedTable:
+    frame = _load_replay_events()
+    return IndexedTable(frame, frame_records(frame), index_columns=("event_id",))
+
+
+# Result tables are parsed once and re-read only when their file changes on disk.
+RESULTS = ResultsRegistry()
+for _name in INSIGHT_RESULT_FILES:
+    RESULTS.register(_name, _results_csv(_name), _read_result_records)
+RESULTS.register("historic_events", HISTORIC_EVENTS_PATH, _historic_events_table)
+RESULTS.register("replay_events", _results_csv("lead_time_analysis.csv"), _replay_events_table)
+RESULTS.register("detected_events", DETECTED_EVENTS_PATH, _detected_events_table)
+
+
+def _ensemble_weights(bundle: dict) -> dict[str, float]:
+    """Blend weights from the bundle (learned by optimize_chunk_ensemble.py), normalized to sum to 1."""
+    weights = bundle.get("ensemble_weights") or DEFAULT_ENSEMBLE_WEIGHTS
+    rf_weight, xgb_weight = float(weights.get("rf", 0.0)), float(weights.get("xgb", 0.0))
+    total = rf_weight + xgb_weight
+    if total <= 0:
+        return dict(DEFAULT_ENSEMBLE_WEIGHTS)
+    return {"rf": rf_weight / total, "xgb": xgb_weight / total}
+
+
+def _ensemble_probabilities(
+    chunk: str, rows: list[pd.Series]
+) -> tuple[np.ndarray | None, np.ndarray | None, np.ndarray]:
+    """RF, XGB and blended probabilities; a member that was not evaluated is ``None``."""
     try:
-        model_bundle = _load_model_bundle(chunk)
-    except FileNotFoundError as exc:
+        with stage(STAGE_LATENCY, "model_load"):
+            student = _load_student_model(chunk)
+            model_bundle = _load_model_bundle(chunk) if student is None else None
+    except (FileNotFoundError, ValueError) as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
-    missing_features = [f for f in FEATURES if f not in row.index]
+    missing_features = sorted({f for row in rows for f in FEATURES if f not in row.index}, key=FEATURES.index)
     if missing_features:
         raise HTTPException(
             status_code=503,
@@ -479,88 +682,384 @@ def _predict_for_district(district: str) -> dict:
             ),
         )
 
-    x = pd.DataFrame([{f: _safe_float(row, f) for f in FEATURES}])
-    rf_model = model_bundle["rf_model"]
-    xgb_model = model_bundle["xgb_model"]
-
-    rf_prob = float(rf_model.predict_proba(x)[:, 1][0])
-    xgb_prob = float(xgb_model.predict_proba(x)[:, 1][0])
-    ensemble_prob = 0.5 * rf_prob + 0.5 * xgb_prob
-
-    score_100 = round(ensemble_prob * 100.0, 2)
-    risk_level, alert_tier = _tier_from_score(score_100)
-    risk_tier = _risk_tier_from_alert(alert_tier)
-    zone = _zone_name_from_chunk(chunk)
-
-    confidence = float(max(0.0, min(1.0, 1.0 - abs(rf_prob - xgb_prob))))
-    lead_text = "Offline batch features were refreshed from the latest 10-day atmospheric window."
-    lead_hours = LEAD["estimated_hours"]
-
-    contributions = _compute_contributions(row)
-    explanation = _layman_explanation(score_100, row, lead_text)
-    visualization, timeline = _build_visualization(history)
-
-    rainfall_spike = bool(_safe_float(row, "rain_3h", 0.0) > 1.25 * max(0.1, _safe_float(row, "rain_mm", 0.0)))
-    moisture_surge = bool(_safe_float(row, "tcwv_3h", 0.0) > _safe_float(row, "tcwv", 0.0))
-    cape_high = bool(_safe_float(row, "tcwv_6h", 0.0) > _safe_float(row, "tcwv", 0.0))
-
-    insights: list[str] = []
-    if rainfall_spike:
-        insights.append("Recent rainfall accumulation is elevated relative to baseline.")
-    if moisture_surge:
-        insights.append("Atmospheric moisture is above district baseline.")
-    if cape_high:
-        insights.append("Convective instability proxy remains elevated.")
-    if not insights:
-        insights.append("No strong precursor surge is currently detected; continue routine monitoring.")
+    x = pd.DataFrame([{f: _safe_float(row, f) for f in FEATURES} for row in rows])
+    if student is not None:
+        with stage(STAGE_LATENCY, "student_inference"):
+            student_prob = student.predict_proba(x)[:, 1]
+        # The student replaces both members; neither of them was evaluated.
+        return None, None, student_prob
+
+    weights = _ensemble_weights(model_bundle)
+    member_probs = {}
+    for member in ("rf", "xgb"):
+        if weights[member] > 0:
+            with stage(STAGE_LATENCY, f"{member}_inference"):
+                member_probs[member] = model_bundle[f"{member}_model"].predict_proba(x)[:, 1]
+    ensemble_prob = sum(weights[member] * prob for member, prob in member_probs.items())
+    # A member with zero weight (possibly pruned from the bundle) is not evaluated.
+    return member_probs.get("rf"), member_probs.get("xgb"), ensemble_prob
+
+
+def _model_breakdown_source(chunk: str) -> dict:
+    """Which model produced the probabilities, with the ensemble's weights when it was the ensemble."""
+    if _load_student_model(chunk) is not None:
+        return {"model": "student"}
+    weights = _ensemble_weights(_load_model_bundle(chunk))
+    return {"model": "ensemble", "ensemble_weights": {member: round(weight, 4) for member, weight in weights.items()}}
+
+
+def _score_districts(districts: list[str]) -> dict[str, dict]:
+    """Tier summary per district, with one model call per chunk.
+
+    Districts that cannot be scored (unknown name, missing features or model) are left out.
+    """
+    by_chunk: dict[str, list[tuple[str, pd.Series, dict]]] = {}
+    for district in districts:
+        try:
+            row, _, metadata = load_latest_features(district)
+        except HTTPException:
+            continue
+        by_chunk.setdefault(metadata["chunk"], []).append((district, row, metadata))
+
+    scores: dict[str, dict] = {}
+    for chunk, items in by_chunk.items():
+        try:
+            _, _, probs = _ensemble_probabilities(chunk, [row for _, row, _ in items])
+        except HTTPException:
+            continue
+        for (district, row, metadata), prob in zip(items, probs):
+            score_100 = round(float(prob) * 100.0, 2)
+            _, alert_tier = _tier_from_score(score_100)
+            scores[district] = {
+                "district": metadata["district"],
+                "state": metadata["state"],
+                "chunk": chunk,
+                "risk_tier": _risk_tier_from_alert(alert_tier),
+                "alert_tier": alert_tier,
+                "probability": round(float(prob), 4),
+                "risk_score": score_100,
+                "feature_time": str(row.get("feature_time", row.get("time", ""))),
+                "precursors": {
+                    "rain_mm": round(_safe_float(row, "rain_mm", 0.0), 4),
+                    "tcwv_3h": round(_safe_float(row, "tcwv_3h", _safe_float(row, "tcwv", 0.0)), 4),
+                    "sp_drop_3h": round(_safe_float(row, "sp_drop_3h", 0.0), 4),
+                    "wind_speed": round(_safe_float(row, "wind_speed", 0.0), 4),
+                },
+            }
+    return scores
 
-    return {
-        "district": metadata["district"],
-        "zone": zone,
-        "risk_tier": risk_tier,
-        "probability": round(ensemble_prob, 4),
-        "confidence": round(confidence, 4),
-        "last_updated": pd.Timestamp.utcnow().isoformat(),
-        "timeline": timeline,
-        "precursors": {
-            "rainfall_spike": rainfall_spike,
-            "moisture_surge": moisture_surge,
-            "cape_high": cape_high,
-        },
-        "insights": insights,
-        "input": {"district": district},
-        "resolved_location": {
+
+def _predict_for_district(
+    district: str,
+    window_hours: int | None = None,
+    max_points: int | None = None,
+    compact: bool = False,
+) -> dict:
+    row, history, metadata = load_latest_features(district)
+    chunk = metadata["chunk"]
+
+    rf_probs, xgb_probs, ensemble_probs = _ensemble_probabilities(chunk, [row])
+    rf_prob = None if rf_probs is None else float(rf_probs[0])
+    xgb_prob = None if xgb_probs is None else float(xgb_probs[0])
+    ensemble_prob = float(ensemble_probs[0])
+
+    with stage(STAGE_LATENCY, "response_build"):
+        score_100 = round(ensemble_prob * 100.0, 2)
+        risk_level, alert_tier = _tier_from_score(score_100)
+        risk_tier = _risk_tier_from_alert(alert_tier)
+        zone = _zone_name_from_chunk(chunk)
+
+        # Member agreement; there is nothing to agree on unless both members ran.
+        confidence = (
+            None if rf_prob is None or xgb_prob is None else float(max(0.0, min(1.0, 1.0 - abs(rf_prob - xgb_prob))))
+        )
+        lead_text = "Offline batch features were refreshed from the latest 10-day atmospheric window."
+        lead_hours = LEAD["estimated_hours"]
+
+        contributions = _compute_contributions(row)
+        explanation = _layman_explanation(score_100, row, lead_text)
+        visualization, timeline = _build_visualization(history, window_hours, max_points, compact)
+
+        rainfall_spike = bool(_safe_float(row, "rain_3h", 0.0) > 1.25 * max(0.1, _safe_float(row, "rain_mm", 0.0)))
+        moisture_surge = bool(_safe_float(row, "tcwv_3h", 0.0) > _safe_float(row, "tcwv", 0.0))
+        cape_high = bool(_safe_float(row, "tcwv_6h", 0.0) > _safe_float(row, "tcwv", 0.0))
+
+        insights: list[str] = []
+        if rainfall_spike:
+            insights.append("Recent rainfall accumulation is elevated relative to baseline.")
+        if moisture_surge:
+            insights.append("Atmospheric moisture is above district baseline.")
+        if cape_high:
+            insights.append("Convective instability proxy remains elevated.")
+        if not insights:
+            insights.append("No strong precursor surge is currently detected; continue routine monitoring.")
+
+        payload = {
             "district": metadata["district"],
-            "state": metadata["state"],
-            "chunk": chunk,
-            "lat": metadata["lat"],
-            "lon": metadata["lon"],
-        },
-        "risk_score": score_100,
-        "risk_score_0_1": round(ensemble_prob, 4),
-        "risk_level": risk_level,
-        "alert_tier": alert_tier,
-        "lead_time_estimate_hours": lead_hours,
-        "lead_time_analysis": {
-            "estimated_hours": lead_hours,
-            "text": lead_text,
-            "yellow_hr": LEAD["yellow_hr"],
-            "orange_hr": LEAD["orange_hr"],
-            "red_hr": LEAD["red_hr"],
-        },
-        "model_breakdown": {
-            "rf_probability": round(rf_prob, 4),
-            "xgb_probability": round(xgb_prob, 4),
-            "ensemble_probability": round(ensemble_prob, 4),
-        },
-        "top_contributing_factors": contributions,
-        "visualization": visualization,
-        "layman_explanation": explanation,
+            "zone": zone,
+            "risk_tier": risk_tier,
+            "probability": round(ensemble_prob, 4),
+            "confidence": None if confidence is None else round(confidence, 4),
+            "last_updated": pd.Timestamp.utcnow().isoformat(),
+            "timeline": timeline,
+            "precursors": {
+                "rainfall_spike": rainfall_spike,
+                "moisture_surge": moisture_surge,
+                "cape_high": cape_high,
+            },
+            "insights": insights,
+            "input": {"district": district},
+            "resolved_location": {
+                "district": metadata["district"],
+                "state": metadata["state"],
+                "chunk": chunk,
+                "lat": metadata["lat"],
+                "lon": metadata["lon"],
+            },
+            "risk_score": score_100,
+            "risk_score_0_1": round(ensemble_prob, 4),
+            "risk_level": risk_level,
+            "alert_tier": alert_tier,
+            "lead_time_estimate_hours": lead_hours,
+            "lead_time_analysis": {
+                "estimated_hours": lead_hours,
+                "text": lead_text,
+                "yellow_hr": LEAD["yellow_hr"],
+                "orange_hr": LEAD["orange_hr"],
+                "red_hr": LEAD["red_hr"],
+            },
+            "model_breakdown": {
+                "rf_probability": None if rf_prob is None else round(rf_prob, 4),
+                "xgb_probability": None if xgb_prob is None else round(xgb_prob, 4),
+                "ensemble_probability": round(ensemble_prob, 4),
+                **_model_breakdown_source(chunk),
+            },
+            "top_contributing_factors": contributions,
+            "visualization": visualization,
+            "layman_explanation": explanation,
+        }
+        if timeline is None:
+            # Compact mode: the columnar visualization already carries every timeline value.
+            del payload["timeline"]
+        return payload
+
+
+_PREDICTION_DATA_VERSION: str | None = None
+_CACHED_LOADERS = {
+    "model_bundle": _load_model_bundle,
+    "student_model": _load_student_model,
+    "latest_features": _load_chunk_latest_features,
+    "feature_index": _chunk_feature_index,
+}
+# Hits/misses of cache generations dropped on a data refresh, so the exported counters never go back.
+_CLEARED_CACHE_COUNTS = {(name, result): 0 for name in _CACHED_LOADERS for result in ("hit", "miss")}
+_CACHE_COUNTS_LOCK = threading.Lock()
+
+
+def _clear_loader_caches() -> None:
+    """Drop the loader caches, folding their counts into the cleared totals; hold ``_CACHE_COUNTS_LOCK``."""
+    for name, cached in _CACHED_LOADERS.items():
+        info = cached.cache_info()
+        cached.cache_clear()
+        _CLEARED_CACHE_COUNTS[(name, "hit")] += info.hits
+        _CLEARED_CACHE_COUNTS[(name, "miss")] += info.misses
+
+
+def _prediction_data_version() -> str:
+    global _PREDICTION_DATA_VERSION
+    version = files_fingerprint(
+        [*CHUNK_TO_LATEST_FEATURES.values(), *CHUNK_TO_MODEL.values(), *CHUNK_TO_STUDENT.values()]
+    )
+    if version == _PREDICTION_DATA_VERSION:
+        return version
+    with _CACHE_COUNTS_LOCK:
+        # Compare again under the lock so concurrent requests clear the caches only once per version.
+        if version != _PREDICTION_DATA_VERSION:
+            # The offline pipeline refreshed features or models; drop the in-process copies as well.
+            _clear_loader_caches()
+            _PREDICTION_DATA_VERSION = version
+    return version
+
+
+WARMUP = WarmupTracker(require_all=env_flag("CLOUDBURST_READY_REQUIRE_ALL_CHUNKS", True))
+
+
+def _warm_chunk(chunk: str, timer: StageTimer) -> dict:
+    features = timer.time("features", _load_chunk_latest_features, chunk)
+    index = timer.time("feature_index", _chunk_feature_index, chunk)
+    student = timer.time("student", _load_student_model, chunk)
+
+    missing_features = [f for f in FEATURES if f not in features.columns]
+    if missing_features:
+        raise ValueError(f"Latest features for '{chunk}' are missing: {', '.join(missing_features)}")
+    if student is not None:
+        unknown = [f for f in student.features if f not in FEATURES]
+        if unknown:
+            raise ValueError(f"Student model for '{chunk}' expects unknown features: {', '.join(unknown)}")
+    else:
+        bundle = timer.time("model", _load_model_bundle, chunk)
+        missing_models = [
+            f"{member}_model"
+            for member, weight in _ensemble_weights(bundle).items()
+            if weight > 0 and f"{member}_model" not in bundle
+        ]
+        if missing_models:
+            raise ValueError(f"Model bundle for '{chunk}' is missing: {', '.join(missing_models)}")
+
+    _, _, probs = timer.time("probe_inference", _ensemble_probabilities, chunk, [features.iloc[-1]])
+    probability = float(probs[0])
+    if not 0.0 <= probability <= 1.0:
+        raise ValueError(f"Probe inference for '{chunk}' returned {probability}")
+    return {
+        "districts": len(index),
+        "feature_rows": int(len(features)),
+        "model": "student" if student is not None else "ensemble",
+        "probe_probability": round(probability, 4),
+    }
+
+
+def _warm_up() -> dict:
+    return WARMUP.run(CHUNK_TO_MODEL, _warm_chunk, _prediction_data_version())
+
+
+def _rewarm_on_snapshot(version: str) -> None:
+    # The startup warm-up covers the first version; later reloads dropped the chunk caches.
+    if WARMUP.version is not None and version != WARMUP.version:
+        _warm_up()
+
+
+SNAPSHOT_WATCHER = SnapshotWatcher(
+    _prediction_data_version,
+    interval=env_int("CLOUDBURST_SNAPSHOT_POLL_SECONDS", 2, minimum=1),
+)
+SNAPSHOT_WATCHER.subscribe(_rewarm_on_snapshot)
+ALERT_SINK = sink_from_spec(os.environ.get("CLOUDBURST_ALERT_SINK"), BASE_DIR)
+ALERT_SERVICE = (
+    AlertService(USER_STORE, _score_districts, ALERT_SINK, batch_size=env_int("CLOUDBURST_ALERT_BATCH", 500, minimum=1))
+    if ALERT_SINK is not None
+    else None
+)
+if ALERT_SERVICE is not None:
+    SNAPSHOT_WATCHER.subscribe(ALERT_SERVICE.run)
+
+
+def _districts_in_chunk(chunk: str) -> list[str]:
+    return DISTRICTS_DF.loc[DISTRICTS_DF["chunk"].str.lower() == chunk, "district"].tolist()
+
+
+STREAM_BROKER = RiskUpdateBroker(_score_districts, _districts_in_chunk)
+SNAPSHOT_WATCHER.subscribe(STREAM_BROKER.publish)
+STREAM_HEARTBEAT_SECONDS = env_int("CLOUDBURST_STREAM_HEARTBEAT_SECONDS", 15, minimum=1)
+
+
+def _insights_data_version() -> str:
+    return files_fingerprint([_results_csv(name) for name in INSIGHT_RESULT_FILES])
+
+
+def _historic_events_data_version() -> str:
+    return files_fingerprint([HISTORIC_EVENTS_PATH])
+
+
+def _detected_events_data_version() -> str:
+    return files_fingerprint([DETECTED_EVENTS_PATH])
+
+
+async def _cached_response(
+    request: Request,
+    key: tuple,
+    executor: BoundedExecutor,
+    func,
+    *args,
+    prefetch=None,
+) -> Response:
+    not_modified = RESPONSE_CACHE.not_modified_response(request, key)
+    if not_modified is not None:
+        return not_modified
+
+    entry: CachedResponse | None = RESPONSE_CACHE.get(key)
+    if entry is None:
+        if prefetch is not None:
+            await IO_EXECUTOR.run(prefetch)
+        entry = await executor.run(_build_cached_entry, key, func, *args)
+    return RESPONSE_CACHE.response(entry)
+
+
+def _build_cached_entry(key: tuple, func, *args) -> CachedResponse:
+    payload = func(*args)
+    with stage(STAGE_LATENCY, "serialize"):
+        return RESPONSE_CACHE.put(key, payload)
+
+
+def _prefetch_chunk_assets(district: str) -> None:
+    matches = _district_search(district)
+    if matches.empty:
+        return
+    chunk = str(matches.iloc[0]["chunk"])
+    # Warm the chunk caches on the I/O pool; load errors resurface as HTTP errors during inference.
+    for loader in (_chunk_feature_index, _load_model_bundle):
+        try:
+            loader(chunk)
+        except (FileNotFoundError, ValueError):
+            pass
+
+
+async def _predict_async(district: str) -> dict:
+    await IO_EXECUTOR.run(_prefetch_chunk_assets, district)
+    return await INFERENCE_EXECUTOR.run(_predict_for_district, district)
+
+
+def _shared_store_generation() -> str | None:
+    if FEATURE_STORE is None:
+        return None
+    generation = FEATURE_STORE.current_generation()
+    return generation.name if generation is not None else None
+
+
+def _cache_counts() -> dict[tuple[str, str], float]:
+    counts: dict[tuple[str, str], float] = {}
+    with _CACHE_COUNTS_LOCK:
+        for name, cached in _CACHED_LOADERS.items():
+            info = cached.cache_info()
+            counts[(name, "hit")] = _CLEARED_CACHE_COUNTS[(name, "hit")] + info.hits
+            counts[(name, "miss")] = _CLEARED_CACHE_COUNTS[(name, "miss")] + info.misses
+    response = RESPONSE_CACHE.stats()
+    counts[("response", "hit")] = response["hits"]
+    counts[("response", "miss")] = response["misses"]
+    counts[("response", "not_modified")] = response["not_modified"]
+    return counts
+
+
+METRICS.callback(
+    "cloudburst_cache_requests_total",
+    "Lookups in the model, feature and response caches by result.",
+    ("cache", "result"),
+    _cache_counts,
+    kind="counter",
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/health/live")
+async def health_live() -> dict:
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def health_ready() -> Response:
+    payload = {
+        "status": "ready" if WARMUP.ready else "not_ready",
+        "import_ms": IMPORT_MS,
+        "warmup": WARMUP.snapshot(),
     }
+    return FastJSONResponse(payload, status_code=200 if WARMUP.ready else 503)
 
 
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     latest_features_status = {}
     for chunk, path in CHUNK_TO_LATEST_FEATURES.items():
         latest_features_status[chunk] = {
@@ -575,42 +1074,140 @@ def health() -> dict:
 
     return {
         "status": "ok",
+        "ready": WARMUP.ready,
         "mode": "online_inference_only",
         "district_lookup_used": DISTRICT_LOOKUP_USED,
         "shapefile_used": DISTRICT_LOOKUP_USED,
         "district_rows": int(len(DISTRICTS_DF)),
         "models_available": {chunk: path.exists() for chunk, path in CHUNK_TO_MODEL.items()},
         "models_loaded": models_loaded,
+        "student_models": {
+            "enabled": USE_STUDENT_MODEL,
+            "available": {chunk: path.exists() for chunk, path in CHUNK_TO_STUDENT.items()},
+        },
         "latest_features_available": latest_features_status,
         "district_attributes_present": district_attributes_present,
+        "executors": {
+            INFERENCE_EXECUTOR.name: INFERENCE_EXECUTOR.stats(),
+            IO_EXECUTOR.name: IO_EXECUTOR.stats(),
+        },
+        "response_cache": RESPONSE_CACHE.stats(),
+        "user_store": USER_STORE.stats(),
+        "streams": STREAM_BROKER.stats(),
+        "shared_store": _shared_store_generation(),
     }
 
 
-@app.get("/districts")
-def list_districts(q: str | None = None, limit: int = 300) -> dict:
-    if DISTRICTS_DF.empty:
-        return {"districts": []}
-    frame = DISTRICTS_DF
-    if q:
-        frame = _district_search(q)
-    frame = frame.sort_values("district").head(max(1, min(limit, 1000)))
+@app.get("/alerts/status")
+async def alerts_status() -> dict:
     return {
-        "districts": [
-            {
-                "district": str(r["district"]),
-                "state": str(r["state"]),
-                "chunk": str(r["chunk"]),
-            }
-            for _, r in frame.iterrows()
-        ]
+        "enabled": ALERT_SERVICE is not None,
+        "sink": type(ALERT_SINK).__name__ if ALERT_SINK is not None else None,
+        "snapshot_version": SNAPSHOT_WATCHER.version,
+        "last_run": ALERT_SERVICE.last_run if ALERT_SERVICE is not None else None,
     }
 
 
+@app.post("/alerts/run")
+async def alerts_run() -> dict:
+    if ALERT_SERVICE is None:
+        raise HTTPException(status_code=503, detail="Alert delivery is disabled; set CLOUDBURST_ALERT_SINK.")
+    return await IO_EXECUTOR.run(ALERT_SERVICE.run, _prediction_data_version())
+
+
+def _split_list(value: str | list | None) -> list[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(item).strip() for item in value or [] if str(item).strip()]
+
+
+def _resolve_stream_targets(districts: list[str], chunks: list[str]) -> tuple[set[str], set[str]]:
+    if not districts and not chunks:
+        raise HTTPException(status_code=400, detail="Subscribe to at least one district or chunk.")
+    resolved = set()
+    for district in districts:
+        matches = _district_search(district)
+        if matches.empty:
+            raise HTTPException(status_code=404, detail=f"District '{district}' not found.")
+        resolved.add(str(matches.iloc[0]["district"]))
+    chunk_keys = {chunk.lower() for chunk in chunks}
+    unknown = sorted(chunk_keys - set(CHUNK_TO_MODEL))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown chunk(s): {', '.join(unknown)}")
+    return resolved, chunk_keys
+
+
+def _stream_message(kind: str, updates: list[dict]) -> dict:
+    return {"type": kind, "version": STREAM_BROKER.version, "updates": updates}
+
+
+@app.get("/stream/risk")
+async def stream_risk(request: Request, districts: str = "", chunks: str = "") -> StreamingResponse:
+    names, chunk_keys = _resolve_stream_targets(_split_list(districts), _split_list(chunks))
+    subscription = STREAM_BROKER.subscribe(names, chunk_keys)
+
+    async def events():
+        try:
+            initial = await INFERENCE_EXECUTOR.run(STREAM_BROKER.current, subscription)
+            yield b"event: snapshot\ndata: " + dumps(_stream_message("snapshot", initial)) + b"\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(timeout=STREAM_HEARTBEAT_SECONDS)
+                if batch:
+                    yield b"event: update\ndata: " + dumps(_stream_message("update", batch)) + b"\n\n"
+                else:
+                    yield b": keep-alive\n\n"
+        finally:
+            STREAM_BROKER.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/risk")
+async def risk_websocket(websocket: WebSocket) -> None:
+    await websocket.accept()
+    try:
+        request = await websocket.receive_json()
+        names, chunk_keys = _resolve_stream_targets(
+            _split_list(request.get("districts")), _split_list(request.get("chunks"))
+        )
+    except HTTPException as exc:
+        await websocket.send_json({"type": "error", "detail": exc.detail})
+        await websocket.close(code=1008)
+        return
+    except (WebSocketDisconnect, ValueError, AttributeError):
+        await websocket.close(code=1003)
+        return
+
+    subscription = STREAM_BROKER.subscribe(names, chunk_keys)
+    try:
+        initial = await INFERENCE_EXECUTOR.run(STREAM_BROKER.current, subscription)
+        await websocket.send_text(dumps(_stream_message("snapshot", initial)).decode("utf-8"))
+        while True:
+            batch = await subscription.next_batch(timeout=STREAM_HEARTBEAT_SECONDS)
+            message = _stream_message("update", batch) if batch else {"type": "ping"}
+            await websocket.send_text(dumps(message).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        STREAM_BROKER.unsubscribe(subscription)
+
+
+@app.get("/districts")
+async def list_districts(q: str | None = None, zone: str | None = None, limit: int = 300) -> dict:
+    if DISTRICT_INDEX is None:
+        return {"districts": []}
+    return {"districts": DISTRICT_INDEX.listing(q or "", zone, max(1, min(limit, 1000)))}
+
+
 @app.get("/user-profile")
-def get_user_profile(user_id: str) -> dict:
+async def get_user_profile(user_id: str) -> dict:
     if not user_id.strip():
         raise HTTPException(status_code=400, detail="user_id is required")
-    profile = _get_user_district(user_id.strip())
+    profile = await IO_EXECUTOR.run(USER_STORE.get, user_id.strip())
     if profile is None:
         return {"user_id": user_id.strip(), "preferred_district": None}
     return {
@@ -625,7 +1222,7 @@ def get_user_profile(user_id: str) -> dict:
 
 
 @app.post("/user-profile/select-district")
-def select_user_district(payload: UserDistrictSelection) -> dict:
+async def select_user_district(payload: UserDistrictSelection) -> dict:
     if DISTRICTS_DF.empty:
         raise HTTPException(status_code=404, detail="District lookup table is not loaded.")
 
@@ -637,7 +1234,7 @@ def select_user_district(payload: UserDistrictSelection) -> dict:
     district = str(district_row["district"])
     state = str(district_row["state"])
     chunk = str(district_row["chunk"])
-    _save_user_district(payload.user_id.strip(), district, state, chunk)
+    await IO_EXECUTOR.run(USER_STORE.save, payload.user_id.strip(), district, state, chunk)
     return {
         "user_id": payload.user_id.strip(),
         "selected": {
@@ -648,13 +1245,31 @@ def select_user_district(payload: UserDistrictSelection) -> dict:
     }
 
 
+async def _remember_user_district(user_id: str, district: str) -> None:
+    matches = _district_search(district)
+    if matches.empty:
+        return
+    row = matches.iloc[0]
+    district, state, chunk = str(row["district"]), str(row["state"]), str(row["chunk"])
+    if USER_STORE.is_current(user_id, district, state, chunk):
+        return
+    await IO_EXECUTOR.run(USER_STORE.save, user_id, district, state, chunk)
+
+
 @app.get("/predict")
-def predict(district: str | None = None, user_id: str | None = None) -> dict:
+async def predict(
+    request: Request,
+    district: str | None = None,
+    user_id: str | None = None,
+    window_hours: int | None = Query(None, ge=1, description="Only return the last N hours of trend data."),
+    max_points: int | None = Query(None, ge=3, description="Downsample trends to N points (LTTB)."),
+    compact: bool = Query(False, description="Omit the row-wise timeline duplicate of visualization."),
+) -> Response:
     selected_district = district.strip() if district else ""
     selected_user = user_id.strip() if user_id else ""
 
     if not selected_district and selected_user:
-        profile = _get_user_district(selected_user)
+        profile = await IO_EXECUTOR.run(USER_STORE.get, selected_user)
         if profile is None:
             raise HTTPException(status_code=404, detail="No saved district found for this user_id.")
         selected_district = str(profile["district"])
@@ -662,112 +1277,297 @@ def predict(district: str | None = None, user_id: str | None = None) -> dict:
     if not selected_district:
         raise HTTPException(status_code=400, detail="Provide district or user_id with saved district.")
 
-    result = _predict_for_district(selected_district)
+    key = ("predict", selected_district, window_hours, max_points, compact, _prediction_data_version())
+    response = await _cached_response(
+        request,
+        key,
+        INFERENCE_EXECUTOR,
+        _predict_for_district,
+        selected_district,
+        window_hours,
+        max_points,
+        compact,
+        prefetch=partial(_prefetch_chunk_assets, selected_district),
+    )
     if selected_user:
-        resolved = result.get("resolved_location", {})
-        _save_user_district(
-            selected_user,
-            str(resolved.get("district", selected_district)),
-            str(resolved.get("state", "Unknown")),
-            str(resolved.get("chunk", "")),
-        )
-    return result
+        await _remember_user_district(selected_user, selected_district)
+    return response
 
 
 @app.post("/predict-district")
-def predict_district(payload: DistrictRequest) -> dict:
-    return _predict_for_district(payload.district)
+async def predict_district(payload: DistrictRequest) -> dict:
+    return await _predict_async(payload.district)
 
 
 @app.post("/inference/district")
-def inference_district(payload: DistrictRequest) -> dict:
-    return _predict_for_district(payload.district)
+async def inference_district(payload: DistrictRequest) -> dict:
+    return await _predict_async(payload.district)
 
 
 @app.post("/predict-location")
-def predict_location(payload: dict) -> dict:
+async def predict_location(payload: dict) -> dict:
     lat_value = payload.get("latitude", payload.get("lat"))
     lon_value = payload.get("longitude", payload.get("lon"))
     if lat_value is None or lon_value is None:
         raise HTTPException(status_code=400, detail="latitude/lat and longitude/lon are required")
 
-    if DISTRICTS_DF.empty:
+    if DISTRICT_LOCATOR is None:
         raise HTTPException(status_code=404, detail="District lookup table is not loaded.")
 
-    lat = float(lat_value)
-    lon = float(lon_value)
-    deltas = (DISTRICTS_DF["centroid_lat"] - lat) ** 2 + (DISTRICTS_DF["centroid_lon"] - lon) ** 2
-    idx = int(deltas.argmin())
+    try:
+        lat = float(lat_value)
+        lon = float(lon_value)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="latitude and longitude must be numeric") from exc
+    idx, _, _ = DISTRICT_LOCATOR.locate(lat, lon)
     district_name = str(DISTRICTS_DF.iloc[idx]["district"])
 
-    return _predict_for_district(district_name)
+    return await _predict_async(district_name)
 
 
-@app.get("/model-insights")
-@app.get("/insights/model")
-def model_insights(detailed: bool = False) -> dict:
+@app.post("/locate-districts")
+async def locate_districts(payload: LocateRequest) -> dict:
+    if DISTRICT_LOCATOR is None:
+        raise HTTPException(status_code=404, detail="District lookup table is not loaded.")
+
+    lats = [point.lat for point in payload.points]
+    lons = [point.lon for point in payload.points]
+    idx, distance_km, contained = DISTRICT_LOCATOR.locate_many(lats, lons)
+    rows = DISTRICTS_DF.iloc[idx]
+    return {
+        "method": "polygon" if DISTRICT_LOCATOR.has_polygons else "nearest_centroid",
+        "results": [
+            {
+                "lat": lat,
+                "lon": lon,
+                "district": str(district),
+                "state": str(state),
+                "chunk": str(chunk),
+                "distance_km": round(float(dist), 3),
+                "contained": bool(inside),
+            }
+            for lat, lon, district, state, chunk, dist, inside in zip(
+                lats,
+                lons,
+                rows["district"],
+                rows["state"],
+                rows["chunk"],
+                distance_km,
+                contained,
+            )
+        ],
+    }
+
+
+def _model_insights_payload(offset: int, page_size: int | None, version: str) -> dict:
     models = _load_result_records("model_performance.csv")
     chunk_metrics = _load_result_records("chunk_ensemble_performance.csv")
     probability_samples = _load_result_records("risk_probabilities.csv")
+    total = len(probability_samples)
+    page_size = total if page_size is None else page_size
 
-    payload = {
+    return {
         "models": models,
         "zone_metrics": chunk_metrics,
-        "probability_samples": probability_samples if detailed else probability_samples[:200],
+        "probability_samples": probability_samples[offset : offset + page_size],
+        "probability_samples_total": total,
+        "next_cursor": next_cursor(offset, page_size, total, version),
         "generated_at": datetime.utcnow().isoformat() + "Z",
     }
-    return payload
+
+
+@app.get("/model-insights")
+@app.get("/insights/model")
+async def model_insights(
+    request: Request,
+    detailed: bool = False,
+    page_size: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+) -> Response:
+    version = _insights_data_version()
+    offset = decode_cursor(cursor, version) if cursor else 0
+    if page_size is None and (cursor or not detailed):
+        # Without detailed=true the first page keeps the historical 200-sample preview size.
+        page_size = DEFAULT_PAGE_SIZE
+    key = ("model-insights", offset, page_size, version)
+    return await _cached_response(request, key, IO_EXECUTOR, _model_insights_payload, offset, page_size, version)
+
+
+def _query_historic_events(
+    district: str,
+    state: str,
+    severity: str,
+    limit: int,
+    offset: int = 0,
+    version: str = "",
+) -> dict:
+    table: IndexedTable = RESULTS.get("historic_events")
+    positions = table.positions(
+        contains={"district": district, "state": state},
+        equals={"severity": severity},
+    )
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return {
+        "events": table.page(positions, offset, limit),
+        "total": int(len(positions)),
+        "next_cursor": next_cursor(offset, limit, len(positions), version),
+    }
 
 
 @app.get("/historical-events")
 @app.get("/events/historical")
-def historical_events(
+async def historical_events(
+    request: Request,
     district: str = "",
     state: str = "",
     severity: str = "",
-    limit: int = 200,
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> Response:
+    version = _historic_events_data_version()
+    if cursor:
+        offset = decode_cursor(cursor, version)
+    key = (
+        "historical-events",
+        district.strip().lower(),
+        state.strip().lower(),
+        severity.strip().lower(),
+        max(1, min(limit, MAX_PAGE_SIZE)),
+        max(0, offset),
+        version,
+    )
+    return await _cached_response(
+        request, key, IO_EXECUTOR, _query_historic_events, district, state, severity, limit, offset, version
+    )
+
+
+def _parse_time_param(value: str, name: str) -> pd.Timestamp | None:
+    if not value.strip():
+        return None
+    try:
+        stamp = pd.Timestamp(value.strip())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp: {value!r}") from exc
+    return stamp.tz_convert(None) if stamp.tzinfo is not None else stamp
+
+
+def _query_detected_events(
+    district: str,
+    region: str,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+    limit: int,
+    offset: int = 0,
+    version: str = "",
 ) -> dict:
-    frame = _load_historic_events()
-    if district.strip():
-        frame = frame[frame["district"].astype(str).str.contains(district.strip(), case=False, na=False)]
-    if state.strip():
-        frame = frame[frame["state"].astype(str).str.contains(state.strip(), case=False, na=False)]
-    if severity.strip():
-        frame = frame[frame["severity"].astype(str).str.lower() == severity.strip().lower()]
+    detected: DetectedEvents = RESULTS.get("detected_events")
+    table = detected.table
+    positions = detected.overlapping(
+        table.positions(contains={"district": district}, equals={"region": region}), start, end
+    )
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return {
+        "events": table.page(positions, offset, limit),
+        "total": int(len(positions)),
+        "next_cursor": next_cursor(offset, limit, len(positions), version),
+    }
 
-    if "date" in frame.columns:
-        frame = frame.sort_values("date", ascending=False, na_position="last")
 
-    return {"events": _frame_records(frame.head(max(1, min(limit, 1000))))}
+@app.get("/events/detected")
+async def detected_events(
+    request: Request,
+    district: str = "",
+    region: str = "",
+    start: str = "",
+    end: str = "",
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> Response:
+    """Label-derived cloudburst events (one row per run of positive hours), newest first."""
+    start_ts = _parse_time_param(start, "start")
+    end_ts = _parse_time_param(end, "end")
+    version = _detected_events_data_version()
+    if cursor:
+        offset = decode_cursor(cursor, version)
+    key = (
+        "detected-events",
+        district.strip().lower(),
+        region.strip().lower(),
+        str(start_ts),
+        str(end_ts),
+        max(1, min(limit, MAX_PAGE_SIZE)),
+        max(0, offset),
+        version,
+    )
+    return await _cached_response(
+        request, key, IO_EXECUTOR, _query_detected_events, district, region, start_ts, end_ts, limit, offset, version
+    )
+
+
+def _historic_events_export_chunk(chunk: pd.DataFrame, emitted: int) -> pd.DataFrame:
+    return _normalize_historic_events(chunk, first_row=emitted)
+
+
+@app.get("/exports/{dataset}")
+async def export_dataset(dataset: str, format: str = Query("ndjson", pattern="^(ndjson|csv)$")) -> StreamingResponse:
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export '{dataset}'. Available: {', '.join(sorted(EXPORT_DATASETS))}",
+        )
+    path = EXPORT_DATASETS[dataset]
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"{path.name} has not been generated yet.")
+
+    transform = _historic_events_export_chunk if dataset == "historic_events" else None
+    return StreamingResponse(
+        iter_csv_export(path, format, chunk_rows=EXPORT_CHUNK_ROWS, transform=transform),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'},
+    )
 
 
 @app.get("/historical-events/replay")
 @app.get("/events/replay")
-def replay_event(event_id: int) -> dict:
-    events = _load_replay_events()
-    if events.empty:
+async def replay_event(event_id: int) -> dict:
+    events: IndexedTable = await IO_EXECUTOR.run(RESULTS.get, "replay_events")
+    if len(events) == 0:
         raise HTTPException(status_code=404, detail="No replayable historical events available.")
 
-    match = events[events["event_id"] == event_id]
-    if match.empty:
+    match = events.match("event_id", str(event_id), exact=True)
+    if len(match) == 0:
         raise HTTPException(status_code=404, detail=f"Historical event {event_id} not found.")
 
-    row = match.iloc[0]
+    row = events.frame.iloc[int(match[0])]
     location = str(row.get("location", "")).strip()
-    replay_payload = {str(key): _clean_json_value(value) for key, value in row.items()}
+    replay_payload = events.records[int(match[0])]
 
     district_name = location.split("(")[0].strip()
     prediction = None
     if district_name:
         try:
-            prediction = _predict_for_district(district_name)
+            prediction = await _predict_async(district_name)
         except HTTPException:
             prediction = None
 
+    nearby: list[dict] = []
+    event_date = row.get("event_date")
+    if district_name and pd.notna(event_date):
+        detected: DetectedEvents = await IO_EXECUTOR.run(RESULTS.get, "detected_events")
+        window = pd.Timedelta(hours=REPLAY_WINDOW_HOURS)
+        positions = detected.table.match("district", district_name, exact=True)
+        positions = detected.overlapping(positions, event_date - window, event_date + window)
+        nearby = detected.table.page(positions, 0, len(positions))
+
     return {
         "event": replay_payload,
         "resolved_district": district_name or None,
         "prediction": prediction,
+        "detected_events": nearby,
         "message": (
             "Replay uses the archived event registry plus the closest district prediction available in the current "
             "online inference dataset."
@@ -777,12 +1577,12 @@ def replay_event(event_id: int) -> dict:
 
 @app.post("/pipeline")
 @app.post("/pipeline/run")
-def pipeline_run(payload: dict) -> dict:
+async def pipeline_run(payload: dict) -> dict:
     district = str(payload.get("district", "")).strip()
     if not district:
         raise HTTPException(status_code=400, detail="district is required")
 
-    result = _predict_for_district(district)
+    result = await _predict_async(district)
     response = {
         "mode": "online_inference_only",
         "requested_refresh": bool(payload.get("force_refresh", False)),
@@ -793,3 +1593,7 @@ def pipeline_run(payload: dict) -> dict:
     }
     response.update(result)
     return response
+
+
+# Module-level setup time (district lookup, spatial/search indexes, user store), reported by /health/ready.
+IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
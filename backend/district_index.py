@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import bisect
+import re
+from collections import defaultdict
+
+import pandas as pd
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def compact_name(text: str) -> str:
+    """Lowercase and drop spaces/punctuation so "Dehra Dun" and "Dehradun" share a key."""
+    return _NON_ALNUM.sub("", str(text).lower())
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class DistrictSearchIndex:
+    """In-memory district search built once from the district lookup table.
+
+    Matching runs on compacted names: exact match, then prefix matches from a sorted key
+    array, then substring matches (candidates narrowed by trigram postings), and finally
+    trigram-similarity fuzzy matches for transliteration variants. Result rows are kept as
+    pre-built response records so listings are list slices.
+    """
+
+    def __init__(self, frame: pd.DataFrame, fuzzy_threshold: float = 0.4) -> None:
+        self.fuzzy_threshold = fuzzy_threshold
+        self._keys = [compact_name(name) for name in frame["district"]]
+        self._chunks = [str(chunk).strip().lower() for chunk in frame["chunk"]]
+        self._records = [
+            {"district": str(district), "state": str(state), "chunk": str(chunk)}
+            for district, state, chunk in zip(frame["district"], frame["state"], frame["chunk"])
+        ]
+
+        alphabetical = sorted(range(len(self._records)), key=lambda row: (self._records[row]["district"], row))
+        self._rank = {row: rank for rank, row in enumerate(alphabetical)}
+        self._listing: dict[str | None, list[dict]] = {None: [self._records[row] for row in alphabetical]}
+        for chunk in set(self._chunks):
+            self._listing[chunk] = [self._records[row] for row in alphabetical if self._chunks[row] == chunk]
+
+        by_key = sorted(range(len(self._keys)), key=lambda row: (self._keys[row], self._rank[row]))
+        self._sorted_keys = [self._keys[row] for row in by_key]
+        self._sorted_rows = by_key
+
+        self._grams = [_trigrams(key) for key in self._keys]
+        postings: dict[str, list[int]] = defaultdict(list)
+        for row, grams in enumerate(self._grams):
+            for gram in grams:
+                postings[gram].append(row)
+        self._postings = {gram: set(rows) for gram, rows in postings.items()}
+
+    def _zone_key(self, zone: str | None) -> str | None:
+        if zone is None:
+            return None
+        key = zone.strip().lower().removesuffix(" himalaya")
+        return None if key in {"", "all"} else key
+
+    def _prefix_rows(self, key: str) -> list[int]:
+        lo = bisect.bisect_left(self._sorted_keys, key)
+        hi = bisect.bisect_right(self._sorted_keys, key + "\uffff")
+        return self._sorted_rows[lo:hi]
+
+    def _substring_rows(self, key: str) -> list[int]:
+        candidates: set[int] | None = None
+        if len(key) >= 3:
+            for i in range(len(key) - 2):
+                rows = self._postings.get(key[i : i + 3], set())
+                candidates = rows if candidates is None else candidates & rows
+                if not candidates:
+                    return []
+        pool = candidates if candidates is not None else range(len(self._keys))
+        return sorted((row for row in pool if key in self._keys[row]), key=self._rank.__getitem__)
+
+    def _fuzzy_rows(self, key: str) -> list[int]:
+        grams = _trigrams(key)
+        shared: dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for row in self._postings.get(gram, ()):
+                shared[row] += 1
+        scored = []
+        for row, count in shared.items():
+            score = 2.0 * count / (len(grams) + len(self._grams[row]))
+            if score >= self.fuzzy_threshold:
+                scored.append((-score, self._rank[row], row))
+        return [row for _, _, row in sorted(scored)]
+
+    def search(self, query: str, zone: str | None = None, fuzzy: bool = True) -> list[int]:
+        """Return matching row positions, best matches first."""
+        key = compact_name(query)
+        zone_key = self._zone_key(zone)
+        if not key:
+            return []
+
+        prefix = self._prefix_rows(key)
+        exact = [row for row in prefix if self._keys[row] == key]
+        if exact:
+            rows = exact
+        else:
+            prefix_set = set(prefix)
+            rows = prefix + [row for row in self._substring_rows(key) if row not in prefix_set]
+            if not rows and fuzzy:
+                rows = self._fuzzy_rows(key)
+
+        if zone_key is not None:
+            rows = [row for row in rows if self._chunks[row] == zone_key]
+        return rows
+
+    def listing(self, query: str = "", zone: str | None = None, limit: int = 300) -> list[dict]:
+        if not query.strip():
+            return self._listing.get(self._zone_key(zone), [])[:limit]
+        return [self._records[row] for row in self.search(query, zone)[:limit]]
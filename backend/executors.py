@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+def env_int(name: str, default: int, minimum: int = 0) -> int:
+    """Integer setting from the environment; unparsable or below ``minimum`` falls back to ``default``.
+
+    ``minimum`` is per setting: sizes and caches may be 0 (disabled), worker and batch counts may not.
+    """
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        logger.warning("Ignoring %s=%r: not an integer; using %d", name, raw, default)
+        return default
+    if value < minimum:
+        logger.warning("Ignoring %s=%d: must be at least %d; using %d", name, value, minimum, default)
+        return default
+    return value
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded backlog and queue metrics.
+
+    Requests beyond ``max_pending`` (queued + running) are rejected with a 503 instead of
+    piling up, so a burst of slow work cannot grow latency without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"cloudburst-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _call(self, enqueued_at: float, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        started = time.perf_counter()
+        wait = started - enqueued_at
+        with self._lock:
+            self._running += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._run_total += elapsed
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Server is busy ({self.name} queue full). Retry shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            self._submitted += 1
+
+        # Run in a copy of the caller's context so request-scoped context variables are visible.
+        context = contextvars.copy_context()
+        future = self._executor.submit(self._call, time.perf_counter(), context.run, (func, *args), kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Work that never started will not reach _call, so release its slot here.
+            if future.cancel():
+                with self._lock:
+                    self._pending -= 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            finished = self._completed + self._failed
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total * 1000.0 / started, 3) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000.0, 3),
+                "avg_run_ms": round(self._run_total * 1000.0 / finished, 3) if finished else 0.0,
+            }
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - non-POSIX platforms run a single worker
+    fcntl = None
+
+ROOT = Path(__file__).resolve().parents[1]
+try:
+    from backend.response_cache import files_fingerprint
+except ModuleNotFoundError:
+    sys.path.insert(0, str(ROOT))
+    from backend.response_cache import files_fingerprint
+
+CURRENT_POINTER = "CURRENT"
+# Generations kept on disk besides the current one, for workers that have not re-attached yet.
+KEEP_PREVIOUS = 1
+
+
+def _write_features(frame: pd.DataFrame, target: Path) -> None:
+    target.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for pos, name in enumerate(frame.columns):
+        series = frame.iloc[:, pos]
+        entry = {"name": str(name), "file": f"c{pos}.npy"}
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            np.save(target / entry["file"], series.to_numpy())
+            entry["kind"] = "numeric"
+        else:
+            mask = series.isna().to_numpy()
+            np.save(target / entry["file"], series.astype(str).to_numpy(dtype=str))
+            np.save(target / f"c{pos}_null.npy", mask)
+            entry["kind"] = "str"
+        columns.append(entry)
+    (target / "features.json").write_text(json.dumps({"rows": len(frame), "columns": columns}), encoding="utf-8")
+
+
+def _attach_features(source: Path) -> pd.DataFrame:
+    manifest = json.loads((source / "features.json").read_text(encoding="utf-8"))
+    data = {}
+    for entry in manifest["columns"]:
+        values = np.load(source / entry["file"], mmap_mode="r")
+        if entry["kind"] == "str":
+            values = values.astype(object)
+            values[np.load(source / entry["file"].replace(".npy", "_null.npy"))] = None
+        data[entry["name"]] = values
+    # copy=False keeps numeric columns as views on the shared, read-only memory maps.
+    return pd.DataFrame(data, copy=False)
+
+
+class SharedFeatureStore:
+    """Read-only latest-feature tables and model bundles shared by all API worker processes.
+
+    A generation directory holds one ``.npy`` file per feature column and a joblib dump of each
+    model bundle. Workers memory-map the feature columns, so numeric columns live once in the
+    page cache instead of once per worker (string columns are still materialised per worker).
+    Models are not shared: unpickling sklearn trees and an XGBoost booster copies them into
+    process memory, so each worker holds its own copy, loaded from the same generation.
+    ``CURRENT`` names the active generation; publishing a refresh builds a new generation and
+    swaps that pointer atomically. Building happens under a file lock, so when several workers
+    start together only one of them does the work.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        feature_sources: dict[str, Path],
+        model_sources: dict[str, Path],
+        read_features: Callable[[Path], pd.DataFrame] = pd.read_csv,
+    ) -> None:
+        self.root = Path(root)
+        self.feature_sources = feature_sources
+        self.model_sources = model_sources
+        self.read_features = read_features
+        self._local_lock = threading.Lock()
+
+    def source_version(self) -> str:
+        return files_fingerprint([*self.feature_sources.values(), *self.model_sources.values()])
+
+    @contextmanager
+    def _build_lock(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._local_lock, (self.root / ".lock").open("w") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def current_generation(self) -> Path | None:
+        try:
+            name = (self.root / CURRENT_POINTER).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        path = self.root / name
+        return path if name and path.is_dir() else None
+
+    def _build(self, version: str) -> Path:
+        staging = self.root / f".gen-{version}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        for chunk, path in self.feature_sources.items():
+            if path.exists():
+                _write_features(self.read_features(path), staging / chunk)
+        for chunk, path in self.model_sources.items():
+            if path.exists():
+                (staging / chunk).mkdir(parents=True, exist_ok=True)
+                joblib.dump(joblib.load(path), staging / chunk / "model.joblib")
+        staging.mkdir(parents=True, exist_ok=True)
+
+        generation = self.root / f"gen-{version}"
+        shutil.rmtree(generation, ignore_errors=True)
+        os.rename(staging, generation)
+        pointer = self.root / f".{CURRENT_POINTER}.{os.getpid()}.tmp"
+        pointer.write_text(generation.name, encoding="utf-8")
+        os.replace(pointer, self.root / CURRENT_POINTER)
+        self._prune(generation)
+        return generation
+
+    def _prune(self, current: Path) -> None:
+        older = sorted(
+            (path for path in self.root.glob("gen-*") if path != current),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in older[KEEP_PREVIOUS:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def publish(self) -> Path:
+        """Return the generation for the current sources, building it if nobody has yet."""
+        version = self.source_version()
+        current = self.current_generation()
+        if current is not None and current.name == f"gen-{version}":
+            return current
+        with self._build_lock():
+            current = self.current_generation()
+            if current is not None and current.name == f"gen-{version}":
+                return current
+            return self._build(version)
+
+    def features(self, chunk: str) -> pd.DataFrame:
+        source = self.publish() / chunk
+        if not (source / "features.json").exists():
+            raise FileNotFoundError(
+                f"Missing precomputed latest features for chunk '{chunk}'. "
+                "Run the offline pipeline to generate latest_features_<chunk>.csv."
+            )
+        return _attach_features(source)
+
+    def model(self, chunk: str) -> dict:
+        path = self.publish() / chunk / "model.joblib"
+        if not path.exists():
+            raise FileNotFoundError(f"Missing model for chunk '{chunk}'.")
+        return joblib.load(path)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Publish a shared feature/model generation for API workers.")
+    parser.add_argument("--store_dir", default=os.getenv("CLOUDBURST_SHARED_STORE_DIR", "data/shared_store"))
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    from backend import app as api
+
+    store = SharedFeatureStore(
+        Path(args.store_dir),
+        api.CHUNK_TO_LATEST_FEATURES,
+        api.CHUNK_TO_MODEL,
+        read_features=api._read_latest_features_csv,
+    )
+    generation = store.publish()
+    print(f"Current generation: {generation}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pandas as pd
+from fastapi import HTTPException
+
+from backend.serialization import dumps, frame_records
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def encode_cursor(offset: int, version: str) -> str:
+    raw = json.dumps({"o": int(offset), "v": version}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """Offset stored in an opaque cursor; rejects cursors issued for an older data version."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(state["o"])
+        issued_for = str(state["v"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.") from exc
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    if issued_for != version:
+        raise HTTPException(
+            status_code=409,
+            detail="The underlying results changed since this cursor was issued; restart pagination.",
+        )
+    return offset
+
+
+def next_cursor(offset: int, page_size: int, total: int, version: str) -> str | None:
+    end = offset + page_size
+    return encode_cursor(end, version) if end < total else None
+
+
+def iter_csv_export(
+    path: Path,
+    fmt: str,
+    chunk_rows: int = 5000,
+    transform: Callable[[pd.DataFrame, int], pd.DataFrame] | None = None,
+) -> Iterator[bytes]:
+    """Stream a CSV table as NDJSON or CSV, reading ``chunk_rows`` rows at a time.
+
+    ``transform`` receives each chunk and the number of rows already emitted, so it can
+    normalize columns or number rows consistently with the in-memory table.
+    """
+    emitted = 0
+    with pd.read_csv(path, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            if transform is not None:
+                chunk = transform(chunk, emitted)
+            if fmt == "csv":
+                yield chunk.to_csv(index=False, header=emitted == 0).encode("utf-8")
+            else:
+                yield b"".join(dumps(record) + b"\n" for record in frame_records(chunk))
+            emitted += len(chunk)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from fastapi import Request, Response
+
+from backend.serialization import dumps
+
+
+def files_fingerprint(paths: Iterable[Path]) -> str:
+    """Cheap data-version token built from file sizes and modification times."""
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+def make_etag(key: tuple) -> str:
+    # Weak validator: the body for a key + data version is stable apart from generation timestamps.
+    return 'W/"' + hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    etag: str
+    payload: dict
+    body: bytes
+
+
+class ResponseCache:
+    """Bounded LRU of serialized JSON responses keyed by route, params and data version."""
+
+    def __init__(self, max_entries: int = 256, max_age: int = 60) -> None:
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, payload: dict) -> CachedResponse:
+        body = dumps(payload)
+        entry = CachedResponse(etag=make_etag(key), payload=payload, body=body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def headers(self, etag: str) -> dict[str, str]:
+        return {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}, must-revalidate"}
+
+    def not_modified_response(self, request: Request, key: tuple) -> Response | None:
+        etag = make_etag(key)
+        if not etag_matches(request.headers.get("if-none-match"), etag):
+            return None
+        with self._lock:
+            self.not_modified += 1
+        return Response(status_code=304, headers=self.headers(etag))
+
+    def response(self, entry: CachedResponse) -> Response:
+        return Response(content=entry.body, media_type="application/json", headers=self.headers(entry.etag))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def _build_index(values: pd.Series) -> dict[str, np.ndarray]:
+    codes, uniques = pd.factorize(values.astype(str).str.lower(), sort=False)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)))
+    starts = np.concatenate([[0], bounds[:-1]])
+    return {str(key): order[start:end] for key, start, end in zip(uniques, starts, bounds)}
+
+
+class IndexedTable:
+    """Result table with precomputed JSON records and lowercase value -> row-position indexes.
+
+    Row positions follow the frame order, so filtered positions stay in display order and
+    pagination is a slice of the matching positions.
+    """
+
+    def __init__(self, frame: pd.DataFrame, records: list[dict], index_columns: Iterable[str] = ()) -> None:
+        self.frame = frame
+        self.records = records
+        self.indexes = {col: _build_index(frame[col]) for col in index_columns if col in frame.columns}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def match(self, column: str, needle: str, exact: bool = False) -> np.ndarray:
+        index = self.indexes.get(column, {})
+        needle = needle.strip().lower()
+        if exact:
+            keys = [needle] if needle in index else []
+        else:
+            keys = [key for key in index if needle in key]
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([index[key] for key in keys]))
+
+    def positions(self, contains: dict[str, str] | None = None, equals: dict[str, str] | None = None) -> np.ndarray:
+        selected: np.ndarray | None = None
+        filters = [(col, value, False) for col, value in (contains or {}).items()]
+        filters += [(col, value, True) for col, value in (equals or {}).items()]
+        for column, value, exact in filters:
+            if not value.strip():
+                continue
+            matched = self.match(column, value, exact=exact)
+            selected = matched if selected is None else np.intersect1d(selected, matched, assume_unique=True)
+        if selected is None:
+            return np.arange(len(self.records))
+        return selected
+
+    def page(self, positions: np.ndarray, offset: int, limit: int) -> list[dict]:
+        return [self.records[i] for i in positions[offset : offset + limit]]
+
+
+@dataclass
+class _Entry:
+    path: Path
+    loader: Callable[[Path], Any]
+    signature: tuple | None = None
+    value: Any = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ResultsRegistry:
+    """Loads named result tables once and reloads them when the backing file changes."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, _Entry] = {}
+
+    def register(self, name: str, path: Path, loader: Callable[[Path], Any]) -> None:
+        self._entries[name] = _Entry(path=path, loader=loader)
+
+    @staticmethod
+    def _signature(path: Path) -> tuple | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        signature = self._signature(entry.path)
+        if entry.signature == signature and entry.value is not None:
+            return entry.value
+        with entry.lock:
+            if entry.signature != signature or entry.value is None:
+                entry.value = entry.loader(entry.path)
+                entry.signature = signature
+            return entry.value
+
+    def invalidate(self, name: str | None = None) -> None:
+        for key, entry in self._entries.items():
+            if name is None or key == name:
+                with entry.lock:
+                    entry.value = None
+                    entry.signature = None
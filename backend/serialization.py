@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - orjson is listed in backend/requirements.txt
+    orjson = None
+
+
+def _column_values(series: pd.Series) -> list:
+    """JSON-ready Python values for one column; missing cells become None."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.map(lambda ts: ts.isoformat(), na_action="ignore")
+    elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return series.tolist()
+    else:
+        values = series
+    mask = values.isna().to_numpy()
+    if not mask.any():
+        return values.tolist()
+    out = values.astype(object).to_numpy()
+    out[mask] = None
+    return out.tolist()
+
+
+def frame_records(df: pd.DataFrame) -> list[dict]:
+    """Row records built column-wise: one vectorized NaN mask and ``tolist`` per column."""
+    keys = [str(col) for col in df.columns]
+    columns = [_column_values(df.iloc[:, pos]) for pos in range(df.shape[1])]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return jsonable_encoder(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize a response payload to compact UTF-8 JSON.
+
+    orjson writes NaN/inf as null; the stdlib fallback rejects them, as the old encoder did.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered through :func:`dumps` (orjson when installed)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
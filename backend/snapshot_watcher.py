@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWatcher:
+    """Polls a data-version function and calls listeners when the version changes.
+
+    The first observed version counts as a change, so listeners also run once at startup.
+    Listeners run sequentially on the watcher thread; a failing listener is logged and does
+    not stop the others.
+    """
+
+    def __init__(self, version_fn: Callable[[], str], interval: float = 30.0) -> None:
+        self.version_fn = version_fn
+        self.interval = interval
+        self.version: str | None = None
+        self._listeners: list[Callable[[str], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        self._listeners.append(listener)
+
+    def check(self) -> bool:
+        version = self.version_fn()
+        if version == self.version:
+            return False
+        self.version = version
+        for listener in list(self._listeners):
+            try:
+                listener(version)
+            except Exception:
+                logger.exception("Snapshot listener %r failed for version %s", listener, version)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Snapshot version check failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is not None or not self._listeners:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="snapshot-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Callable
+
+# Fields compared between snapshots; a district is re-sent only when one of them changes.
+DELTA_FIELDS = ("risk_tier", "alert_tier", "probability", "feature_time", "precursors")
+
+
+def _delta_message(score: dict, version: str) -> dict:
+    return {
+        "district": score["district"],
+        "chunk": score["chunk"],
+        "risk_tier": score["risk_tier"],
+        "alert_tier": score["alert_tier"],
+        "probability": score["probability"],
+        "feature_time": score["feature_time"],
+        "precursors": score["precursors"],
+        "version": version,
+    }
+
+
+class RiskSubscription:
+    """One streaming client. Pending updates are coalesced per district, so a slow client
+    only ever holds the latest message for each district rather than an unbounded backlog."""
+
+    def __init__(self, districts: set[str], chunks: set[str], loop: asyncio.AbstractEventLoop) -> None:
+        self.districts = districts
+        self.chunks = chunks
+        self.loop = loop
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def wants(self, district: str, chunk: str) -> bool:
+        return district in self.districts or chunk in self.chunks
+
+    def push(self, messages: list[dict]) -> None:
+        for message in messages:
+            if self.wants(message["district"], message["chunk"]):
+                self._pending[message["district"]] = message
+        if self._pending:
+            self._ready.set()
+
+    async def next_batch(self, timeout: float | None = None) -> list[dict]:
+        """Wait for updates; returns an empty list when ``timeout`` elapses first."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+
+class RiskUpdateBroker:
+    """Fans district risk deltas out to streaming clients after each snapshot reload.
+
+    ``publish`` runs on the snapshot watcher thread: it scores only districts somebody is
+    subscribed to (directly or via their chunk), keeps the last broadcast state per
+    district, and hands changed districts to each client's event loop.
+    """
+
+    def __init__(
+        self,
+        scorer: Callable[[list[str]], dict[str, dict]],
+        districts_in_chunk: Callable[[str], list[str]],
+    ) -> None:
+        self.scorer = scorer
+        self.districts_in_chunk = districts_in_chunk
+        self.version: str | None = None
+        self._state: dict[str, dict] = {}
+        self._subscriptions: set[RiskSubscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def _targets(self, subscriptions) -> list[str]:
+        targets: set[str] = set()
+        for sub in subscriptions:
+            targets |= sub.districts
+            for chunk in sub.chunks:
+                targets.update(self.districts_in_chunk(chunk))
+        return sorted(targets)
+
+    def current(self, subscription: RiskSubscription) -> list[dict]:
+        """Latest known state for a new subscription, scoring districts not seen yet."""
+        with self._lock:
+            version = self.version or ""
+            missing = [d for d in self._targets([subscription]) if d not in self._state]
+            if missing:
+                for district, score in self.scorer(missing).items():
+                    self._state[score["district"]] = _delta_message(score, version)
+            return [msg for name, msg in self._state.items() if subscription.wants(name, msg["chunk"])]
+
+    def subscribe(self, districts: set[str], chunks: set[str]) -> RiskSubscription:
+        subscription = RiskSubscription(districts, chunks, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RiskSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, version: str) -> None:
+        with self._lock:
+            self.version = version
+            subscriptions = list(self._subscriptions)
+            if not subscriptions:
+                # Nobody is listening; drop cached state so it is rescored on the next subscribe.
+                self._state.clear()
+                return
+            changed = []
+            for score in self.scorer(self._targets(subscriptions)).values():
+                message = _delta_message(score, version)
+                before = self._state.get(score["district"])
+                if before is None or any(before[f] != message[f] for f in DELTA_FIELDS):
+                    changed.append(message)
+                self._state[score["district"]] = message
+            self.published += len(changed)
+
+        if changed:
+            for sub in subscriptions:
+                sub.loop.call_soon_threadsafe(sub.push, changed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "tracked_districts": len(self._state),
+                "published_updates": self.published,
+                "version": self.version,
+            }
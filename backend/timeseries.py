@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling over a regularly spaced series.
+
+    Returns the positions of the ``n_out`` points that best preserve the visual shape of ``y``;
+    the first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor]) - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(area.argmax())
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def normalized_composite(columns: list[np.ndarray]) -> np.ndarray:
+    """Sum of min-max scaled series, so downsampling keeps peaks from every trend line."""
+    total = np.zeros(len(columns[0]) if columns else 0)
+    for values in columns:
+        span = float(values.max() - values.min()) if len(values) else 0.0
+        if span > 0:
+            total += (values - values.min()) / span
+    return total
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_preferences (
+    user_id TEXT PRIMARY KEY,
+    district TEXT NOT NULL,
+    state TEXT,
+    chunk TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO user_preferences (user_id, district, state, chunk, updated_at)
+VALUES (:user_id, :district, :state, :chunk, :updated_at)
+ON CONFLICT(user_id) DO UPDATE SET
+    district=excluded.district,
+    state=excluded.state,
+    chunk=excluded.chunk,
+    updated_at=excluded.updated_at
+"""
+
+
+class UserStore:
+    """User preferred-district store on SQLite.
+
+    Connections are pooled and opened in WAL mode so readers never wait on the writer.
+    Profiles are served from an in-process LRU (read-through), saves that would not change
+    the stored district are skipped, and real changes are queued to a single writer thread
+    that commits them in batches. The cache is per process: with several workers a profile
+    changed by one worker is seen by the others only after it drops out of their cache.
+
+    A batch that fails to commit is retried ``write_retries`` times. If it still fails, its
+    profiles are dropped from the cache (unless a newer save replaced them) so reads fall
+    back to what the database really holds, and they are counted as ``failed_writes``.
+
+    Until its batch commits, the latest queued profile per user is also kept in ``_pending``.
+    Reads check it before the database, so a save is visible even when the cache is disabled
+    or has already evicted it.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool_size: int = 4,
+        cache_entries: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.2,
+        write_retries: int = 3,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.cache_entries = max(0, cache_entries)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.write_retries = max(0, write_retries)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: dict[str, dict] = {}
+        self._writes: queue.Queue = queue.Queue()
+        self._closed = False
+        self._counters = {
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "skipped_writes": 0,
+            "written": 0,
+            "batches": 0,
+            "retried_batches": 0,
+            "failed_writes": 0,
+        }
+        self._writer = threading.Thread(target=self._write_loop, name="user-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _remember(self, profile: dict) -> None:
+        with self._cache_lock:
+            self._remember_locked(profile)
+
+    def _remember_locked(self, profile: dict) -> None:
+        if self.cache_entries == 0:
+            return
+        self._cache[profile["user_id"]] = profile
+        self._cache.move_to_end(profile["user_id"])
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    def _cached(self, user_id: str) -> dict | None:
+        with self._cache_lock:
+            profile = self._cache.get(user_id)
+            if profile is not None:
+                self._cache.move_to_end(user_id)
+                self._counters["cache_hits"] += 1
+            else:
+                self._counters["cache_misses"] += 1
+            return profile
+
+    def get(self, user_id: str) -> dict | None:
+        profile = self._cached(user_id)
+        if profile is not None:
+            return dict(profile)
+        with self._cache_lock:
+            profile = self._pending.get(user_id)
+        if profile is not None:
+            return dict(profile)
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT user_id, district, state, chunk, updated_at FROM user_preferences WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        profile = dict(zip(("user_id", "district", "state", "chunk", "updated_at"), row))
+        self._remember(profile)
+        return dict(profile)
+
+    def is_current(self, user_id: str, district: str, state: str, chunk: str) -> bool:
+        """True when the cached or queued profile already holds this district; never touches the database."""
+        with self._cache_lock:
+            profile = self._cache.get(user_id) or self._pending.get(user_id)
+        return profile is not None and (profile["district"], profile["state"], profile["chunk"]) == (
+            district,
+            state,
+            chunk,
+        )
+
+    def save(self, user_id: str, district: str, state: str, chunk: str) -> bool:
+        """Queue a preferred-district change. Returns False when the stored value already matches.
+
+        Raises ``RuntimeError`` once the store is closed, since no writer is left to commit it.
+        """
+        if self._closed:
+            raise RuntimeError("UserStore is closed")
+        current = self.get(user_id)
+        if current is not None and (current["district"], current["state"], current["chunk"]) == (
+            district,
+            state,
+            chunk,
+        ):
+            with self._cache_lock:
+                self._counters["skipped_writes"] += 1
+            return False
+
+        profile = {
+            "user_id": user_id,
+            "district": district,
+            "state": state,
+            "chunk": chunk,
+            "updated_at": pd.Timestamp.utcnow().isoformat(),
+        }
+        with self._cache_lock:
+            # Checked under the lock ``close`` takes, so nothing is queued behind the stop marker.
+            if self._closed:
+                raise RuntimeError("UserStore is closed")
+            self._remember_locked(profile)
+            self._pending[user_id] = profile
+            self._writes.put(profile)
+        return True
+
+    def subscribers_by_district(self) -> dict[str, list[str]]:
+        """Saved user ids grouped by preferred district (queued writes are flushed first)."""
+        self.flush()
+        grouped: dict[str, list[str]] = {}
+        with self._connection() as conn:
+            for district, user_id in conn.execute(
+                "SELECT district, user_id FROM user_preferences ORDER BY district, user_id"
+            ):
+                grouped.setdefault(district, []).append(user_id)
+        return grouped
+
+    def _next_batch(self) -> tuple[list[dict], bool]:
+        first = self._writes.get()
+        if first is _STOP:
+            return [], True
+        batch, stop = [first], False
+        # Linger briefly so bursts of saves share one transaction.
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _commit(self, profiles: list[dict]) -> None:
+        with self._connection() as conn:
+            try:
+                conn.executemany(_UPSERT, profiles)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+    def _persist(self, profiles: list[dict]) -> None:
+        for attempt in range(self.write_retries + 1):
+            try:
+                self._commit(profiles)
+            except sqlite3.Error:
+                if attempt < self.write_retries:
+                    logger.warning("Retrying %d user preference update(s)", len(profiles), exc_info=True)
+                    with self._cache_lock:
+                        self._counters["retried_batches"] += 1
+                    time.sleep(min(2.0, 0.1 * 2**attempt))
+                    continue
+                logger.exception("Failed to persist %d user preference update(s)", len(profiles))
+                with self._cache_lock:
+                    for profile in profiles:
+                        # A newer save for this user is still queued; keep that one cached.
+                        if self._cache.get(profile["user_id"]) is profile:
+                            del self._cache[profile["user_id"]]
+                        self._settle_locked(profile)
+                    self._counters["failed_writes"] += len(profiles)
+                return
+            with self._cache_lock:
+                for profile in profiles:
+                    self._settle_locked(profile)
+                self._counters["written"] += len(profiles)
+                self._counters["batches"] += 1
+            return
+
+    def _settle_locked(self, profile: dict) -> None:
+        if self._pending.get(profile["user_id"]) is profile:
+            del self._pending[profile["user_id"]]
+
+    def _write_loop(self) -> None:
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                # Only the latest change per user needs to reach the database.
+                latest = {profile["user_id"]: profile for profile in batch}
+                self._persist(list(latest.values()))
+                for _ in batch:
+                    self._writes.task_done()
+            if stop:
+                self._writes.task_done()
+                return
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._writes.join()
+
+    def close(self) -> None:
+        with self._cache_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._writes.put(_STOP)
+        self._writer.join()
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            return {
+                **self._counters,
+                "cached_profiles": len(self._cache),
+                "pending_writes": self._writes.qsize(),
+            }
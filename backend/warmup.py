@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+import pandas as pd
+
+
+class StageTimer:
+    """Collects named stage durations in milliseconds."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    def time(self, stage: str, func: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+
+class WarmupTracker:
+    """Runs a warm-up function for every chunk in parallel and records readiness per chunk.
+
+    ``warm_fn(chunk, timer)`` loads and validates a chunk and raises on failure. The tracker is
+    ready once a run has finished and either every chunk succeeded or, with
+    ``require_all=False``, at least one did. While a re-warm is running (after a data
+    reload) readiness keeps reflecting the previous run.
+    """
+
+    def __init__(self, require_all: bool = True) -> None:
+        self.require_all = require_all
+        self.state = "pending"
+        self.version: str | None = None
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.duration_ms: float | None = None
+        self.chunks: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _warm_one(self, chunk: str, warm_fn: Callable[[str, StageTimer], dict]) -> dict:
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            details = warm_fn(chunk, timer) or {}
+            result = {"ready": True, **details}
+        except Exception as exc:
+            result = {"ready": False, "error": str(exc)}
+        result["timings_ms"] = {**timer.timings, "total": round((time.perf_counter() - start) * 1000, 1)}
+        return result
+
+    def run(self, chunks: Iterable[str], warm_fn: Callable[[str, StageTimer], dict], version: str | None = None) -> dict:
+        chunks = list(chunks)
+        with self._lock:
+            self.state = "warming"
+            self.started_at = pd.Timestamp.utcnow().isoformat()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, len(chunks)), thread_name_prefix="warmup") as pool:
+                results = dict(zip(chunks, pool.map(lambda chunk: self._warm_one(chunk, warm_fn), chunks)))
+            self.chunks = results
+            self.version = version
+            self.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            self.finished_at = pd.Timestamp.utcnow().isoformat()
+            self.state = "done"
+        return self.snapshot()
+
+    def skip(self) -> None:
+        self.state = "skipped"
+        self.finished_at = pd.Timestamp.utcnow().isoformat()
+
+    @property
+    def ready(self) -> bool:
+        if self.finished_at is None:
+            return False
+        flags = [result["ready"] for result in self.chunks.values()]
+        if not flags:
+            return True
+        return all(flags) if self.require_all else any(flags)
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "require_all_chunks": self.require_all,
+            "data_version": self.version,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+            "chunks": self.chunks,
+        }
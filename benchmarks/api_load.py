@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "api_load.json"
+
+# Weighted request mixes; each entry is (request kind, share of traffic).
+SCENARIOS = {
+    "predict": [("predict", 1.0)],
+    "search": [("districts", 1.0)],
+    "locate": [("predict_location", 1.0)],
+    "insights": [("model_insights", 1.0)],
+    "mixed": [("predict", 0.5), ("districts", 0.3), ("predict_location", 0.1), ("model_insights", 0.1)],
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency and throughput benchmark for the FastAPI backend.")
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead of the in-process app.")
+    parser.add_argument("--pid", type=int, default=None, help="Server PID for RSS readings when using --url.")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=sorted(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save_baseline", action="store_true", help="Write results to --baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail when p95 regresses past --tolerance.")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 increase.")
+    return parser.parse_args()
+
+
+def rss_mb(pid: int | None = None) -> float | None:
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def _request_for(kind: str, rng: random.Random, districts: list[dict]) -> tuple[str, str, dict]:
+    district = rng.choice(districts)
+    if kind == "predict":
+        return "GET", "/predict", {"params": {"district": district["district"], "compact": "true"}}
+    if kind == "districts":
+        name = district["district"]
+        return "GET", "/districts", {"params": {"q": name[: rng.randint(2, max(2, min(5, len(name))))]}}
+    if kind == "predict_location":
+        lat = district["centroid_lat"] + rng.uniform(-0.05, 0.05)
+        lon = district["centroid_lon"] + rng.uniform(-0.05, 0.05)
+        return "POST", "/predict-location", {"json": {"lat": lat, "lon": lon}}
+    return "GET", "/model-insights", {}
+
+
+def _load_api():
+    try:
+        from backend import app as api
+    except ModuleNotFoundError:
+        sys.path.insert(0, str(ROOT))
+        from backend import app as api
+    return api
+
+
+def _district_sample(api) -> list[dict]:
+    # Centroids come from the local lookup table; /districts does not return them.
+    frame = api.DISTRICTS_DF
+    if frame.empty:
+        raise SystemExit("No district lookup table found; nothing to benchmark with.")
+    return frame[["district", "centroid_lat", "centroid_lon"]].to_dict(orient="records")
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    districts: list[dict],
+    total: int,
+    concurrency: int,
+    seed: int,
+    pid: int | None,
+) -> dict:
+    rng = random.Random(seed)
+    kinds, weights = zip(*SCENARIOS[name])
+    plan = [_request_for(rng.choices(kinds, weights)[0], rng, districts) for _ in range(total)]
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    cursor = iter(plan)
+
+    async def worker() -> None:
+        for method, path, kwargs in cursor:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ms = np.asarray(latencies) * 1000.0
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "error_rate": round(1.0 - ok / total, 4),
+        "statuses": statuses,
+        "rss_mb": rss_mb(pid),
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    api = _load_api()
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=60)
+        lifespan = None
+        pid = args.pid
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=60)
+        # Run start-up/shutdown hooks (warm-up, watchers) as uvicorn would.
+        lifespan = api.app.router.lifespan_context(api.app)
+        await lifespan.__aenter__()
+        pid = None
+
+    results = {}
+    try:
+        districts = _district_sample(api)
+        for offset, name in enumerate(args.scenarios):
+            results[name] = await run_scenario(
+                client, name, districts, args.requests, args.concurrency, args.seed + offset, pid
+            )
+            row = results[name]
+            print(
+                f"{name:>9}: {row['throughput_rps']:8.1f} req/s  p50={row['p50_ms']:7.2f}ms  "
+                f"p95={row['p95_ms']:7.2f}ms  p99={row['p99_ms']:7.2f}ms  errors={row['error_rate']:.1%}  "
+                f"rss={row['rss_mb']} MB"
+            )
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def compare(results: dict, baseline_path: Path, tolerance: float) -> list[str]:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["scenarios"]
+    regressions = []
+    for name, row in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        limit = before["p95_ms"] * (1.0 + tolerance)
+        if row["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {row['p95_ms']}ms > {limit:.2f}ms (baseline {before['p95_ms']}ms)")
+    return regressions
+
+
+def main() -> None:
+    args = parse_args()
+    results = asyncio.run(benchmark(args))
+    baseline_path = Path(args.baseline)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "target": args.url or "in-process",
+            "scenarios": results,
+        }
+        baseline_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Saved baseline: {baseline_path}")
+
+    if args.compare:
+        if not baseline_path.exists():
+            raise SystemExit(f"No baseline at {baseline_path}; run with --save_baseline first.")
+        regressions = compare(results, baseline_path, args.tolerance)
+        if regressions:
+            print("Latency regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            raise SystemExit(1)
+        print("No p95 regressions beyond tolerance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+ROOT = Path(__file__).resolve().parents[1]
+try:
+    from src.common.regions import REGION_BBOXES
+except ModuleNotFoundError:
+    sys.path.insert(0, str(ROOT))
+    from src.common.regions import REGION_BBOXES
+
+STAGES = [
+    "extract_era5_district_features",
+    "extract_imerg_district_halfhourly",
+    "aggregate_imerg",
+    "merge_era5_imerg",
+    "build_features",
+    "create_cloudburst_labels",
+    "generate_latest_features",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time the offline pipeline stages on synthetic ERA5/IMERG granules and district polygons."
+    )
+    parser.add_argument("--region", default="central", choices=sorted(REGION_BBOXES))
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--districts", type=int, default=24)
+    parser.add_argument("--era5_step", type=float, default=0.25, help="ERA5 grid spacing in degrees.")
+    parser.add_argument("--imerg_step", type=float, default=0.1, help="IMERG grid spacing in degrees.")
+    parser.add_argument("--start", default="2024-07-01")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--workdir", default=None, help="Fixture/output directory (default: a temporary one).")
+    parser.add_argument("--keep", action="store_true", help="Keep the working directory afterwards.")
+    parser.add_argument("--output", default=str(ROOT / "results" / "pipeline_benchmark.json"))
+    return parser.parse_args()
+
+
+def _axis(low: float, high: float, step: float) -> np.ndarray:
+    return np.round(low + step / 2 + step * np.arange(int(math.floor((high - low) / step))), 4)
+
+
+def write_districts(path: Path, bbox: list[float], count: int) -> None:
+    """Tile the bbox with ``count`` rectangular districts in a roughly square layout."""
+    north, west, south, east = bbox
+    cols = max(1, int(math.ceil(math.sqrt(count * (east - west) / (north - south)))))
+    rows = int(math.ceil(count / cols))
+    width, height = (east - west) / cols, (north - south) / rows
+    features = []
+    for idx in range(count):
+        row, col = divmod(idx, cols)
+        x0, y0 = west + col * width, south + row * height
+        ring = [[x0, y0], [x0 + width, y0], [x0 + width, y0 + height], [x0, y0 + height], [x0, y0]]
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"district_id": f"D{idx:04d}", "district_name": f"District {idx:04d}"},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            }
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+
+
+def write_era5(raw_dir: Path, bbox: list[float], start: pd.Timestamp, days: int, step: float, rng) -> int:
+    """One NetCDF per day under ``instant/`` and ``accum/``, laid out like the CDS downloads."""
+    north, west, south, east = bbox
+    lat = _axis(south, north, step)[::-1]  # ERA5 latitudes run north to south
+    lon = _axis(west, east, step)
+    shape = (24, len(lat), len(lon))
+    for folder in ("instant", "accum"):
+        (raw_dir / folder).mkdir(parents=True, exist_ok=True)
+
+    for day in range(days):
+        times = pd.date_range(start + pd.Timedelta(days=day), periods=24, freq="h")
+        diurnal = np.sin(np.arange(24) / 24 * 2 * np.pi)[:, None, None]
+        coords = {"valid_time": times, "latitude": lat, "longitude": lon}
+        dims = ("valid_time", "latitude", "longitude")
+        instant = xr.Dataset(
+            {
+                "t2m": (dims, (293.0 + 6 * diurnal + rng.normal(0, 1.5, shape)).astype("float32")),
+                "u10": (dims, rng.normal(0, 3, shape).astype("float32")),
+                "v10": (dims, rng.normal(0, 3, shape).astype("float32")),
+                "sp": (dims, (85000 + 400 * diurnal + rng.normal(0, 150, shape)).astype("float32")),
+                "tcwv": (dims, rng.gamma(8.0, 5.0, shape).astype("float32")),
+            },
+            coords=coords,
+        )
+        accum = xr.Dataset({"tp": (dims, (rng.gamma(0.3, 0.004, shape)).astype("float32"))}, coords=coords)
+        stamp = times[0].strftime("%Y%m%d")
+        instant.to_netcdf(raw_dir / "instant" / f"era5_{stamp}.nc")
+        accum.to_netcdf(raw_dir / "accum" / f"era5_{stamp}.nc")
+    return days * 2
+
+
+def write_imerg(raw_dir: Path, bbox: list[float], start: pd.Timestamp, days: int, step: float, rng) -> int:
+    """Half-hourly HDF5 granules with a ``Grid/precipitation`` variable and IMERG file names."""
+    north, west, south, east = bbox
+    lat = _axis(south, north, step)
+    lon = _axis(west, east, step)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for slot in pd.date_range(start, periods=days * 48, freq="30min"):
+        rain = rng.gamma(0.2, 2.0, (1, len(lat), len(lon)))
+        # Occasional convective bursts so the label quantiles have a tail to find.
+        if rng.random() < 0.05:
+            rain *= rng.uniform(5, 20)
+        rain[rng.random(rain.shape) < 0.01] = -9999.9
+        grid = xr.Dataset(
+            {"precipitation": (("time", "lat", "lon"), rain.astype("float32"))},
+            coords={"time": [0], "lat": lat, "lon": lon},
+        )
+        end = slot + pd.Timedelta(minutes=29, seconds=59)
+        name = (
+            f"3B-HHR.MS.MRG.3IMERG.{slot:%Y%m%d}-S{slot:%H%M%S}-E{end:%H%M%S}."
+            f"{slot.hour * 60 + slot.minute:04d}.V07B.HDF5"
+        )
+        grid.to_netcdf(raw_dir / name, group="Grid", engine="h5netcdf")
+        count += 1
+    return count
+
+
+def _csv_rows(path: Path) -> int:
+    if not path.exists():
+        return 0
+    with path.open("rb") as handle:
+        return max(0, sum(1 for _ in handle) - 1)
+
+
+def run_stage(name: str, script: str, args: list[str], inputs: list[Path], output: Path) -> dict:
+    """Run one stage in a child process; wall time and the child's own peak RSS come from wait4."""
+    cmd = [sys.executable, script, *args]
+    print(f"Running {name}: {' '.join(cmd)}")
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed at {script} (exit {proc.returncode})")
+
+    rows = _csv_rows(output)
+    input_mb = sum(path.stat().st_size for path in inputs if path.is_file()) / 1e6
+    return {
+        "seconds": round(elapsed, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "input_mb": round(input_mb, 2),
+        "rows_out": rows,
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+        "input_mb_per_s": round(input_mb / elapsed, 2) if elapsed else None,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    bbox = REGION_BBOXES[args.region]
+    start = pd.Timestamp(args.start)
+    work = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix="cloudburst_bench_"))
+    work = work.resolve()
+    region = args.region
+
+    districts = work / "districts.geojson"
+    era5_raw = work / "raw" / "era5"
+    imerg_raw = work / "raw" / "imerg"
+    processed = work / "processed"
+    processed.mkdir(parents=True, exist_ok=True)
+
+    print(f"Generating fixtures in {work}")
+    write_districts(districts, bbox, args.districts)
+    era5_files = write_era5(era5_raw / region, bbox, start, args.days, args.era5_step, rng)
+    imerg_files = write_imerg(imerg_raw / region, bbox, start, args.days, args.imerg_step, rng)
+    print(f"Wrote {era5_files} ERA5 files, {imerg_files} IMERG granules, {args.districts} districts")
+
+    era5_csv = processed / f"era5_district_features_{region}.csv"
+    imerg_halfhourly = processed / f"imerg_halfhourly_district_{region}.csv"
+    imerg_hourly = processed / f"imerg_hourly_{region}.csv"
+    merged = processed / "merged.csv"
+    featured = processed / "features.csv"
+    labeled = processed / "labeled.csv"
+    district_args = ["--districts_file", str(districts), "--region", region]
+    end = (start + pd.Timedelta(days=args.days)).isoformat()
+
+    plan = {
+        "extract_era5_district_features": (
+            "src/data/district/extract_era5_district_features.py",
+            [*district_args, "--raw_dir", str(era5_raw), "--start", start.isoformat(), "--end", end,
+             "--output_csv", str(era5_csv)],
+            sorted(era5_raw.rglob("*.nc")),
+            era5_csv,
+        ),
+        "extract_imerg_district_halfhourly": (
+            "src/data/district/extract_imerg_district_halfhourly.py",
+            [*district_args, "--raw_dir", str(imerg_raw), "--output_csv", str(imerg_halfhourly)],
+            sorted(imerg_raw.rglob("*.HDF5")),
+            imerg_halfhourly,
+        ),
+        "aggregate_imerg": (
+            "src/data/imerg/aggregate_imerg.py",
+            ["--region", region, "--input_csv", str(imerg_halfhourly), "--output_csv", str(imerg_hourly)],
+            [imerg_halfhourly],
+            imerg_hourly,
+        ),
+        "merge_era5_imerg": (
+            "src/data/imerg/merge_era5_imerg.py",
+            ["--regions", region, "--era5_pattern", str(processed / "era5_district_features_{region}.csv"),
+             "--imerg_pattern", str(processed / "imerg_hourly_{region}.csv"), "--output_csv", str(merged)],
+            [era5_csv, imerg_hourly],
+            merged,
+        ),
+        "build_features": (
+            "src/features/build_features.py",
+            ["--input_csv", str(merged), "--output_csv", str(featured)],
+            [merged],
+            featured,
+        ),
+        "create_cloudburst_labels": (
+            "src/labels/create_cloudburst_labels.py",
+            ["--input_csv", str(featured), "--output_csv", str(labeled)],
+            [featured],
+            labeled,
+        ),
+        "generate_latest_features": (
+            "src/pipelines/offline/generate_latest_features.py",
+            ["--input_pattern", str(labeled), "--chunks", "central", "--output_dir", str(processed)],
+            [labeled],
+            processed / "latest_features_central.csv",
+        ),
+    }
+
+    results = {}
+    try:
+        for name in STAGES:
+            if name not in args.stages:
+                continue
+            script, stage_args, inputs, output = plan[name]
+            try:
+                results[name] = run_stage(name, script, stage_args, inputs, output)
+            except RuntimeError as exc:
+                # Later stages read this stage's output, so stop but keep what was measured.
+                results[name] = {"error": str(exc)}
+                print(f"  {exc}")
+                break
+            row = results[name]
+            print(
+                f"  {row['seconds']:8.2f}s  cpu={row['cpu_seconds']:.2f}s  peak_rss={row['peak_rss_mb']} MB  "
+                f"rows={row['rows_out']}  ({row['rows_per_s']} rows/s, {row['input_mb_per_s']} MB/s)"
+            )
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(work, ignore_errors=True)
+
+    out_path = Path(args.output)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "scale": {
+            "region": region,
+            "days": args.days,
+            "districts": args.districts,
+            "era5_step": args.era5_step,
+            "imerg_step": args.imerg_step,
+            "era5_files": era5_files,
+            "imerg_granules": imerg_files,
+        },
+        "stages": results,
+    }
+    out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Saved -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+ROOT = Path(__file__).resolve().parents[1]
+try:
+    from backend.serialization import dumps, frame_records
+except ModuleNotFoundError:
+    sys.path.insert(0, str(ROOT))
+    from backend.serialization import dumps, frame_records
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the per-cell JSON path with the column-wise/orjson path on a results table."
+    )
+    parser.add_argument("--input", default=str(ROOT / "results" / "risk_probabilities.csv"))
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+def _legacy_clean(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        try:
+            value = value.item()
+        except Exception:
+            pass
+    return value
+
+
+def legacy_path(df: pd.DataFrame) -> bytes:
+    """The serialization path before the column-wise encoder: per-cell cleanup, jsonable_encoder, json."""
+    records = [{str(k): _legacy_clean(v) for k, v in row.items()} for row in df.to_dict(orient="records")]
+    payload = {"probability_samples": records}
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(df: pd.DataFrame) -> bytes:
+    return dumps({"probability_samples": frame_records(df)})
+
+
+def _time(func, df: pd.DataFrame, repeat: int) -> tuple[float, bytes]:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(df)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), body
+
+
+def main() -> None:
+    args = parse_args()
+    df = pd.read_csv(args.input)
+    print(f"Input: {args.input} ({len(df)} rows x {df.shape[1]} cols)")
+
+    results = {}
+    for name, func in (("legacy", legacy_path), ("fast", fast_path)):
+        seconds, body = _time(func, df, args.repeat)
+        results[name] = seconds
+        gz = len(gzip.compress(body, compresslevel=6))
+        print(f"{name:>7}: {seconds * 1000:8.1f} ms  body={len(body) / 1024:8.1f} KiB  gzip={gz / 1024:7.1f} KiB")
+
+    if json.loads(legacy_path(df)) != json.loads(fast_path(df)):
+        print("WARNING: payloads differ between paths")
+    print(f"Speed-up: {results['legacy'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -236,7 +236,7 @@ class PredictionSnapshot {
   final double longitude;
   final double riskScore;
   final RiskTier riskTier;
-  final double confidenceScore;
+  final double? confidenceScore;
   final DateTime lastUpdated;
   final List<RiskTimelinePoint> riskTimeline;
   final Map<String, List<double>> seriesByFeature;
@@ -266,7 +266,7 @@ class PredictionSnapshot {
         ? HimalayanZoneX.fromChunk(zoneFromContract)
         : HimalayanZoneX.fromChunk(zoneFromChunk);
 
-    final confidence = (json['confidence'] as num?)?.toDouble() != null
+    final confidence = json['confidence'] is num
         ? ((json['confidence'] as num).toDouble() * 100).clamp(0, 100).toDouble()
         : _confidenceFromBreakdown(model);
 
@@ -310,7 +310,10 @@ class PredictionSnapshot {
         'cape': _syntheticCapeSeries(effectiveViz),
       },
       featureImportance: featureImportance,
-      modelBreakdown: model.map((key, value) => MapEntry(key.toString(), (value as num?)?.toDouble() ?? 0)),
+      // Only the probabilities; members that were not evaluated come back as null.
+      modelBreakdown: Map.fromEntries(
+        model.entries.where((entry) => entry.value is num).map((entry) => MapEntry(entry.key, (entry.value as num).toDouble())),
+      ),
       leadTime: leadTime,
       summary: summary,
       actionableSteps: contractInsights.isNotEmpty ? contractInsights : _actionableSteps(tier),
@@ -370,7 +373,7 @@ class PredictionSnapshot {
         (value) => value.name == (json['riskTier'] ?? '').toString(),
         orElse: () => _riskTierFromScore((json['riskScore'] as num?)?.toDouble() ?? 0),
       ),
-      confidenceScore: (json['confidenceScore'] as num?)?.toDouble() ?? 0,
+      confidenceScore: (json['confidenceScore'] as num?)?.toDouble(),
       lastUpdated: DateTime.tryParse((json['lastUpdated'] ?? '').toString()) ?? DateTime.now(),
       riskTimeline: (json['timeline'] as List<dynamic>? ?? const <dynamic>[])
           .map(
@@ -399,9 +402,10 @@ class PredictionSnapshot {
     return RiskTier.high;
   }
 
-  static double _confidenceFromBreakdown(Map<String, dynamic> breakdown) {
-    final rf = (breakdown['rf_probability'] as num?)?.toDouble() ?? 0;
-    final xgb = (breakdown['xgb_probability'] as num?)?.toDouble() ?? 0;
+  static double? _confidenceFromBreakdown(Map<String, dynamic> breakdown) {
+    final rf = (breakdown['rf_probability'] as num?)?.toDouble();
+    final xgb = (breakdown['xgb_probability'] as num?)?.toDouble();
+    if (rf == null || xgb == null) return null;
     return ((100 - ((rf - xgb).abs() * 100)).clamp(0, 100)).toDouble();
   }
 
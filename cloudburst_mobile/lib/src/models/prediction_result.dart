@@ -72,8 +72,8 @@ class PredictionResult {
   final double riskScore;
   final String riskLevel;
   final String alertTier;
-  final double rfProbability;
-  final double xgbProbability;
+  final double? rfProbability;
+  final double? xgbProbability;
   final double ensembleProbability;
   final List<double> rainTrend;
   final List<double> moistureTrend;
@@ -101,8 +101,8 @@ class PredictionResult {
       riskScore: (json["risk_score"] as num?)?.toDouble() ?? 0.0,
       riskLevel: (json["risk_level"] ?? "").toString().toUpperCase(),
       alertTier: (json["alert_tier"] ?? "").toString().toUpperCase(),
-      rfProbability: (model["rf_probability"] as num?)?.toDouble() ?? 0.0,
-      xgbProbability: (model["xgb_probability"] as num?)?.toDouble() ?? 0.0,
+      rfProbability: (model["rf_probability"] as num?)?.toDouble(),
+      xgbProbability: (model["xgb_probability"] as num?)?.toDouble(),
       ensembleProbability: (model["ensemble_probability"] as num?)?.toDouble() ?? 0.0,
       rainTrend: listNum(viz, "rain_trend"),
       moistureTrend: listNum(viz, "moisture_trend"),
@@ -16,8 +16,8 @@ class AnalyticsScreen extends StatelessWidget {
       ("District", result.location.districtName),
       ("State", result.location.state),
       ("Chunk model", result.location.chunk.toUpperCase()),
-      ("RF probability", result.rfProbability.toStringAsFixed(4)),
-      ("XGB probability", result.xgbProbability.toStringAsFixed(4)),
+      ("RF probability", result.rfProbability?.toStringAsFixed(4) ?? "not evaluated"),
+      ("XGB probability", result.xgbProbability?.toStringAsFixed(4) ?? "not evaluated"),
       ("Ensemble probability", result.ensembleProbability.toStringAsFixed(4)),
       ("Risk score", result.riskScore.toStringAsFixed(2)),
       ("Alert tier", result.alertTier),
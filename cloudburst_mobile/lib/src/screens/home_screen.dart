@@ -174,7 +174,7 @@ class HomeScreen extends ConsumerWidget {
                 children: [
                   MetricPill(
                     label: 'Confidence',
-                    value: '${prediction.confidenceScore.toStringAsFixed(0)}%',
+                    value: prediction.confidenceScore == null ? 'n/a' : '${prediction.confidenceScore!.toStringAsFixed(0)}%',
                     color: const Color(0xFF43C6DB),
                   ),
                   MetricPill(
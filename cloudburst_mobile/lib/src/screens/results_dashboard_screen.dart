@@ -16,7 +16,9 @@ class ResultsDashboardScreen extends StatelessWidget {
       return const SafeArea(child: Center(child: Text("Run district assessment to view dashboard.")));
     }
 
-    final confidence = (100 - (result.rfProbability - result.xgbProbability).abs() * 100).clamp(0, 100);
+    final rf = result.rfProbability;
+    final xgb = result.xgbProbability;
+    final confidence = rf == null || xgb == null ? null : (100 - (rf - xgb).abs() * 100).clamp(0, 100);
 
     return SafeArea(
       child: ListView(
@@ -41,7 +43,7 @@ class ResultsDashboardScreen extends StatelessWidget {
                         const SizedBox(height: 8),
                         Text("Alert Tier: ${result.alertTier}", style: const TextStyle(fontWeight: FontWeight.w700)),
                         Text("Estimated Elevated Risk: ${result.leadTime.text}"),
-                        Text("Model Confidence: ${confidence.toStringAsFixed(0)}%"),
+                        Text(confidence == null ? "Model Confidence: n/a (single model)" : "Model Confidence: ${confidence.toStringAsFixed(0)}%"),
                       ],
                     ),
                   ),
@@ -133,7 +133,7 @@ class RiskDial extends StatelessWidget {
 
   final double score;
   final RiskTier tier;
-  final double confidence;
+  final double? confidence;
   final Color color;
 
   @override
@@ -157,7 +157,10 @@ class RiskDial extends StatelessWidget {
                   const SizedBox(height: 2),
                   Text(tier.label, style: Theme.of(context).textTheme.labelLarge?.copyWith(color: color, fontWeight: FontWeight.w800)),
                   const SizedBox(height: 8),
-                  Text('${confidence.toStringAsFixed(0)}% confidence', style: Theme.of(context).textTheme.labelMedium),
+                  Text(
+                    confidence == null ? 'single-model score' : '${confidence!.toStringAsFixed(0)}% confidence',
+                    style: Theme.of(context).textTheme.labelMedium,
+                  ),
                 ],
               ),
             ),
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+import threading
+from collections import OrderedDict
 from typing import Any
 
 import pandas as pd
@@ -13,19 +15,53 @@ API_BASE_URL = (
     or "https://hcis-api.onrender.com"
 ).rstrip("/")
 TIMEOUT_SECONDS = int(os.getenv("CLOUDBURST_API_TIMEOUT", "30"))
+ETAG_CACHE_ENTRIES = max(0, int(os.getenv("CLOUDBURST_API_ETAG_CACHE_ENTRIES", "128")))
 
 
 class ApiError(RuntimeError):
     pass
 
 
+# Last ETag and payload per GET URL, so repeated reads revalidate with If-None-Match.
+# Bounded LRU: every distinct query string is its own entry.
+_ETAG_CACHE: OrderedDict[str, tuple[str, dict[str, Any]]] = OrderedDict()
+_ETAG_LOCK = threading.Lock()
+
+
+def _etag_lookup(key: str) -> tuple[str, dict[str, Any]] | None:
+    with _ETAG_LOCK:
+        cached = _ETAG_CACHE.get(key)
+        if cached is not None:
+            _ETAG_CACHE.move_to_end(key)
+        return cached
+
+
+def _etag_store(key: str, etag: str, payload: dict[str, Any]) -> None:
+    if ETAG_CACHE_ENTRIES == 0:
+        return
+    with _ETAG_LOCK:
+        _ETAG_CACHE[key] = (etag, payload)
+        _ETAG_CACHE.move_to_end(key)
+        while len(_ETAG_CACHE) > ETAG_CACHE_ENTRIES:
+            _ETAG_CACHE.popitem(last=False)
+
+
 def _request(method: str, path: str, **kwargs: Any) -> dict[str, Any]:
     url = f"{API_BASE_URL}{path}"
+    cache_key = cached = None
+    if method.upper() == "GET":
+        cache_key = requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+        cached = _etag_lookup(cache_key)
+        if cached is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "If-None-Match": cached[0]}
     try:
         response = requests.request(method, url, timeout=TIMEOUT_SECONDS, **kwargs)
     except requests.RequestException as exc:
         raise ApiError(f"Cannot reach backend at {API_BASE_URL}: {exc}") from exc
 
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+
     if response.status_code >= 400:
         try:
             detail = response.json().get("detail", response.text)
@@ -34,10 +70,15 @@ def _request(method: str, path: str, **kwargs: Any) -> dict[str, Any]:
         raise ApiError(f"API error {response.status_code}: {detail}")
 
     try:
-        return response.json()
+        payload = response.json()
     except ValueError as exc:
         raise ApiError("Backend returned non-JSON response.") from exc
 
+    etag = response.headers.get("ETag")
+    if cache_key is not None and etag:
+        _etag_store(cache_key, etag, payload)
+    return payload
+
 
 def _request_any(method: str, paths: list[str], **kwargs: Any) -> dict[str, Any]:
     last_error: ApiError | None = None
@@ -103,6 +144,17 @@ def historical_events(district: str = "", state: str = "", severity: str = "", l
     return payload.get("events", [])
 
 
+def detected_events(
+    district: str = "", region: str = "", start: str = "", end: str = "", limit: int = 200
+) -> list[dict[str, Any]]:
+    params = {"limit": limit}
+    for name, value in (("district", district), ("region", region), ("start", start), ("end", end)):
+        if value:
+            params[name] = value
+    payload = _request_any("GET", ["/events/detected"], params=params)
+    return payload.get("events", [])
+
+
 def replay_event(event_id: int) -> dict[str, Any]:
     return _request_any(
         "GET",
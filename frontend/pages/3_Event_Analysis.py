@@ -14,7 +14,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from api_client import ApiError, historical_events, load_results_csv, replay_event
+from api_client import ApiError, detected_events, historical_events, load_results_csv, replay_event
 from ui import hero, metric_strip, setup_page, style_plotly_figure, top_nav
 
 
@@ -142,3 +142,30 @@ if "event_id" in events_df.columns:
             st.json(payload)
         except ApiError as exc:
             st.error(str(exc))
+
+st.markdown("### Detected Events")
+st.caption("Label-derived events: one row per run of consecutive positive hours in a district.")
+filter_cols = st.columns([2, 1, 1])
+detected_district = filter_cols[0].text_input("District", key="detected_district", placeholder="Any district")
+detected_start = filter_cols[1].date_input("From", value=None, key="detected_start")
+detected_end = filter_cols[2].date_input("To", value=None, key="detected_end")
+try:
+    detected = detected_events(
+        district=detected_district.strip(),
+        start=detected_start.isoformat() if detected_start else "",
+        end=f"{detected_end.isoformat()}T23:59:59" if detected_end else "",
+        limit=200,
+    )
+except ApiError as exc:
+    st.info(f"Detected events are unavailable: {exc}")
+else:
+    if detected:
+        detected_df = pd.DataFrame(detected)
+        detected_cols = [
+            c
+            for c in ["start_time", "end_time", "district", "region", "duration_hours", "peak_rain_mm", "total_rain_mm"]
+            if c in detected_df.columns
+        ]
+        st.dataframe(detected_df[detected_cols], use_container_width=True, hide_index=True)
+    else:
+        st.info("No detected events match these filters.")
@@ -16,14 +16,15 @@ Runs the full workflow for one or more regions:
 
 import argparse
 import subprocess
-import sys
 from pathlib import Path
 
+from src.common import profiling
+
 ROOT = Path(__file__).resolve().parent
 
 
 def run(script_path: str, *args: str):
-    cmd = [sys.executable, script_path, *args]
+    cmd = profiling.stage_command(script_path, *args)
     print(f"\nRunning: {' '.join(cmd)}")
     result = subprocess.run(cmd, cwd=ROOT)
     if result.returncode != 0:
@@ -45,11 +46,19 @@ def parse_args():
     parser.add_argument("--regions", nargs="+", default=["himalayan_west"])
     parser.add_argument("--skip_download", action="store_true")
     parser.add_argument("--monsoon_only", action="store_true")
+    parser.add_argument("--lazy_era5", action="store_true", help="Stream ERA5 preprocessing through chunked dask reads.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every stage into results/profiles/<run_id>/ (same as CLOUDBURST_PROFILE=1).",
+    )
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    if args.profile or profiling.profiling_enabled():
+        print("Profiling run:", profiling.enable())
     print("Pipeline start")
     print("Regions:", args.regions)
     print("Years:", args.start_year, "to", args.end_year)
@@ -81,7 +90,10 @@ def main():
         has_era5_raw = any(era5_raw_dir.rglob("*.nc")) or any(era5_legacy_raw_dir.rglob("*.nc"))
         if has_era5_raw:
             run("src/data/era5/unzip_era5.py", "--region", region)
-            run("src/data/era5/preprocess_era5.py", "--region", region)
+            era5_args = ["--region", region]
+            if args.lazy_era5:
+                era5_args.append("--lazy")
+            run("src/data/era5/preprocess_era5.py", *era5_args)
         elif era5_feature_path is not None:
             print(f"Skipping ERA5 preprocess for {region}; using existing {era5_feature_path}")
         else:
@@ -114,6 +126,8 @@ def main():
         print("Skipping lead_time_analysis for multi-region run. Run it later per region using --group_value.")
     run("src/features/generate_alert_signals.py")
 
+    if profiling.profiling_enabled():
+        profiling.print_summary()
     print("Pipeline completed successfully")
 
 
@@ -0,0 +1,278 @@
+"""Opt-in profiling for pipeline stage scripts.
+
+Run a stage under the profiler with::
+
+    python -m src.common.profiling src/features/build_features.py --input_csv ...
+
+or pass ``--profile`` to ``run_pipeline.py`` / ``run_daily_pipeline.py`` (or set
+``CLOUDBURST_PROFILE=1``) to profile every stage they launch. Each stage writes into
+``results/profiles/<run_id>/``:
+
+* ``<stage>.prof``: cProfile stats (``python -m pstats`` / snakeviz)
+* ``<stage>.collapsed.txt``: sampled stacks in collapsed format (flamegraph.pl, speedscope)
+* a row in ``summary.csv`` with wall/CPU time, tracemalloc peak and peak RSS
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import csv
+import os
+import pstats
+import resource
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+PROFILE_ENV = "CLOUDBURST_PROFILE"
+RUN_ID_ENV = "CLOUDBURST_PROFILE_RUN_ID"
+TRACEMALLOC_ENV = "CLOUDBURST_PROFILE_TRACEMALLOC"
+DEFAULT_OUT_DIR = ROOT / "results" / "profiles"
+SUMMARY_FIELDS = [
+    "stage",
+    "script",
+    "exit_code",
+    "wall_s",
+    "cpu_s",
+    "tracemalloc_peak_mb",
+    "peak_rss_mb",
+    "samples",
+    "top_function",
+    "top_cumtime_s",
+]
+
+
+def _env_enabled(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def profiling_enabled() -> bool:
+    return _env_enabled(PROFILE_ENV)
+
+
+def enable(run_id: str | None = None) -> str:
+    """Turn profiling on for this process and every stage it launches; returns the run id."""
+    run_id = run_id or os.getenv(RUN_ID_ENV) or datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    os.environ[PROFILE_ENV] = "1"
+    os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def stage_command(script: str, *args: str, profile: bool = True) -> list[str]:
+    """Command line for a stage script, routed through the profiler when profiling is enabled.
+
+    Pass ``profile=False`` for pure pass-through wrappers: the stage they launch is profiled
+    on its own, and profiling the wrapper as well would only report the same work twice.
+    """
+    if profile and profiling_enabled():
+        return [sys.executable, "-m", "src.common.profiling", script, *args]
+    return [sys.executable, script, *args]
+
+
+def run_dir(run_id: str | None = None, out_dir: Path = DEFAULT_OUT_DIR) -> Path:
+    return Path(out_dir) / (run_id or os.getenv(RUN_ID_ENV) or "adhoc")
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts.
+
+    Stacks are cut at the module body of ``root_filename`` so the wrapper's frames do not
+    show up as a common prefix in every flamegraph.
+    """
+
+    def __init__(self, thread_id: int, root_filename: str, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.root_filename = root_filename
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        path = code.co_filename
+        if "site-packages/" in path:
+            path = path.split("site-packages/", 1)[1]
+        elif path.startswith(str(ROOT)):
+            path = str(Path(path).relative_to(ROOT))
+        return f"{getattr(code, 'co_qualname', code.co_name)} ({path})"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(self._frame_name(frame))
+                if frame.f_code.co_filename == self.root_filename and frame.f_code.co_name == "<module>":
+                    break
+                frame = frame.f_back
+            if frame is not None:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as handle:
+            for stack, count in sorted(self.stacks.items()):
+                handle.write(f"{stack} {count}\n")
+
+
+def _reserve_stage(script: Path, script_args: list[str], target: Path) -> str:
+    """Claim the next free ``NN_<script>[_<region>]`` stage name in ``target``.
+
+    A profiled stage that launches another profiled stage is still running when the inner
+    one picks its name, so the ``.prof`` file is created exclusively to claim the number.
+    """
+    name = script.stem
+    for flag in ("--region", "--chunk"):
+        if flag in script_args and script_args.index(flag) + 1 < len(script_args):
+            name += f"_{script_args[script_args.index(flag) + 1]}"
+    number = len(list(target.glob("*.prof"))) + 1
+    while True:
+        stage = f"{number:02d}_{name}"
+        try:
+            (target / f"{stage}.prof").open("x").close()
+        except FileExistsError:
+            number += 1
+            continue
+        return stage
+
+
+def _append_summary(target: Path, row: dict) -> None:
+    path = target / "summary.csv"
+    new_file = not path.exists()
+    with path.open("a", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=SUMMARY_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def _top_function(profiler: cProfile.Profile, script: Path) -> tuple[str, float]:
+    """Costliest function by cumulative time below the script's module body and ``main``."""
+    stats = pstats.Stats(profiler).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    for (filename, line, func), (_, _, _, cumtime, _) in ranked:
+        if func.startswith("<") or filename == "~" or "runpy" in filename or Path(filename).name == Path(__file__).name:
+            continue
+        if func == "main" and Path(filename).resolve() == script.resolve():
+            continue
+        return f"{func} ({Path(filename).name}:{line})", round(cumtime, 3)
+    return "", 0.0
+
+
+def profile_script(
+    script: str,
+    script_args: list[str],
+    out_dir: Path = DEFAULT_OUT_DIR,
+    run_id: str | None = None,
+    interval: float = 0.005,
+    trace_memory: bool = True,
+) -> int:
+    script_path = Path(script)
+    target = run_dir(run_id, out_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    stage = _reserve_stage(script_path, script_args, target)
+
+    sys.argv = [str(script_path), *script_args]
+    sys.path.insert(0, str(script_path.resolve().parent))
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), str(script_path), interval)
+    exit_code = 0
+
+    if trace_memory:
+        tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    sampler.start()
+    profiler.enable()
+    try:
+        runpy.run_path(str(script_path), run_name="__main__")
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    except BaseException:
+        exit_code = 1
+        raise
+    finally:
+        profiler.disable()
+        sampler.stop()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+        profiler.dump_stats(target / f"{stage}.prof")
+        sampler.write(target / f"{stage}.collapsed.txt")
+        top_function, top_cumtime = _top_function(profiler, script_path)
+        _append_summary(
+            target,
+            {
+                "stage": stage,
+                "script": str(script_path),
+                "exit_code": exit_code,
+                "wall_s": round(wall, 3),
+                "cpu_s": round(cpu, 3),
+                "tracemalloc_peak_mb": round(peak / 1e6, 1) if peak is not None else "",
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                "samples": sum(sampler.stacks.values()),
+                "top_function": top_function,
+                "top_cumtime_s": top_cumtime,
+            },
+        )
+        print(f"Profile written -> {target / stage}.*", file=sys.stderr)
+    return exit_code
+
+
+def print_summary(run_id: str | None = None, out_dir: Path = DEFAULT_OUT_DIR) -> None:
+    path = run_dir(run_id, out_dir) / "summary.csv"
+    if not path.exists():
+        return
+    with path.open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    columns = ["stage", "wall_s", "cpu_s", "tracemalloc_peak_mb", "peak_rss_mb", "top_function"]
+    widths = {col: max(len(col), *(len(row[col]) for row in rows)) for col in columns}
+    print("\nProfile summary:", path)
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(row[col].ljust(widths[col]) for col in columns))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a pipeline stage script under cProfile, a stack sampler and tracemalloc.")
+    parser.add_argument("--run_id", default=None, help=f"Defaults to ${RUN_ID_ENV} or 'adhoc'.")
+    parser.add_argument("--out_dir", default=str(DEFAULT_OUT_DIR))
+    parser.add_argument("--interval", type=float, default=0.005, help="Stack sampling interval in seconds.")
+    parser.add_argument(
+        "--no_tracemalloc",
+        action="store_true",
+        help=f"Skip allocation tracing (it slows allocation-heavy stages); also ${TRACEMALLOC_ENV}=0.",
+    )
+    parser.add_argument("script")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    trace_memory = not args.no_tracemalloc and _env_enabled(TRACEMALLOC_ENV, default=True)
+    code = profile_script(args.script, args.script_args, Path(args.out_dir), args.run_id, args.interval, trace_memory)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def _load_polygons(geojson_path: Path, district_ids: pd.Series) -> tuple[list, np.ndarray] | None:
+    try:
+        from shapely.geometry import shape
+    except ModuleNotFoundError:
+        return None
+
+    with geojson_path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+
+    row_by_id = {str(value): pos for pos, value in enumerate(district_ids.astype(str))}
+    geometries, rows = [], []
+    for feature in payload.get("features", []):
+        props = feature.get("properties", {}) or {}
+        district_id = props.get("district_id", props.get("shapeID"))
+        pos = row_by_id.get(str(district_id))
+        if pos is None or not feature.get("geometry"):
+            continue
+        geometries.append(shape(feature["geometry"]))
+        rows.append(pos)
+    if not geometries:
+        return None
+    return geometries, np.asarray(rows, dtype=np.int64)
+
+
+class DistrictLocator:
+    """Resolves coordinates to district rows.
+
+    Points are matched to the containing district polygon when boundaries are available
+    (STRtree), otherwise to the nearest centroid by great-circle distance. Centroids are
+    indexed as unit vectors in a KD-tree, where chord length is monotonic in great-circle
+    distance, so there is no longitude distortion at Himalayan latitudes.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, polygons: tuple[list, np.ndarray] | None = None) -> None:
+        self._tree = cKDTree(_unit_vectors(lats, lons))
+        self._polygon_tree = None
+        self._polygon_rows = None
+        if polygons is not None:
+            from shapely import STRtree
+
+            geometries, rows = polygons
+            self._polygon_tree = STRtree(geometries)
+            self._polygon_rows = rows
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, geojson_path: Path | None = None) -> "DistrictLocator":
+        polygons = None
+        if geojson_path is not None and geojson_path.exists():
+            polygons = _load_polygons(geojson_path, frame["district_id"])
+        return cls(frame["centroid_lat"].to_numpy(), frame["centroid_lon"].to_numpy(), polygons)
+
+    @property
+    def has_polygons(self) -> bool:
+        return self._polygon_tree is not None
+
+    def nearest(self, lats: np.ndarray, lons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        chord, idx = self._tree.query(_unit_vectors(lats, lons), k=1)
+        distance_km = 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+        return idx.astype(np.int64), distance_km
+
+    def locate_many(self, lats, lons) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        idx, distance_km = self.nearest(lats, lons)
+        contained = np.zeros(len(lats), dtype=bool)
+
+        if self._polygon_tree is not None:
+            from shapely import points
+
+            point_idx, tree_idx = self._polygon_tree.query(points(lons, lats), predicate="within")
+            # A point on a shared border can fall in two polygons; keep the first hit per point.
+            point_idx, first = np.unique(point_idx, return_index=True)
+            idx[point_idx] = self._polygon_rows[tree_idx[first]]
+            contained[point_idx] = True
+            distance_km = np.where(
+                contained,
+                self._distance_km(lats, lons, idx),
+                distance_km,
+            )
+        return idx, distance_km, contained
+
+    def locate(self, lat: float, lon: float) -> tuple[int, float, bool]:
+        idx, distance_km, contained = self.locate_many([lat], [lon])
+        return int(idx[0]), float(distance_km[0]), bool(contained[0])
+
+    def _distance_km(self, lats: np.ndarray, lons: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        chord = np.linalg.norm(_unit_vectors(lats, lons) - self._tree.data[idx], axis=1)
+        return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
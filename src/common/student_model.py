@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STUDENT_FORMAT = "cloudburst-student-gbm"
+STUDENT_FORMAT_VERSION = 1
+
+
+def teacher_fingerprint(bundle_path: str | Path) -> dict:
+    """Name, size and SHA-256 of the ensemble bundle a student is distilled from."""
+    path = Path(bundle_path)
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return {"bundle": path.name, "size": path.stat().st_size, "sha256": digest.hexdigest()}
+
+
+class StudentModel:
+    """Distilled boosted-tree student evaluated with numpy alone.
+
+    The JSON file written by ``src/models/distill_chunk_ensemble.py`` stores each tree as flat
+    node arrays (``feature`` is -1 on leaves). All trees are padded to the same node count and
+    walked together, one level per step, so a batch of rows costs ``max_depth`` vectorised
+    gathers instead of a Python loop over trees. Splits follow XGBoost: a row goes left when
+    its value is below the threshold (compared in float32), and missing values follow
+    ``missing_left``. Loading needs neither scikit-learn nor xgboost.
+    """
+
+    def __init__(self, payload: dict) -> None:
+        if payload.get("format") != STUDENT_FORMAT or payload.get("version") != STUDENT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported student model format: {payload.get('format')} v{payload.get('version')}")
+        self.features: list[str] = list(payload["features"])
+        self.base_margin = float(payload["base_margin"])
+        self.max_depth = int(payload["max_depth"])
+        self.meta = {key: value for key, value in payload.items() if key != "trees"}
+
+        trees = payload["trees"]
+        width = max((len(tree["feature"]) for tree in trees), default=1)
+        self._feature = np.full((len(trees), width), -1, dtype=np.int64)
+        self._threshold = np.zeros((len(trees), width), dtype=np.float32)
+        self._left = np.zeros((len(trees), width), dtype=np.int64)
+        self._right = np.zeros((len(trees), width), dtype=np.int64)
+        self._missing_left = np.zeros((len(trees), width), dtype=bool)
+        self._value = np.zeros((len(trees), width), dtype=np.float64)
+        for t, tree in enumerate(trees):
+            n = len(tree["feature"])
+            self._feature[t, :n] = tree["feature"]
+            self._threshold[t, :n] = tree["threshold"]
+            self._left[t, :n] = tree["left"]
+            self._right[t, :n] = tree["right"]
+            self._missing_left[t, :n] = tree["missing_left"]
+            self._value[t, :n] = tree["value"]
+        self._tree_index = np.arange(len(trees))
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "StudentModel":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self._tree_index)
+
+    def distilled_from(self, bundle_path: str | Path) -> bool:
+        """Whether ``bundle_path`` is byte-for-byte the teacher this student was distilled from."""
+        teacher = self.meta.get("teacher") or {}
+        path = Path(bundle_path)
+        if "sha256" not in teacher or path.stat().st_size != teacher.get("size"):
+            return False
+        return teacher_fingerprint(path)["sha256"] == teacher["sha256"]
+
+    def _matrix(self, x) -> np.ndarray:
+        if isinstance(x, pd.DataFrame):
+            x = x[self.features].to_numpy()
+        return np.asarray(x, dtype=np.float32).reshape(-1, len(self.features))
+
+    def decision_function(self, x) -> np.ndarray:
+        """Raw margin (log-odds) per row."""
+        x = self._matrix(x)
+        rows = np.arange(len(x))[:, None]
+        trees = self._tree_index[None, :]
+        node = np.zeros((len(x), self.n_trees), dtype=np.int64)
+        for _ in range(self.max_depth):
+            feature = self._feature[trees, node]
+            values = x[rows, np.clip(feature, 0, None)]
+            go_left = np.where(np.isnan(values), self._missing_left[trees, node], values < self._threshold[trees, node])
+            node = np.where(feature < 0, node, np.where(go_left, self._left[trees, node], self._right[trees, node]))
+        return self.base_margin + self._value[trees, node].sum(axis=1)
+
+    def predict_proba(self, x) -> np.ndarray:
+        """Two-column class probabilities, like the scikit-learn models it stands in for."""
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(x)))
+        return np.column_stack([1.0 - positive, positive])
@@ -6,11 +6,17 @@ from pathlib import Path
 
 import pandas as pd
 
+try:
+    from src.common import profiling
+except ModuleNotFoundError:
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.common import profiling
+
 ROOT = Path(__file__).resolve().parents[3]
 
 
 def run(script: str, *args: str):
-    cmd = [sys.executable, script, *args]
+    cmd = profiling.stage_command(script, *args)
     print("Running:", " ".join(cmd))
     result = subprocess.run(cmd, cwd=ROOT)
     if result.returncode != 0:
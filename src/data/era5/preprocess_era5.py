@@ -1,4 +1,5 @@
 import argparse
+import functools
 import glob
 import logging
 import os
@@ -35,6 +36,13 @@ def parse_args():
     )
     parser.add_argument("--start", type=str, default="2005-01-01")
     parser.add_argument("--end", type=str, default="2025-01-01")
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Open each directory as one chunked multi-file dataset and stream results to the output CSV.",
+    )
+    parser.add_argument("--time_chunk", type=int, default=744, help="Hourly steps per dask chunk in --lazy mode.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker threads in --lazy mode.")
     parser.add_argument("--list_regions", action="store_true")
     return parser.parse_args()
 
@@ -93,6 +101,94 @@ def process_directory(path, start_time, end_time, north, west, south, east, agg)
     return pd.concat(dfs).sort_index()
 
 
+def _subset_file(ds, north, west, south, east):
+    ds = normalize_coords(ds)
+    return ds.sel(latitude=slice(north, south), longitude=slice(west, east))
+
+
+def open_lazy_series(path, start_time, end_time, north, west, south, east, agg, time_chunk):
+    files = sorted(glob.glob(os.path.join(path, "*.nc")))
+    if not files:
+        return None
+
+    ds = xr.open_mfdataset(
+        files,
+        preprocess=functools.partial(_subset_file, north=north, west=west, south=south, east=east),
+        combine="nested",
+        concat_dim="time",
+        chunks={"time": time_chunk},
+        data_vars="minimal",
+        coords="minimal",
+        compat="override",
+        parallel=True,
+    )
+
+    vars_to_use = ["t2m", "u10", "v10", "sp", "tcwv"] if agg == "mean" else ["tp"]
+    vars_to_use = [var for var in vars_to_use if var in ds]
+    if not vars_to_use:
+        return None
+
+    # Filtering, de-duplication and ordering only touch the in-memory time coordinate;
+    # the gridded variables stay lazy until a block is computed.
+    time_index = pd.DatetimeIndex(pd.to_datetime(ds.time.values).floor("h"))
+    keep = np.flatnonzero((time_index >= start_time) & (time_index < end_time) & ~time_index.duplicated())
+    if len(keep) == 0:
+        return None
+    keep = keep[np.argsort(time_index[keep], kind="stable")]
+
+    ds = ds[vars_to_use].isel(time=keep).assign_coords(time=time_index[keep])
+    if agg == "mean":
+        return ds.mean(["latitude", "longitude"])
+    return ds.sum(["latitude", "longitude"])
+
+
+def stream_lazy(series, output_path, region_key, time_chunk, workers):
+    import dask
+
+    series = [s for s in series if s is not None]
+    if not series:
+        return 0
+
+    common_times = pd.DatetimeIndex(series[0].time.values)
+    for s in series[1:]:
+        common_times = common_times.intersection(pd.DatetimeIndex(s.time.values))
+    series = [s.sel(time=common_times) for s in series]
+
+    rows = 0
+    step = max(1, time_chunk) * max(1, workers)
+    for block_start in range(0, len(common_times), step):
+        block = [s.isel(time=slice(block_start, block_start + step)) for s in series]
+        computed = dask.compute(*block, scheduler="threads", num_workers=workers)
+
+        data = {"time": pd.DatetimeIndex(computed[0].time.values)}
+        for c in computed:
+            for var in c.data_vars:
+                data[var] = c[var].values
+        df = pd.DataFrame(data)
+        df["region"] = region_key
+        df.to_csv(output_path, mode="w" if rows == 0 else "a", header=rows == 0, index=False)
+        rows += len(df)
+        logging.info("Streamed %d rows (through %s)", rows, df["time"].iloc[-1])
+    return rows
+
+
+def main_lazy(args, region_key, bbox, start_time, end_time, output_path, instant_dir, accum_dir, flat_dir):
+    north, west, south, east = bbox
+    if instant_dir.exists() and accum_dir.exists():
+        instant_path, accum_path = str(instant_dir), str(accum_dir)
+    else:
+        instant_path = accum_path = str(flat_dir)
+
+    logging.info("Opening ERA5 instant files lazily: %s", instant_path)
+    instant = open_lazy_series(
+        instant_path, start_time, end_time, north, west, south, east, "mean", args.time_chunk
+    )
+    logging.info("Opening ERA5 accum files lazily: %s", accum_path)
+    accum = open_lazy_series(accum_path, start_time, end_time, north, west, south, east, "sum", args.time_chunk)
+
+    return stream_lazy([instant, accum], output_path, region_key, args.time_chunk, args.workers)
+
+
 def main():
     args = parse_args()
     if args.list_regions:
@@ -124,6 +220,17 @@ def main():
         accum_dir = legacy_base / "accum"
 
     logging.info("Region: %s | Area: %s", region_key, bbox)
+    if args.lazy:
+        rows = main_lazy(args, region_key, bbox, start_time, end_time, output_path, instant_dir, accum_dir, flat_dir)
+        if rows == 0:
+            raise RuntimeError(
+                f"No ERA5 data found for region '{region_key}' in {base_dir} "
+                f"(or legacy path {legacy_base})."
+            )
+        logging.info("Saved -> %s", output_path)
+        logging.info("Rows: %d", rows)
+        return
+
     if instant_dir.exists() and accum_dir.exists():
         logging.info("Processing ERA5 instant directory: %s", instant_dir)
         df_instant = process_directory(str(instant_dir), start_time, end_time, north, west, south, east, "mean")
@@ -1,43 +1,182 @@
 import argparse
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+# Per-district thresholds: name -> (column, quantile).
+THRESHOLDS = {
+    "p97_1h": ("rain_mm", 0.97),
+    "p97_3h": ("rain_3h", 0.97),
+    "p97_6h": ("rain_6h", 0.97),
+    "p95_peak": ("rain_peak_3h", 0.95),
+    "p10_sp_drop": ("sp_drop_3h", 0.10),
+    "p90_tcwv": ("tcwv_3h", 0.90),
+}
+
 
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_csv", type=str, default="data/processed/era5_imerg_features_all_regions.csv")
     parser.add_argument("--output_csv", type=str, default="data/processed/labeled_cloudburst_all_regions.csv")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=0,
+        help="Stream the input in blocks of this many rows. Requires rows grouped by district, as build_features writes them.",
+    )
     return parser.parse_args()
 
 
-def label_one_region(group: pd.DataFrame) -> pd.DataFrame:
-    g = group.sort_values("time").copy()
+def group_layout(codes: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray, int]:
+    """Row and column of every value in a (group x longest group) matrix; -1 codes are skipped."""
+    sizes = np.bincount(codes[codes >= 0], minlength=n_groups)
+    slots = np.full(len(codes), -1, dtype=np.intp)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    slots[order] = np.arange(len(order)) - starts[codes[order]]
+    return codes, slots, int(sizes.max(initial=0))
+
+
+def grouped_quantile(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+    q: float,
+    layout: tuple[np.ndarray, np.ndarray, int] | None = None,
+) -> np.ndarray:
+    """Per-group linear quantile of ``values`` skipping NaN, equal bit for bit to ``Series.quantile``.
+
+    Values are scattered into a NaN-padded matrix with one row per group and sorted along
+    rows in a single call (NaN sorts last). The interpolation then follows numpy's
+    percentile arithmetic exactly, since pandas calls ``np.percentile(values, q * 100)``.
+    """
+    rows, slots, width = layout if layout is not None else group_layout(codes, n_groups)
+    placed = slots >= 0
+    matrix = np.full((n_groups, width), np.nan)
+    matrix[rows[placed], slots[placed]] = np.asarray(values, dtype=np.float64)[placed]
+    matrix.sort(axis=1)
+    counts = width - np.isnan(matrix).sum(axis=1) if width else np.zeros(n_groups, dtype=np.intp)
+
+    q = np.true_divide(q * 100.0, 100)
+    virtual = (counts - 1) * q
+    previous = np.floor(virtual)
+    above = virtual >= counts - 1
+    prev_idx = np.where(above, counts - 1, previous).astype(np.intp)
+    next_idx = np.where(above, counts - 1, previous + 1).astype(np.intp)
+    gamma = virtual - np.where(above, -1, prev_idx)
+
+    result = np.full(n_groups, np.nan)
+    present = np.flatnonzero(counts > 0)
+    a = matrix[present, prev_idx[present]]
+    b = matrix[present, next_idx[present]]
+    t = gamma[present]
+    diff = b - a
+    lerp = a + diff * t
+    upper = t >= 0.5
+    lerp[upper] = (b - diff * (1 - t))[upper]
+    result[present] = lerp
+    return result
+
+
+def label_frame(df: pd.DataFrame, group_col: str) -> pd.DataFrame:
+    """Label every district in one pass.
+
+    Rows come back grouped by district in order of first appearance and sorted by time
+    within each district; rows without a district key are dropped, as ``groupby`` does.
+    """
+    codes, uniques = pd.factorize(df[group_col], sort=False)
+    keep = codes >= 0
+    times = df["time"].to_numpy()
+    order = np.flatnonzero(keep)[np.lexsort((times[keep], codes[keep]))]
+    out = df.iloc[order].reset_index(drop=True)
+    codes = codes[order]
+
+    layout = group_layout(codes, len(uniques))
+    limits = {
+        name: grouped_quantile(out[column].to_numpy(), codes, len(uniques), q, layout)[codes]
+        for name, (column, q) in THRESHOLDS.items()
+    }
+    tier1 = (
+        (out["rain_mm"].to_numpy() >= limits["p97_1h"])
+        | (out["rain_3h"].to_numpy() >= limits["p97_3h"])
+        | (out["rain_6h"].to_numpy() >= limits["p97_6h"])
+    )
+    tier2 = (
+        (out["rain_peak_3h"].to_numpy() >= limits["p95_peak"])
+        & (out["sp_drop_3h"].to_numpy() <= limits["p10_sp_drop"])
+        & (out["tcwv_3h"].to_numpy() >= limits["p90_tcwv"])
+    )
 
-    p97_1h = g["rain_mm"].quantile(0.97)
-    p97_3h = g["rain_3h"].quantile(0.97)
-    p97_6h = g["rain_6h"].quantile(0.97)
+    out["cloudburst"] = (tier1 | tier2).astype(int)
+    out["label_rule_tier1"] = tier1.astype(int)
+    out["label_rule_tier2"] = tier2.astype(int)
+    return out
 
-    p95_peak = g["rain_peak_3h"].quantile(0.95)
-    p10_sp_drop = g["sp_drop_3h"].quantile(0.10)
-    p90_tcwv = g["tcwv_3h"].quantile(0.90)
 
-    tier1 = (
-        (g["rain_mm"] >= p97_1h)
-        | (g["rain_3h"] >= p97_3h)
-        | (g["rain_6h"] >= p97_6h)
-    )
+def _group_col(columns) -> str:
+    if "district_id" in columns:
+        return "district_id"
+    if "district_name" in columns:
+        return "district_name"
+    return "region"
 
-    tier2 = (
-        (g["rain_peak_3h"] >= p95_peak)
-        & (g["sp_drop_3h"] <= p10_sp_drop)
-        & (g["tcwv_3h"] >= p90_tcwv)
+
+def _summary(parts: list[pd.DataFrame], group_col: str) -> pd.DataFrame:
+    counts = pd.concat(parts).groupby(level=0).sum()
+    counts["event_ratio"] = counts["cloudburst_hours"] / counts["rows"]
+    return counts.rename_axis(group_col)
+
+
+def _group_counts(labeled: pd.DataFrame, group_col: str) -> pd.DataFrame:
+    return labeled.groupby(group_col)["cloudburst"].agg(["count", "sum"]).rename(
+        columns={"count": "rows", "sum": "cloudburst_hours"}
     )
 
-    g["cloudburst"] = (tier1 | tier2).astype(int)
-    g["label_rule_tier1"] = tier1.astype(int)
-    g["label_rule_tier2"] = tier2.astype(int)
-    return g
+
+def label_streaming(in_csv: Path, out_csv: Path, chunksize: int) -> tuple[pd.DataFrame, str]:
+    """Label a district-grouped CSV block by block, holding back the trailing (possibly
+    incomplete) district until the next block so each district is labeled whole."""
+    group_col = None
+    carry = None
+    finished: set = set()
+    parts: list[pd.DataFrame] = []
+    header = True
+
+    def flush(frame: pd.DataFrame) -> None:
+        nonlocal header
+        keys = set(frame[group_col].dropna().unique())
+        if keys & finished:
+            raise ValueError(
+                f"{in_csv} is not grouped by {group_col}; rerun without --chunksize to label it in memory."
+            )
+        finished.update(keys)
+        labeled = label_frame(frame, group_col)
+        labeled.to_csv(out_csv, mode="w" if header else "a", header=header, index=False)
+        header = False
+        parts.append(_group_counts(labeled, group_col))
+
+    for chunk in pd.read_csv(in_csv, parse_dates=["time"], chunksize=chunksize):
+        if group_col is None:
+            group_col = _group_col(chunk.columns)
+        if "region" not in chunk.columns:
+            chunk["region"] = "unknown"
+        frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+        keys = frame[group_col]
+        tail = keys.iloc[-1]
+        trailing = keys.eq(tail) if pd.notna(tail) else keys.isna()
+        # The trailing district may continue in the next block.
+        start = len(frame) - int(trailing.iloc[::-1].cumprod().sum())
+        if start > 0:
+            flush(frame.iloc[:start])
+        carry = frame.iloc[start:]
+
+    if carry is not None and len(carry):
+        flush(carry)
+    if header:
+        raise ValueError(f"No rows in {in_csv}")
+    return _summary(parts, group_col), group_col
 
 
 def main():
@@ -50,24 +189,17 @@ def main():
     out_csv = Path(args.output_csv)
     out_csv.parent.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(in_csv, parse_dates=["time"]).sort_values(["region", "time"]).reset_index(drop=True)
-    if "region" not in df.columns:
-        df["region"] = "unknown"
-
-    if "district_id" in df.columns:
-        group_col = "district_id"
-    elif "district_name" in df.columns:
-        group_col = "district_name"
+    if args.chunksize > 0:
+        summary, group_col = label_streaming(in_csv, out_csv, args.chunksize)
     else:
-        group_col = "region"
+        df = pd.read_csv(in_csv, parse_dates=["time"]).sort_values(["region", "time"]).reset_index(drop=True)
+        if "region" not in df.columns:
+            df["region"] = "unknown"
+        group_col = _group_col(df.columns)
+        labeled = label_frame(df, group_col)
+        labeled.to_csv(out_csv, index=False)
+        summary = _summary([_group_counts(labeled, group_col)], group_col)
 
-    labeled_parts = [label_one_region(group) for _, group in df.groupby(group_col, sort=False)]
-    labeled = pd.concat(labeled_parts, ignore_index=True)
-    labeled.to_csv(out_csv, index=False)
-
-    summary = labeled.groupby(group_col)["cloudburst"].agg(["count", "sum", "mean"]).rename(
-        columns={"count": "rows", "sum": "cloudburst_hours", "mean": "event_ratio"}
-    )
     print("Cloudburst labels created")
     print(summary)
     print("Saved ->", out_csv)
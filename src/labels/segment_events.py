@@ -0,0 +1,202 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = [
+    "event_id",
+    "region",
+    "district_id",
+    "district_name",
+    "start_time",
+    "end_time",
+    "duration_hours",
+    "peak_time",
+    "peak_rain_mm",
+    "total_rain_mm",
+    "peak_rain_3h",
+    "tier1_hours",
+    "tier2_hours",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collapse hourly cloudburst labels into event records.")
+    parser.add_argument("--input_csv", nargs="+", default=["data/processed/labeled_cloudburst_all_regions.csv"])
+    parser.add_argument("--output_csv", type=str, default="data/processed/cloudburst_events.csv")
+    parser.add_argument("--label_col", type=str, default="cloudburst")
+    parser.add_argument(
+        "--max_gap_hours",
+        type=int,
+        default=1,
+        help="Positive hours at most this far apart belong to the same event (1 = strictly consecutive).",
+    )
+    return parser.parse_args()
+
+
+def _group_keys(columns) -> list[str]:
+    keys = [col for col in ("region", "district_id", "district_name") if col in columns]
+    return keys or ["region"]
+
+
+def segment_events(
+    labels: pd.DataFrame,
+    label_col: str = "cloudburst",
+    max_gap_hours: int = 1,
+    time_col: str = "time",
+    group_cols: list[str] | None = None,
+) -> pd.DataFrame:
+    """Run-length encode positive hours into one record per event and district.
+
+    A new event starts whenever the district changes or the gap to the previous positive
+    hour exceeds ``max_gap_hours``. Rain statistics are taken over the event's positive hours.
+    ``group_cols`` defaults to whichever of region/district_id/district_name are present.
+    """
+    keys = _group_keys(labels.columns) if group_cols is None else list(group_cols)
+    positive = labels.loc[labels[label_col].fillna(0).astype(int) == 1].copy()
+    if positive.empty:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+
+    positive[time_col] = pd.to_datetime(positive[time_col])
+    for key in keys:
+        positive[key] = positive[key].astype(str)
+    positive = positive.sort_values([*keys, time_col], kind="mergesort").reset_index(drop=True)
+
+    group_codes = positive.groupby(keys, sort=False).ngroup().to_numpy() if keys else np.zeros(len(positive), dtype=np.int64)
+    times = positive[time_col].to_numpy()
+    gap = np.diff(times).astype("timedelta64[s]").astype(np.int64) / 3600.0
+    breaks = np.concatenate(([True], (np.diff(group_codes) != 0) | (gap > max_gap_hours)))
+    event_codes = np.cumsum(breaks) - 1
+    positive["_event"] = event_codes
+
+    rain = positive["rain_mm"] if "rain_mm" in positive.columns else pd.Series(0.0, index=positive.index)
+    positive["_rain"] = pd.to_numeric(rain, errors="coerce").fillna(0.0)
+    grouped = positive.groupby("_event", sort=True)
+    peak_rows = grouped["_rain"].idxmax()
+
+    events = positive.loc[breaks, keys].reset_index(drop=True)
+    events["start_time"] = grouped[time_col].min().to_numpy()
+    events["end_time"] = grouped[time_col].max().to_numpy()
+    events["duration_hours"] = (
+        (events["end_time"] - events["start_time"]).dt.total_seconds().to_numpy() / 3600.0 + 1
+    ).astype(int)
+    events["peak_time"] = positive.loc[peak_rows, time_col].to_numpy()
+    events["peak_rain_mm"] = grouped["_rain"].max().to_numpy()
+    events["total_rain_mm"] = grouped["_rain"].sum().to_numpy()
+    if "rain_3h" in positive.columns:
+        events["peak_rain_3h"] = grouped["rain_3h"].max().to_numpy()
+    for tier in ("tier1", "tier2"):
+        col = f"label_rule_{tier}"
+        if col in positive.columns:
+            events[f"{tier}_hours"] = grouped[col].sum().astype(int).to_numpy()
+
+    events.insert(0, "event_id", np.arange(1, len(events) + 1))
+    return events[[col for col in EVENT_COLUMNS if col in events.columns]]
+
+
+class EventIndex:
+    """Event records indexed for interval queries.
+
+    Events are kept sorted by start time, globally and per district. An event overlaps
+    ``[start, end]`` when it starts before ``end`` and ends after ``start``; since no event
+    is longer than the longest one seen, only starts in ``[start - longest, end]`` need
+    checking, which is a searchsorted slice instead of a scan.
+    """
+
+    def __init__(self, events: pd.DataFrame, district_col: str = "district_name") -> None:
+        events = events.copy()
+        for col in ("start_time", "end_time", "peak_time"):
+            if col in events.columns:
+                events[col] = pd.to_datetime(events[col])
+        self.district_col = district_col
+        self.events = events.sort_values("start_time", kind="mergesort").reset_index(drop=True)
+        self._starts = self.events["start_time"].to_numpy()
+        self._ends = self.events["end_time"].to_numpy()
+        durations = self._ends - self._starts
+        self._longest = durations.max() if len(durations) else np.timedelta64(0, "ns")
+        if district_col in self.events.columns and len(self.events):
+            keys = self.events[district_col].astype(str).str.strip().str.lower()
+        else:
+            keys = pd.Series([], dtype=str)
+        self._by_district = {key: rows.to_numpy() for key, rows in keys.groupby(keys, sort=False).groups.items()}
+
+    @classmethod
+    def from_csv(cls, path: str | Path, district_col: str = "district_name") -> "EventIndex":
+        return cls(pd.read_csv(path), district_col=district_col)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def districts(self) -> list[str]:
+        return sorted(self._by_district)
+
+    def overlap_rows(self, start=None, end=None, rows: np.ndarray | None = None) -> np.ndarray:
+        """Positions in ``events`` of the events overlapping ``[start, end]``; either bound may be open.
+
+        ``rows`` restricts the search to those positions, given in ascending order.
+        """
+        starts = self._starts if rows is None else self._starts[rows]
+        lo, hi = 0, len(starts)
+        if end is not None:
+            hi = np.searchsorted(starts, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+        if start is not None:
+            start = np.datetime64(pd.Timestamp(start), "ns")
+            lo = np.searchsorted(starts, start - self._longest, side="left")
+        candidates = np.arange(lo, hi) if rows is None else np.asarray(rows)[lo:hi]
+        return candidates if start is None else candidates[self._ends[candidates] >= start]
+
+    def overlapping(self, start, end, district: str | None = None) -> pd.DataFrame:
+        """Events overlapping ``[start, end]``, optionally for one district (case-insensitive)."""
+        rows = None
+        if district is not None:
+            rows = self._by_district.get(str(district).strip().lower())
+            if rows is None:
+                return self.events.iloc[0:0]
+        return self.events.iloc[self.overlap_rows(start, end, rows)]
+
+    def any_overlap(self, starts, ends, district: str | None = None) -> np.ndarray:
+        """For each window ``[starts[i], ends[i]]``, whether any event overlaps it.
+
+        The latest event end among events starting before the window closes is a running
+        maximum, so every window is answered with one searchsorted lookup.
+        """
+        starts = pd.to_datetime(pd.Series(starts)).to_numpy(dtype="datetime64[ns]")
+        ends = pd.to_datetime(pd.Series(ends)).to_numpy(dtype="datetime64[ns]")
+        rows = np.arange(len(self.events))
+        if district is not None:
+            rows = self._by_district.get(str(district).strip().lower(), np.empty(0, dtype=np.int64))
+        if len(rows) == 0:
+            return np.zeros(len(starts), dtype=bool)
+        latest_end = np.maximum.accumulate(self._ends[rows])
+        opened = np.searchsorted(self._starts[rows], ends, side="right")
+        hit = np.zeros(len(starts), dtype=bool)
+        some = opened > 0
+        hit[some] = latest_end[opened[some] - 1] >= starts[some]
+        return hit
+
+
+def main():
+    args = parse_args()
+    frames = []
+    for path in args.input_csv:
+        labels = pd.read_csv(path, parse_dates=["time"])
+        frames.append(segment_events(labels, label_col=args.label_col, max_gap_hours=args.max_gap_hours))
+
+    events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EVENT_COLUMNS)
+    events = events.sort_values(["start_time", "event_id"], kind="mergesort").reset_index(drop=True)
+    events["event_id"] = np.arange(1, len(events) + 1)
+
+    out_csv = Path(args.output_csv)
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    events.to_csv(out_csv, index=False)
+
+    print("Cloudburst events segmented")
+    print("Events:", len(events))
+    if len(events):
+        print(events["duration_hours"].describe().round(2).to_string())
+    print("Saved ->", out_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Rolling-origin (expanding window) backtest of the chunk ensemble.
+
+For every chunk and year ``Y`` the RF + XGB ensemble is trained on all years ``<= Y`` and
+scored on ``Y + 1``; risk tiers, event recall and lead times are recomputed on the scored
+year exactly as ``risk_tier_evaluation.py`` does for the single split.
+
+Each chunk's labeled CSV is converted once into ``.npy`` arrays sorted by time, which fold
+workers open with ``mmap_mode="r"``. Every fold's training and scoring rows are then
+contiguous slices of the same read-only pages, shared by all processes through the page
+cache instead of being pickled to each worker.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.labels.segment_events import segment_events
+    from src.models.risk_tier_evaluation import MAX_ALERTS, event_recall, find_threshold
+    from src.models.train_chunk_ensemble import (
+        FEATURES,
+        RF_PARAMS,
+        TARGET,
+        XGB_PARAMS,
+        ensemble_probability,
+        evaluate,
+        fit_ensemble,
+        load_tuned_params,
+    )
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.labels.segment_events import segment_events
+    from src.models.risk_tier_evaluation import MAX_ALERTS, event_recall, find_threshold
+    from src.models.train_chunk_ensemble import (
+        FEATURES,
+        RF_PARAMS,
+        TARGET,
+        XGB_PARAMS,
+        ensemble_probability,
+        evaluate,
+        fit_ensemble,
+        load_tuned_params,
+    )
+
+TIERS = ["RED", "ORANGE", "YELLOW"]
+LEAD_WINDOW_HOURS = 48
+ARRAYS = ("x", "y", "time", "district")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Expanding-window backtest: train on years <= Y, score Y + 1.")
+    parser.add_argument("--chunks", nargs="+", default=list_chunks())
+    parser.add_argument(
+        "--labeled_pattern",
+        type=str,
+        default="data/processed/labeled_cloudburst_district_{chunk}.csv",
+    )
+    parser.add_argument("--cache_dir", type=str, default="data/processed/backtest_cache")
+    parser.add_argument("--output_csv", type=str, default="results/backtest_folds.csv")
+    parser.add_argument("--models_dir", type=str, default="models/chunks", help="Where tuned_params.json is looked up.")
+    parser.add_argument(
+        "--use_tuned",
+        action="store_true",
+        help="Backtest tuned_params.json instead of the defaults. Those were selected on data that "
+        "includes most test years, so the fold scores are optimistic.",
+    )
+    parser.add_argument("--min_train_years", type=int, default=2)
+    parser.add_argument("--first_test_year", type=int, default=None)
+    parser.add_argument("--last_test_year", type=int, default=None)
+    parser.add_argument("--min_positive", type=int, default=25)
+    parser.add_argument("--lead_window_hours", type=int, default=LEAD_WINDOW_HOURS)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument(
+        "--n_jobs",
+        type=int,
+        default=None,
+        help="Threads per model fit. Defaults to cpu_count // workers so folds do not oversubscribe cores.",
+    )
+    return parser.parse_args()
+
+
+def _source_stamp(path: Path) -> dict:
+    stat = path.stat()
+    return {"source": str(path.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def materialize_chunk(csv_path: Path, cache_dir: Path) -> Path:
+    """Write the chunk's features, target, hourly timestamps and district codes as ``.npy``
+    arrays sorted by time; reused until the source CSV changes."""
+    stamp_path = cache_dir / "source.json"
+    stamp = _source_stamp(csv_path)
+    if stamp_path.exists() and json.loads(stamp_path.read_text(encoding="utf-8")) == stamp:
+        return cache_dir
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv(csv_path, usecols=lambda col: col in {*FEATURES, TARGET, "time", "district_id", "district_name"})
+    df["time"] = pd.to_datetime(df["time"])
+    df = df.sort_values("time", kind="mergesort")
+    district_col = "district_id" if "district_id" in df.columns else "district_name"
+    codes, uniques = pd.factorize(df[district_col].astype(str))
+
+    np.save(cache_dir / "x.npy", np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float32)))
+    np.save(cache_dir / "y.npy", df[TARGET].to_numpy(dtype=np.int8))
+    np.save(cache_dir / "time.npy", df["time"].to_numpy(dtype="datetime64[s]"))
+    np.save(cache_dir / "district.npy", codes.astype(np.int32))
+    (cache_dir / "districts.json").write_text(json.dumps([str(u) for u in uniques]), encoding="utf-8")
+    stamp_path.write_text(json.dumps(stamp), encoding="utf-8")
+    return cache_dir
+
+
+def open_arrays(cache_dir: Path) -> dict[str, np.ndarray]:
+    return {name: np.load(cache_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+
+
+def plan_folds(chunk: str, cache_dir: Path, args: argparse.Namespace) -> list[dict]:
+    times = open_arrays(cache_dir)["time"]
+    if len(times) == 0:
+        return []
+    first_year = int(str(times[0])[:4])
+    last_year = int(str(times[-1])[:4])
+    first_test = args.first_test_year or first_year + args.min_train_years
+    last_test = args.last_test_year or last_year
+    folds = []
+    for test_year in range(max(first_test, first_year + 1), last_test + 1):
+        train_end = int(np.searchsorted(times, np.datetime64(f"{test_year}-01-01"), side="left"))
+        test_end = int(np.searchsorted(times, np.datetime64(f"{test_year + 1}-01-01"), side="left"))
+        if test_end > train_end:
+            folds.append(
+                {
+                    "chunk": chunk,
+                    "cache_dir": str(cache_dir),
+                    "train_end_year": test_year - 1,
+                    "test_year": test_year,
+                    "train_end": train_end,
+                    "test_end": test_end,
+                }
+            )
+    return folds
+
+
+def assign_tiers(probs: np.ndarray, red_th: float, orange_th: float, yellow_th: float) -> np.ndarray:
+    return np.select([probs >= red_th, probs >= orange_th, probs >= yellow_th], TIERS, default="NORMAL")
+
+
+def lead_times(
+    districts: np.ndarray,
+    times: np.ndarray,
+    tiers: np.ndarray,
+    events: pd.DataFrame,
+    tier: str,
+    window_hours: int,
+) -> np.ndarray:
+    """Hours from the first ``tier`` alert in the event's district within ``window_hours``
+    before the event start; NaN when there is none."""
+    leads = np.full(len(events), np.nan)
+    alert = tiers == tier
+    if not alert.any() or events.empty:
+        return leads
+    # One axis per district (seconds since the fold start), so one searchsorted finds
+    # the earliest alert in the look-back window of every event.
+    origin = times.min().astype(np.int64)
+    span = times.max().astype(np.int64) - origin + window_hours * 3600 + 1
+    keys = np.sort(districts[alert].astype(np.int64) * span + (times[alert].astype(np.int64) - origin))
+
+    event_codes = events["district_id"].to_numpy(dtype=np.int64)
+    starts = events["start_time"].to_numpy(dtype="datetime64[s]").astype(np.int64) - origin
+    first = np.searchsorted(keys, event_codes * span + starts - window_hours * 3600, side="left")
+    found = first < len(keys)
+    found[found] &= keys[first[found]] <= event_codes[found] * span + starts[found]
+    leads[found] = (event_codes[found] * span + starts[found] - keys[first[found]]) / 3600.0
+    return leads
+
+
+def _effective_params(params: dict | None) -> dict:
+    params = params or {}
+    return {"rf": {**RF_PARAMS, **params.get("rf", {})}, "xgb": {**XGB_PARAMS, **params.get("xgb", {})}}
+
+
+def _feature_frame(x: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(np.asarray(x), columns=FEATURES)
+
+
+def run_fold(fold: dict, n_jobs: int, min_positive: int, lead_window_hours: int) -> dict:
+    arrays = open_arrays(Path(fold["cache_dir"]))
+    train = slice(0, fold["train_end"])
+    test = slice(fold["train_end"], fold["test_end"])
+    x_train, y_train = arrays["x"][train], arrays["y"][train]
+    x_test, y_test = arrays["x"][test], np.asarray(arrays["y"][test])
+    row = {
+        "chunk": fold["chunk"],
+        "train_end_year": fold["train_end_year"],
+        "test_year": fold["test_year"],
+        "train_rows": int(len(y_train)),
+        "test_rows": int(len(y_test)),
+        "test_positives": int(y_test.sum()),
+        "hyperparameters": "tuned" if fold.get("params") else "default",
+        "params": json.dumps(_effective_params(fold.get("params")), sort_keys=True),
+    }
+
+    if int(y_train.sum()) < min_positive:
+        row["status"] = f"skipped: train positives={int(y_train.sum())}"
+        return row
+    if y_test.min() == y_test.max():
+        row["status"] = "skipped: single-class test year"
+        return row
+
+    started = time.perf_counter()
+    rf, xgb = fit_ensemble(_feature_frame(x_train), y_train, n_jobs=n_jobs, params=fold.get("params"))
+    row["fit_seconds"] = round(time.perf_counter() - started, 2)
+
+    test_frame = _feature_frame(x_test)
+    rf_prob = rf.predict_proba(test_frame)[:, 1]
+    xgb_prob = xgb.predict_proba(test_frame)[:, 1]
+    probs = ensemble_probability(rf_prob, xgb_prob)
+    for name, model_prob in (("rf", rf_prob), ("xgb", xgb_prob), ("ensemble", probs)):
+        row.update({f"{metric}_{name}": value for metric, value in evaluate(y_test, model_prob).items()})
+
+    times = np.asarray(arrays["time"][test])
+    districts = np.asarray(arrays["district"][test])
+    prob_series = pd.Series(probs)
+    red_th = find_threshold(prob_series, times, MAX_ALERTS["RED"])
+    orange_th = min(find_threshold(prob_series, times, MAX_ALERTS["ORANGE"]), red_th)
+    yellow_th = min(float(np.quantile(probs, 0.80)), orange_th)
+    tiers = assign_tiers(probs, red_th, orange_th, yellow_th)
+
+    scored = pd.DataFrame({"district_id": districts, "time": times, "true_label": y_test, "risk_tier": tiers})
+    events = segment_events(scored, label_col="true_label", group_cols=["district_id"])
+    events["district_id"] = events["district_id"].astype(np.int64)
+    row.update(
+        {
+            "status": "ok",
+            "test_events": int(len(events)),
+            "red_threshold": red_th,
+            "orange_threshold": orange_th,
+            "yellow_threshold": yellow_th,
+            "recall_red": event_recall(scored, ["RED"]),
+            "recall_red_orange": event_recall(scored, ["RED", "ORANGE"]),
+            "recall_all_tiers": event_recall(scored, TIERS),
+            "avg_alerts_per_month_red_orange": float(
+                pd.Series(np.isin(tiers, ["RED", "ORANGE"]), index=pd.to_datetime(times)).resample("ME").sum().mean()
+            ),
+        }
+    )
+    for tier in TIERS:
+        leads = lead_times(districts, times, tiers, events, tier, lead_window_hours)
+        row[f"lead_{tier}_median_hr"] = float(np.nanmedian(leads)) if np.isfinite(leads).any() else float("nan")
+        row[f"lead_{tier}_coverage"] = float(np.isfinite(leads).mean()) if len(leads) else float("nan")
+    return row
+
+
+def main():
+    args = parse_args()
+    chunks = normalize_chunks(args.chunks)
+    workers = max(1, args.workers)
+    n_jobs = args.n_jobs or max(1, (os.cpu_count() or 1) // workers)
+
+    folds = []
+    for chunk in chunks:
+        csv_path = Path(args.labeled_pattern.format(chunk=chunk))
+        if not csv_path.exists():
+            print(f"Skipping {chunk}: missing {csv_path}")
+            continue
+        cache = materialize_chunk(csv_path, Path(args.cache_dir) / chunk)
+        # Tuned parameters were chosen on the first 80% of each district's history, which overlaps
+        # most test years, so the backtest defaults to the untuned configuration.
+        params = load_tuned_params(Path(args.models_dir) / chunk) if args.use_tuned else None
+        folds.extend({**fold, "params": params} for fold in plan_folds(chunk, cache, args))
+    if not folds:
+        raise RuntimeError("No backtest folds: check --labeled_pattern and the year range.")
+
+    print(f"Running {len(folds)} folds on {workers} workers ({n_jobs} threads per fit)")
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_fold, fold, n_jobs, args.min_positive, args.lead_window_hours): fold for fold in folds
+        }
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            auc = row.get("auc_ensemble")
+            detail = f"auc={auc:.3f} recall_red_orange={row['recall_red_orange']:.2f}" if auc is not None else row["status"]
+            print(f"  {row['chunk']} train<={row['train_end_year']} test={row['test_year']}: {detail}")
+
+    results = pd.DataFrame(rows).sort_values(["chunk", "test_year"]).reset_index(drop=True)
+    out_csv = Path(args.output_csv)
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(out_csv, index=False)
+
+    scored = results[results["status"] == "ok"]
+    if not scored.empty:
+        columns = ["auc_ensemble", "f1_ensemble", "recall_red_orange", "lead_ORANGE_median_hr"]
+        print("\nMean (std) over folds:")
+        print(scored.groupby("chunk")[columns].agg(["mean", "std"]).round(3).to_string())
+    print("Saved ->", out_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Distil each chunk's RF+XGB ensemble into a small boosted-tree student.
+
+The teacher is the deployed bundle ``models/<chunk>_model.pkl``, blended with its own
+``ensemble_weights``. A shallow XGBoost model is fitted to the teacher's probabilities,
+used as soft targets with the logistic loss, on the training rows of every district. It
+early-stops on the time-ordered tail of those rows. The held-out test split then compares
+student and teacher against the true labels:
+
+- calibration: Brier score and expected calibration error
+- hourly recall at the backend's YELLOW/ORANGE/RED probability thresholds
+- fidelity: how far the student's probability is from the teacher's, and how often both
+  land in the same tier
+
+A student that keeps recall within ``--max_recall_drop`` of the teacher at every threshold
+and does not worsen ECE by more than ``--max_ece_increase`` is exported as plain JSON
+(``src/common/student_model.py`` reads it with numpy alone) for the backend's fast path.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost
+from sklearn.metrics import average_precision_score, brier_score_loss, roc_auc_score
+
+try:
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.common.student_model import STUDENT_FORMAT, STUDENT_FORMAT_VERSION, StudentModel, teacher_fingerprint
+    from src.models.train_chunk_ensemble import ENSEMBLE_WEIGHTS, FEATURES, TARGET, split_time_per_district
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.common.student_model import STUDENT_FORMAT, STUDENT_FORMAT_VERSION, StudentModel, teacher_fingerprint
+    from src.models.train_chunk_ensemble import ENSEMBLE_WEIGHTS, FEATURES, TARGET, split_time_per_district
+
+# Lower bounds of the backend's YELLOW/ORANGE/RED tiers (see _tier_from_score in backend/app.py).
+TIER_THRESHOLDS = {"yellow": 0.40, "orange": 0.60, "red": 0.80}
+CALIBRATION_BINS = 10
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distil the chunk ensemble into a compact student model.")
+    parser.add_argument("--chunks", nargs="+", default=list_chunks())
+    parser.add_argument(
+        "--labeled_pattern",
+        type=str,
+        default="data/processed/labeled_cloudburst_district_{chunk}.csv",
+    )
+    parser.add_argument("--bundle_pattern", type=str, default="models/{chunk}_model.pkl")
+    parser.add_argument("--student_pattern", type=str, default="models/{chunk}_student.json")
+    parser.add_argument("--report_csv", type=str, default="results/student_distillation.csv")
+    parser.add_argument("--split_ratio", type=float, default=0.8)
+    parser.add_argument("--valid_ratio", type=float, default=0.8)
+    parser.add_argument("--max_depth", type=int, default=4)
+    parser.add_argument("--max_rounds", type=int, default=200)
+    parser.add_argument("--learning_rate", type=float, default=0.3)
+    parser.add_argument("--early_stopping_rounds", type=int, default=20)
+    parser.add_argument("--max_recall_drop", type=float, default=0.02)
+    parser.add_argument("--max_ece_increase", type=float, default=0.02)
+    parser.add_argument("--n_jobs", type=int, default=-1)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Export the student even when it fails the recall/calibration checks.",
+    )
+    return parser.parse_args()
+
+
+def teacher_probability(bundle: dict, x: pd.DataFrame) -> np.ndarray:
+    """The bundle's blended probability, with the same weighting the backend applies."""
+    weights = bundle.get("ensemble_weights") or ENSEMBLE_WEIGHTS
+    total = sum(float(weights.get(member, 0.0)) for member in ("rf", "xgb"))
+    prob = np.zeros(len(x))
+    for member in ("rf", "xgb"):
+        weight = float(weights.get(member, 0.0)) / total
+        if weight > 0:
+            prob += weight * bundle[f"{member}_model"].predict_proba(x)[:, 1]
+    return prob
+
+
+def fit_student(
+    fit_df: pd.DataFrame,
+    fit_soft: np.ndarray,
+    valid_df: pd.DataFrame,
+    valid_soft: np.ndarray,
+    args: argparse.Namespace,
+) -> xgboost.Booster:
+    """Shallow booster trained on soft targets, early-stopped on the validation tail."""
+    base_score = float(np.clip(fit_soft.mean(), 1e-4, 1 - 1e-4))
+    params = {
+        "objective": "binary:logistic",
+        "eval_metric": "logloss",
+        "max_depth": args.max_depth,
+        "learning_rate": args.learning_rate,
+        "base_score": base_score,
+        "tree_method": "hist",
+        "nthread": args.n_jobs,
+        "seed": 42,
+    }
+    dfit = xgboost.DMatrix(fit_df[FEATURES], label=fit_soft, feature_names=FEATURES)
+    dvalid = xgboost.DMatrix(valid_df[FEATURES], label=valid_soft, feature_names=FEATURES)
+    booster = xgboost.train(
+        params,
+        dfit,
+        num_boost_round=args.max_rounds,
+        evals=[(dvalid, "valid")],
+        early_stopping_rounds=args.early_stopping_rounds,
+        verbose_eval=False,
+    )
+    return booster[: booster.best_iteration + 1]
+
+
+def export_trees(booster: xgboost.Booster) -> list[dict]:
+    """Flat node arrays per tree, with node ids renumbered to row positions."""
+    nodes = booster.trees_to_dataframe()
+    feature_index = {name: i for i, name in enumerate(FEATURES)}
+    trees = []
+    for _, tree in nodes.groupby("Tree", sort=True):
+        position = {node_id: i for i, node_id in enumerate(tree["ID"])}
+        leaf = (tree["Feature"] == "Leaf").to_numpy()
+
+        def child(column: str) -> list[int]:
+            return [0 if is_leaf else position[node_id] for is_leaf, node_id in zip(leaf, tree[column])]
+
+        trees.append(
+            {
+                "feature": [-1 if is_leaf else feature_index[name] for is_leaf, name in zip(leaf, tree["Feature"])],
+                "threshold": np.where(leaf, 0.0, tree["Split"].fillna(0.0)).tolist(),
+                "left": child("Yes"),
+                "right": child("No"),
+                "missing_left": [bool(not is_leaf and m == y) for is_leaf, m, y in zip(leaf, tree["Missing"], tree["Yes"])],
+                # trees_to_dataframe stores the leaf value in the Gain column.
+                "value": np.where(leaf, tree["Gain"], 0.0).tolist(),
+            }
+        )
+    return trees
+
+
+def student_payload(booster: xgboost.Booster, chunk: str, args: argparse.Namespace) -> dict:
+    config = json.loads(booster.save_config())
+    base_score = float(np.ravel(json.loads(config["learner"]["learner_model_param"]["base_score"]))[0])
+    return {
+        "format": STUDENT_FORMAT,
+        "version": STUDENT_FORMAT_VERSION,
+        "chunk": chunk,
+        "features": FEATURES,
+        "base_margin": float(np.log(base_score / (1.0 - base_score))),
+        "max_depth": args.max_depth,
+        "trees": export_trees(booster),
+    }
+
+
+def expected_calibration_error(y_true: np.ndarray, prob: np.ndarray, bins: int = CALIBRATION_BINS) -> float:
+    """Row-weighted gap between mean probability and observed rate over equal-width bins."""
+    which = np.minimum((prob * bins).astype(int), bins - 1)
+    prob_sum = np.bincount(which, weights=prob, minlength=bins)
+    true_sum = np.bincount(which, weights=y_true, minlength=bins)
+    return float(np.abs(prob_sum - true_sum).sum() / max(len(prob), 1))
+
+
+def _tiers(prob: np.ndarray) -> np.ndarray:
+    return np.searchsorted(np.array(list(TIER_THRESHOLDS.values())), prob, side="right")
+
+
+def compare(y_true: np.ndarray, teacher: np.ndarray, student: np.ndarray) -> dict:
+    report = {}
+    for name, prob in (("teacher", teacher), ("student", student)):
+        report[f"{name}_brier"] = float(brier_score_loss(y_true, prob))
+        report[f"{name}_ece"] = expected_calibration_error(y_true, prob)
+        report[f"{name}_ap"] = float(average_precision_score(y_true, prob)) if y_true.any() else np.nan
+        report[f"{name}_auc"] = float(roc_auc_score(y_true, prob)) if 0 < y_true.sum() < len(y_true) else np.nan
+        for tier, threshold in TIER_THRESHOLDS.items():
+            report[f"{name}_recall_{tier}"] = float((prob[y_true == 1] >= threshold).mean()) if y_true.any() else np.nan
+    gap = np.abs(student - teacher)
+    report["fidelity_mae"] = float(gap.mean())
+    report["fidelity_p99"] = float(np.quantile(gap, 0.99))
+    report["tier_agreement"] = float((_tiers(student) == _tiers(teacher)).mean())
+    return report
+
+
+def passes(report: dict, args: argparse.Namespace) -> bool:
+    recall_ok = all(
+        not report[f"teacher_recall_{tier}"] > report[f"student_recall_{tier}"] + args.max_recall_drop
+        for tier in TIER_THRESHOLDS
+    )
+    return recall_ok and report["student_ece"] <= report["teacher_ece"] + args.max_ece_increase
+
+
+def main():
+    args = parse_args()
+    chunks = normalize_chunks(args.chunks)
+    records = []
+
+    for chunk in chunks:
+        csv_path = Path(args.labeled_pattern.format(chunk=chunk))
+        bundle_path = Path(args.bundle_pattern.format(chunk=chunk))
+        if not csv_path.exists() or not bundle_path.exists():
+            print(f"Skipping {chunk}: need {csv_path} and {bundle_path} (run train_chunk_ensemble.py first)")
+            continue
+
+        teacher = teacher_fingerprint(bundle_path)
+        bundle = joblib.load(bundle_path)
+        df = pd.read_csv(csv_path, parse_dates=["time"]).sort_values("time")
+        train_df, test_df = split_time_per_district(df, args.split_ratio)
+        fit_df, valid_df = split_time_per_district(train_df, args.valid_ratio)
+
+        fit_soft = teacher_probability(bundle, fit_df[FEATURES])
+        valid_soft = teacher_probability(bundle, valid_df[FEATURES])
+        booster = fit_student(fit_df, fit_soft, valid_df, valid_soft, args)
+        payload = student_payload(booster, chunk, args)
+
+        # The JSON export must reproduce the booster it came from.
+        student = StudentModel(payload)
+        x_test = test_df[FEATURES]
+        exported = student.predict_proba(x_test)[:, 1]
+        reference = booster.predict(xgboost.DMatrix(x_test, feature_names=FEATURES))
+        export_error = float(np.abs(exported - reference).max()) if len(x_test) else 0.0
+        if export_error > 1e-5:
+            raise RuntimeError(f"{chunk}: exported student differs from the booster by {export_error:.2e}")
+
+        y_test = test_df[TARGET].to_numpy()
+        report = compare(y_test, teacher_probability(bundle, x_test), exported)
+        accepted = passes(report, args)
+        record = {
+            "chunk": chunk,
+            "trees": student.n_trees,
+            "max_depth": args.max_depth,
+            "test_rows": int(len(test_df)),
+            "test_positives": int(y_test.sum()),
+            **report,
+            "accepted": accepted,
+        }
+        records.append(record)
+
+        print(
+            f"{chunk}: {student.n_trees} trees | recall Y/O/R "
+            + "/".join(f"{report[f'student_recall_{t}']:.3f}" for t in TIER_THRESHOLDS)
+            + " vs teacher "
+            + "/".join(f"{report[f'teacher_recall_{t}']:.3f}" for t in TIER_THRESHOLDS)
+            + f" | ECE {report['student_ece']:.4f} vs {report['teacher_ece']:.4f}"
+            + f" | tier agreement {report['tier_agreement']:.3f}"
+        )
+
+        student_path = Path(args.student_pattern.format(chunk=chunk))
+        if not (accepted or args.force):
+            print(f"Not exporting {chunk}: student fails the recall/calibration checks (use --force to override)")
+            if student_path.exists():
+                student_path.unlink()
+                print("Removed stale student ->", student_path)
+            continue
+
+        payload["validation"] = {key: value for key, value in record.items() if key != "chunk"}
+        # The backend only serves the student while this exact bundle is deployed.
+        payload["teacher"] = {**teacher, "ensemble_weights": bundle.get("ensemble_weights")}
+        student_path.parent.mkdir(parents=True, exist_ok=True)
+        student_path.write_text(json.dumps(payload), encoding="utf-8")
+        print(f"Saved student ({student_path.stat().st_size / 1024:.1f} KB) ->", student_path)
+
+    if records:
+        report_csv = Path(args.report_csv)
+        report_csv.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(records).to_csv(report_csv, index=False)
+        print("Saved distillation report ->", report_csv)
+
+
+if __name__ == "__main__":
+    main()
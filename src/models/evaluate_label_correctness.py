@@ -1,73 +1,252 @@
-#this is a script to evaluate the correctness of the cloudburst labels by comparing them to a historic dataset of known cloudburst events. It checks if the labeled hours match with the historic events within a ±24 hour window and calculates recall metrics.
+# Evaluate the cloudburst labels against the historic record of known cloudburst events.
+# Each historic event is matched to a district (polygon, district name, or nearest centroid)
+# and counts as detected when a labeled event in that district overlaps a ±window around its date.
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-from datetime import timedelta
-
-HISTORIC_CSV = "data/historic_events.csv"
-LABELED_CSV = "data/processed/labeled_cloudburst.csv"
-
-# --------------------------------
-# LOAD DATA
-# --------------------------------
-historic = pd.read_csv(
-    HISTORIC_CSV,
-    parse_dates=["Date"],
-    dayfirst=True
-)
-
-# --------------------------------
-# FILTER VALID EVENTS
-# --------------------------------
-historic = historic[
-    (historic["Date"].dt.year >= 2001) &
-    (historic["Severity"].isin(["Moderate", "Severe", "Catastrophic"])) &
-    (~historic["Location"].str.contains("glacial|avalanche", case=False, na=False))
-]
-
-print(f"Filtered historic events (valid): {len(historic)}")
-
-
-labels = pd.read_csv(
-    LABELED_CSV,
-    parse_dates=["time"]
-)
-
-print(f"Total historic events: {len(historic)}")
-
-# Only hours labeled as cloudburst
-detected_hours = labels[labels["cloudburst"] == 1]["time"]
-
-# --------------------------------
-# MATCH WITH ±24 HOUR WINDOW
-# --------------------------------
-WINDOW = timedelta(hours=24)
-
-def detected_within_window(event_date):
-    start = event_date - WINDOW
-    end = event_date + WINDOW
-    return ((detected_hours >= start) & (detected_hours <= end)).any()
-
-historic["Detected"] = historic["Date"].apply(detected_within_window)
-
-# --------------------------------
-# METRICS
-# --------------------------------
-total = len(historic)
-detected = historic["Detected"].sum()
-missed = total - detected
-recall = detected / total
-
-print("\n=== LABEL CORRECTNESS (±24h window) ===")
-print(f"Total historic events   : {total}")
-print(f"Detected by labels      : {detected}")
-print(f"Missed events           : {missed}")
-print(f"Recall                  : {recall:.2%}")
-
-# --------------------------------
-# MISSED EVENTS
-# --------------------------------
-print("\n=== MISSED EVENTS ===")
-print(
-    historic[~historic["Detected"]][
-        ["Date", "Location", "State", "Severity", "Detected"]
-    ].to_string(index=False)
-)
+
+try:
+    from src.common.himalaya_chunks import list_chunks
+    from src.common.spatial_index import DistrictLocator
+    from src.labels.segment_events import segment_events
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common.himalaya_chunks import list_chunks
+    from src.common.spatial_index import DistrictLocator
+    from src.labels.segment_events import segment_events
+
+VALID_SEVERITIES = ["Moderate", "Severe", "Catastrophic"]
+EXCLUDE_PATTERN = "glacial|avalanche"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-district recall of cloudburst labels against historic events.")
+    parser.add_argument("--historic_csv", type=str, default="data/historic_events.csv")
+    parser.add_argument("--events_csv", type=str, default="data/processed/cloudburst_events.csv")
+    parser.add_argument(
+        "--labeled_csv",
+        nargs="*",
+        default=None,
+        help="Hourly label files to segment when --events_csv does not exist. "
+        "Defaults to the per-chunk district files, then labeled_cloudburst_all_regions.csv.",
+    )
+    parser.add_argument("--lookup_csv", type=str, default="data/processed/himalaya_district_lookup.csv")
+    parser.add_argument("--districts_file", type=str, default="data/processed/himalaya_districts_with_chunks.geojson")
+    parser.add_argument(
+        "--max_distance_km",
+        type=float,
+        default=50.0,
+        help="Historic events farther than this from every district centroid are left unmatched.",
+    )
+    parser.add_argument("--window_hours", type=int, default=24)
+    parser.add_argument("--min_year", type=int, default=2001)
+    parser.add_argument("--severities", nargs="+", default=VALID_SEVERITIES)
+    parser.add_argument("--output_csv", type=str, default="results/label_correctness_by_district.csv")
+    parser.add_argument("--events_out", type=str, default="results/label_correctness_events.csv")
+    return parser.parse_args()
+
+
+def load_historic(path: Path, min_year: int, severities: list[str]) -> pd.DataFrame:
+    historic = pd.read_csv(path)
+    historic["Date"] = pd.to_datetime(historic["Date"], errors="coerce", dayfirst=True)
+    historic = historic[
+        (historic["Date"].dt.year >= min_year)
+        & (historic["Severity"].isin(severities))
+        & (~historic["Location"].str.contains(EXCLUDE_PATTERN, case=False, na=False))
+    ]
+    return historic.reset_index(drop=True)
+
+
+def _default_labeled_csvs() -> list[Path]:
+    per_chunk = [Path(f"data/processed/labeled_cloudburst_district_{chunk}.csv") for chunk in list_chunks()]
+    existing = [path for path in per_chunk if path.exists()]
+    return existing or [Path("data/processed/labeled_cloudburst_all_regions.csv")]
+
+
+def load_events(events_csv: Path, labeled_csvs: list[str] | None) -> pd.DataFrame:
+    if events_csv.exists():
+        events = pd.read_csv(events_csv, dtype={"district_id": str}, parse_dates=["start_time", "end_time"])
+    else:
+        paths = [Path(p) for p in labeled_csvs] if labeled_csvs else _default_labeled_csvs()
+        frames = [segment_events(pd.read_csv(p, dtype={"district_id": str}, parse_dates=["time"])) for p in paths]
+        events = pd.concat(frames, ignore_index=True)
+        events["event_id"] = np.arange(1, len(events) + 1)
+    if "district_id" not in events.columns:
+        raise ValueError("Labeled events carry no district_id; rebuild them from the district-level label files.")
+    return events
+
+
+def match_districts(
+    historic: pd.DataFrame,
+    lookup: pd.DataFrame,
+    districts_file: Path | None,
+    max_distance_km: float,
+) -> pd.DataFrame:
+    """Lookup row, method and distance for every historic event.
+
+    Coordinates inside a district polygon win; otherwise a unique district-name match; otherwise
+    the nearest centroid within ``max_distance_km``. Anything else is ``unmatched``.
+    """
+    n = len(historic)
+    row = np.full(n, -1, dtype=np.int64)
+    method = np.full(n, "unmatched", dtype=object)
+    distance = np.full(n, np.nan)
+
+    lats = pd.to_numeric(historic.get("Latitude"), errors="coerce").to_numpy(dtype=float)
+    lons = pd.to_numeric(historic.get("Longitude"), errors="coerce").to_numpy(dtype=float)
+    has_coords = np.isfinite(lats) & np.isfinite(lons)
+    nearest_idx = np.full(n, -1, dtype=np.int64)
+    if has_coords.any():
+        locator = DistrictLocator.from_frame(lookup, districts_file)
+        idx, dist, contained = locator.locate_many(lats[has_coords], lons[has_coords])
+        coord_rows = np.flatnonzero(has_coords)
+        nearest_idx[coord_rows] = idx
+        distance[coord_rows] = dist
+        inside = coord_rows[contained]
+        row[inside] = idx[contained]
+        method[inside] = "polygon"
+
+    names = lookup["district_name"].astype(str).str.strip().str.lower()
+    unique_names = names[~names.duplicated(keep=False)]
+    name_rows = pd.Series(unique_names.index.to_numpy(), index=unique_names.to_numpy())
+    by_name = historic["District"].astype(str).str.strip().str.lower().map(name_rows).to_numpy()
+    named = (row < 0) & ~pd.isna(by_name)
+    row[named] = by_name[named].astype(np.int64)
+    method[named] = "name"
+
+    near = (row < 0) & has_coords & (distance <= max_distance_km)
+    row[near] = nearest_idx[near]
+    method[near] = "centroid"
+
+    matched = pd.DataFrame({"match_method": method, "match_distance_km": np.round(distance, 2)})
+    for col in ("district_id", "district_name", "chunk"):
+        values = lookup[col].astype(str).to_numpy() if col in lookup.columns else np.full(len(lookup), "", dtype=object)
+        matched[col] = np.where(row >= 0, values[np.clip(row, 0, None)], None)
+    return matched
+
+
+def interval_join(
+    events: pd.DataFrame,
+    district_ids: np.ndarray,
+    window_starts: np.ndarray,
+    window_ends: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """For each (district, window), whether a labeled event in that district overlaps it.
+
+    Events are sorted by (district, start) and mapped onto one axis where each district owns
+    a disjoint span, so a running maximum of event ends never leaks across districts and a
+    single ``searchsorted`` answers every window. Returns the hit mask and, for hits, the
+    row of the overlapping event that ends last.
+    """
+    n = len(district_ids)
+    hits = np.zeros(n, dtype=bool)
+    matched = np.full(n, -1, dtype=np.int64)
+    if len(events) == 0 or n == 0:
+        return hits, matched
+
+    codes, uniques = pd.factorize(events["district_id"].astype(str), sort=True)
+    # Whole seconds keep (district code x span) well inside int64.
+    starts = events["start_time"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    ends = events["end_time"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+    win_starts = np.asarray(window_starts, dtype="datetime64[s]").astype(np.int64)
+    win_ends = np.asarray(window_ends, dtype="datetime64[s]").astype(np.int64)
+
+    query_codes = pd.Index(uniques).get_indexer(pd.Series(district_ids).astype(str))
+    known = (query_codes >= 0) & ~np.isnat(np.asarray(window_starts, dtype="datetime64[s]"))
+    if not known.any():
+        return hits, matched
+    q_codes = query_codes[known]
+    win_starts, win_ends = win_starts[known], win_ends[known]
+
+    origin = min(starts.min(), win_starts.min())
+    span = max(ends.max(), win_ends.max()) - origin + 1
+    order = np.lexsort((starts, codes))
+    codes, starts, ends = codes[order], starts[order] - origin, ends[order] - origin
+
+    start_keys = codes * span + starts
+    end_keys = codes * span + ends
+    latest_end = np.maximum.accumulate(end_keys)
+    positions = np.arange(len(end_keys))
+    latest_row = np.maximum.accumulate(np.where(end_keys == latest_end, positions, 0))
+
+    last = np.searchsorted(start_keys, q_codes * span + (win_ends - origin), side="right") - 1
+    valid = last >= 0
+    valid[valid] &= codes[last[valid]] == q_codes[valid]
+    valid[valid] &= latest_end[last[valid]] - q_codes[valid] * span >= win_starts[valid] - origin
+
+    rows = np.flatnonzero(known)[valid]
+    hits[rows] = True
+    matched[rows] = order[latest_row[last[valid]]]
+    return hits, matched
+
+
+def recall_table(matches: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    table = matches.groupby(keys, dropna=False)["Detected"].agg(historic_events="count", detected="sum").reset_index()
+    table["detected"] = table["detected"].astype(int)
+    table["missed"] = table["historic_events"] - table["detected"]
+    table["recall"] = table["detected"] / table["historic_events"]
+    return table
+
+
+def main():
+    args = parse_args()
+    historic = load_historic(Path(args.historic_csv), args.min_year, args.severities)
+    print(f"Filtered historic events (valid): {len(historic)}")
+
+    events = load_events(Path(args.events_csv), args.labeled_csv)
+    print(f"Labeled events: {len(events)}")
+
+    lookup = pd.read_csv(args.lookup_csv, dtype={"district_id": str})
+    districts_file = Path(args.districts_file) if args.districts_file else None
+    matched = match_districts(historic, lookup, districts_file, args.max_distance_km)
+    historic = pd.concat([historic, matched], axis=1)
+
+    window = pd.Timedelta(hours=args.window_hours)
+    in_area = historic["district_id"].notna().to_numpy()
+    hits, event_rows = interval_join(
+        events,
+        historic["district_id"].to_numpy(),
+        (historic["Date"] - window).to_numpy(),
+        (historic["Date"] + window).to_numpy(),
+    )
+    historic["Detected"] = hits
+    historic["matched_event_id"] = np.where(hits, events["event_id"].to_numpy()[np.clip(event_rows, 0, None)], np.nan)
+    historic["matched_start_time"] = pd.Series(
+        np.where(hits, events["start_time"].to_numpy()[np.clip(event_rows, 0, None)], np.datetime64("NaT"))
+    )
+
+    scored = historic[in_area]
+    by_district = recall_table(scored, ["chunk", "district_name"]).sort_values(["chunk", "district_name"])
+    by_chunk = recall_table(scored, ["chunk"])
+
+    for path, frame in ((args.output_csv, by_district), (args.events_out, historic)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        frame.to_csv(path, index=False)
+
+    total = len(scored)
+    detected = int(scored["Detected"].sum())
+    print(f"\n=== LABEL CORRECTNESS (±{args.window_hours}h window, same district) ===")
+    print(f"Historic events in study area : {total} (outside: {int((~in_area).sum())})")
+    print(f"Detected by labels            : {detected}")
+    print(f"Missed events                 : {total - detected}")
+    print(f"Recall                        : {detected / total:.2%}" if total else "Recall                        : n/a")
+    print("\nMatch methods:", historic["match_method"].value_counts().to_dict())
+
+    print("\n=== RECALL BY CHUNK ===")
+    print(by_chunk.to_string(index=False))
+    print("\n=== MISSED EVENTS ===")
+    print(
+        scored[~scored["Detected"]][["Date", "Location", "district_name", "chunk", "Severity", "match_method"]].to_string(
+            index=False
+        )
+    )
+    print("\nSaved ->", args.output_csv)
+    print("Saved ->", args.events_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Learn per-chunk blend weights and pick a pruned ensemble on the accuracy/latency front.
+
+Members are refit on the early part of each district's training history and scored on
+its tail (the same time-ordered split the tuner uses), so weights are learned on rows the
+models have not seen. Pruned variants come almost for free: a random forest's first ``k``
+trees and a booster's first ``k`` rounds are themselves valid models, so only the
+shallower-depth variants need an extra fit. Every (RF variant, XGB variant) pair gets the
+blend weight that maximises validation average precision; single-member ensembles are
+candidates too.
+
+Inference latency is measured per member (one-row and batch ``predict_proba``, as the
+backend calls it), so a candidate's cost is the sum of the members it evaluates. The
+cheapest candidate on the Pareto front within ``--max_ap_loss`` of the best validation
+AP is written to ``models/chunks/<chunk>/ensemble_config.json`` and applied to the deployed
+bundle ``models/<chunk>_model.pkl``: the chosen members are refit on the training split and
+``ensemble_weights`` is updated, which the backend honours. ``train_chunk_ensemble.py``
+reads the same config, so a retrain keeps the choice.
+"""
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, roc_auc_score
+from xgboost import XGBClassifier
+
+try:
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.models.train_chunk_ensemble import (
+        ENSEMBLE_CONFIG_FILE,
+        FEATURES,
+        TARGET,
+        build_rf,
+        build_xgb,
+        fit_configured_ensemble,
+        load_tuned_params,
+        split_time_per_district,
+    )
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.models.train_chunk_ensemble import (
+        ENSEMBLE_CONFIG_FILE,
+        FEATURES,
+        TARGET,
+        build_rf,
+        build_xgb,
+        fit_configured_ensemble,
+        load_tuned_params,
+        split_time_per_district,
+    )
+
+RF_TREE_COUNTS = [25, 50, 100, 150]
+RF_SHALLOW_DEPTH = 8
+XGB_ROUND_FRACTIONS = [0.25, 0.5, 0.75]
+XGB_SHALLOW_DEPTH = 3
+WEIGHT_GRID = np.round(np.linspace(0.05, 0.95, 19), 2)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Blend-weight learning and ensemble pruning per chunk.")
+    parser.add_argument("--chunks", nargs="+", default=list_chunks())
+    parser.add_argument(
+        "--labeled_pattern",
+        type=str,
+        default="data/processed/labeled_cloudburst_district_{chunk}.csv",
+    )
+    parser.add_argument("--models_dir", type=str, default="models/chunks")
+    parser.add_argument("--bundle_pattern", type=str, default="models/{chunk}_model.pkl")
+    parser.add_argument("--pareto_csv", type=str, default="results/ensemble_pareto.csv")
+    parser.add_argument("--split_ratio", type=float, default=0.8)
+    parser.add_argument("--valid_ratio", type=float, default=0.8)
+    parser.add_argument(
+        "--max_ap_loss",
+        type=float,
+        default=0.005,
+        help="Pick the cheapest front candidate whose validation AP is within this of the best.",
+    )
+    parser.add_argument("--latency_repeats", type=int, default=50)
+    parser.add_argument("--batch_rows", type=int, default=256)
+    parser.add_argument("--dry_run", action="store_true", help="Report the front without touching the bundle.")
+    return parser.parse_args()
+
+
+def prune_forest(rf, n_trees: int):
+    """The forest restricted to its first ``n_trees`` trees."""
+    pruned = copy.copy(rf)
+    pruned.estimators_ = rf.estimators_[:n_trees]
+    pruned.n_estimators = n_trees
+    return pruned
+
+
+def truncate_booster(xgb: XGBClassifier, rounds: int) -> XGBClassifier:
+    """A standalone classifier holding only the first ``rounds`` boosting rounds."""
+    truncated = XGBClassifier()
+    truncated.load_model(bytearray(xgb.get_booster()[:rounds].save_raw("ubj")))
+    return truncated
+
+
+def _rf_variants(rf, prefix: str) -> dict[str, dict]:
+    variants = {f"{prefix}_t{len(rf.estimators_)}": {"model": rf, "n_trees": len(rf.estimators_)}}
+    for n_trees in RF_TREE_COUNTS:
+        if n_trees < len(rf.estimators_):
+            variants[f"{prefix}_t{n_trees}"] = {"model": prune_forest(rf, n_trees), "n_trees": n_trees}
+    return variants
+
+
+def _xgb_variants(xgb: XGBClassifier, prefix: str) -> dict[str, dict]:
+    total = xgb.get_booster().num_boosted_rounds()
+    variants = {f"{prefix}_r{total}": {"model": xgb, "rounds": total}}
+    for fraction in XGB_ROUND_FRACTIONS:
+        rounds = max(1, int(total * fraction))
+        if rounds < total:
+            variants[f"{prefix}_r{rounds}"] = {"model": truncate_booster(xgb, rounds), "rounds": rounds}
+    return variants
+
+
+def _shallower(depth: int | None, shallow: int) -> bool:
+    return depth is None or depth > shallow
+
+
+def member_variants(fit_df: pd.DataFrame, params: dict) -> tuple[dict, dict]:
+    """RF and XGB variants fitted on ``fit_df``: full, fewer trees/rounds, and shallower."""
+    x, y = fit_df[FEATURES], fit_df[TARGET]
+    rf_params, xgb_params = params.get("rf", {}), params.get("xgb", {})
+
+    rf = build_rf(params=rf_params).fit(x, y)
+    rf_fits = {rf.max_depth: rf}
+    if _shallower(rf.max_depth, RF_SHALLOW_DEPTH):
+        rf_fits[RF_SHALLOW_DEPTH] = build_rf(params={**rf_params, "max_depth": RF_SHALLOW_DEPTH}).fit(x, y)
+    xgb = build_xgb(y, params=xgb_params).fit(x, y)
+    xgb_fits = {xgb.get_params()["max_depth"]: xgb}
+    if _shallower(xgb.get_params()["max_depth"], XGB_SHALLOW_DEPTH):
+        xgb_fits[XGB_SHALLOW_DEPTH] = build_xgb(y, params={**xgb_params, "max_depth": XGB_SHALLOW_DEPTH}).fit(x, y)
+
+    rf_variants, xgb_variants = {}, {}
+    for depth, model in rf_fits.items():
+        for name, variant in _rf_variants(model, f"rf_d{depth}").items():
+            rf_variants[name] = {**variant, "max_depth": depth}
+    for depth, model in xgb_fits.items():
+        for name, variant in _xgb_variants(model, f"xgb_d{depth}").items():
+            xgb_variants[name] = {**variant, "max_depth": depth}
+    return rf_variants, xgb_variants
+
+
+def measure_latency(model, sample: pd.DataFrame, repeats: int, batch_rows: int) -> tuple[float, float]:
+    """Median one-row and batch ``predict_proba`` time in milliseconds."""
+    row = sample.iloc[:1]
+    batch = sample.iloc[:batch_rows]
+    model.predict_proba(row)
+    single = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - started)
+    batched = []
+    for _ in range(max(3, repeats // 10)):
+        started = time.perf_counter()
+        model.predict_proba(batch)
+        batched.append(time.perf_counter() - started)
+    return float(np.median(single) * 1000), float(np.median(batched) * 1000)
+
+
+def pareto_front(candidates: pd.DataFrame) -> np.ndarray:
+    """Candidates no other candidate beats on both validation AP and one-row latency."""
+    order = candidates.sort_values(["latency_ms", "valid_ap"], ascending=[True, False]).index
+    best_ap = -np.inf
+    front = []
+    for idx in order:
+        if candidates.at[idx, "valid_ap"] > best_ap:
+            front.append(idx)
+            best_ap = candidates.at[idx, "valid_ap"]
+    return candidates.index.isin(front)
+
+
+def score_candidates(
+    rf_variants: dict,
+    xgb_variants: dict,
+    valid_df: pd.DataFrame,
+    test_df: pd.DataFrame,
+    args: argparse.Namespace,
+) -> pd.DataFrame:
+    y_valid, y_test = valid_df[TARGET].to_numpy(), test_df[TARGET].to_numpy()
+    members = {}
+    for name, variant in {**rf_variants, **xgb_variants}.items():
+        model = variant["model"]
+        single_ms, batch_ms = measure_latency(model, valid_df[FEATURES], args.latency_repeats, args.batch_rows)
+        members[name] = {
+            "valid": model.predict_proba(valid_df[FEATURES])[:, 1],
+            "test": model.predict_proba(test_df[FEATURES])[:, 1],
+            "latency_ms": single_ms,
+            "batch_ms": batch_ms,
+        }
+
+    rows = []
+
+    def add(rf_name: str | None, xgb_name: str | None, w_rf: float, weighting: str = "learned") -> None:
+        parts = [(name, w) for name, w in ((rf_name, w_rf), (xgb_name, 1.0 - w_rf)) if name is not None and w > 0]
+        valid = sum(w * members[name]["valid"] for name, w in parts)
+        test = sum(w * members[name]["test"] for name, w in parts)
+        rows.append(
+            {
+                "rf_variant": rf_name if w_rf > 0 else None,
+                "xgb_variant": xgb_name if w_rf < 1 else None,
+                "w_rf": float(w_rf),
+                "w_xgb": round(1.0 - float(w_rf), 2),
+                "weighting": weighting,
+                "valid_ap": average_precision_score(y_valid, valid),
+                "test_ap": average_precision_score(y_test, test) if y_test.any() else np.nan,
+                "test_auc": roc_auc_score(y_test, test) if 0 < y_test.sum() < len(y_test) else np.nan,
+                "latency_ms": sum(members[name]["latency_ms"] for name, _ in parts),
+                "batch_ms": sum(members[name]["batch_ms"] for name, _ in parts),
+            }
+        )
+
+    for rf_name in rf_variants:
+        add(rf_name, None, 1.0)
+    for xgb_name in xgb_variants:
+        add(None, xgb_name, 0.0)
+    for rf_name in rf_variants:
+        for xgb_name in xgb_variants:
+            blended = [
+                average_precision_score(y_valid, w * members[rf_name]["valid"] + (1 - w) * members[xgb_name]["valid"])
+                for w in WEIGHT_GRID
+            ]
+            add(rf_name, xgb_name, float(WEIGHT_GRID[int(np.argmax(blended))]))
+    # The deployed configuration before this stage: full members, fixed 0.5/0.5 blend.
+    add(next(iter(rf_variants)), next(iter(xgb_variants)), 0.5, weighting="fixed")
+
+    candidates = pd.DataFrame(rows)
+    candidates["pareto"] = pareto_front(candidates)
+    return candidates
+
+
+def choose(candidates: pd.DataFrame, max_ap_loss: float) -> pd.Series:
+    front = candidates[candidates["pareto"]]
+    eligible = front[front["valid_ap"] >= candidates["valid_ap"].max() - max_ap_loss]
+    return eligible.sort_values("latency_ms").iloc[0]
+
+
+def apply_to_bundle(
+    bundle: dict,
+    chosen: pd.Series,
+    rf_variants: dict,
+    xgb_variants: dict,
+    train_df: pd.DataFrame,
+    params: dict,
+) -> dict:
+    """Refit the deployed members to the chosen variant on the training split and set its weights.
+
+    Goes through ``fit_configured_ensemble``, the same path ``train_chunk_ensemble.py``
+    takes for a chunk with an ensemble config, so both produce the same bundle.
+    """
+    config = {"ensemble_weights": {"rf": float(chosen["w_rf"]), "xgb": float(chosen["w_xgb"])}}
+    if chosen["rf_variant"] is not None:
+        spec = rf_variants[chosen["rf_variant"]]
+        config["rf"] = {"n_trees": spec["n_trees"], "max_depth": spec["max_depth"]}
+    if chosen["xgb_variant"] is not None:
+        spec = xgb_variants[chosen["xgb_variant"]]
+        config["xgb"] = {"rounds": spec["rounds"], "max_depth": spec["max_depth"]}
+
+    rf, xgb, _ = fit_configured_ensemble(train_df[FEATURES], train_df[TARGET], params=params, config=config)
+    bundle = {key: value for key, value in bundle.items() if key not in ("rf_model", "xgb_model")}
+    if rf is not None:
+        bundle["rf_model"] = rf
+    if xgb is not None:
+        bundle["xgb_model"] = xgb
+    bundle["ensemble_weights"] = config["ensemble_weights"]
+    bundle["ensemble_config"] = config
+    return bundle
+
+
+def main():
+    args = parse_args()
+    chunks = normalize_chunks(args.chunks)
+    reports = []
+
+    for chunk in chunks:
+        csv_path = Path(args.labeled_pattern.format(chunk=chunk))
+        bundle_path = Path(args.bundle_pattern.format(chunk=chunk))
+        if not csv_path.exists() or not bundle_path.exists():
+            print(f"Skipping {chunk}: need {csv_path} and {bundle_path} (run train_chunk_ensemble.py first)")
+            continue
+
+        bundle = joblib.load(bundle_path)
+        df = pd.read_csv(csv_path, parse_dates=["time"]).sort_values("time")
+        train_df, test_df = split_time_per_district(df, args.split_ratio)
+        fit_df, valid_df = split_time_per_district(train_df, args.valid_ratio)
+        if int(valid_df[TARGET].sum()) == 0:
+            print(f"Skipping {chunk}: no positives in the validation tail")
+            continue
+
+        chunk_dir = Path(args.models_dir) / chunk
+        params = load_tuned_params(chunk_dir) or {}
+        rf_variants, xgb_variants = member_variants(fit_df, params)
+        candidates = score_candidates(rf_variants, xgb_variants, valid_df, test_df, args)
+        chosen = choose(candidates, args.max_ap_loss)
+        candidates.insert(0, "chunk", chunk)
+        candidates["chosen"] = candidates.index == chosen.name
+        reports.append(candidates)
+
+        baseline = candidates[candidates["weighting"] == "fixed"].iloc[0]
+        print(
+            f"{chunk}: chose rf={chosen['rf_variant']} xgb={chosen['xgb_variant']} w_rf={chosen['w_rf']:.2f} | "
+            f"valid AP {chosen['valid_ap']:.4f} vs 0.5/0.5 full {baseline['valid_ap']:.4f} | "
+            f"{chosen['latency_ms']:.2f} ms vs {baseline['latency_ms']:.2f} ms per row"
+        )
+        if args.dry_run:
+            continue
+
+        bundle = apply_to_bundle(bundle, chosen, rf_variants, xgb_variants, train_df, params)
+        joblib.dump(bundle, bundle_path)
+        config = {
+            "chunk": chunk,
+            **bundle["ensemble_config"],
+            "validation": {
+                "metric": "average_precision",
+                "chosen": float(chosen["valid_ap"]),
+                "fixed_full_ensemble": float(baseline["valid_ap"]),
+                "max_ap_loss": args.max_ap_loss,
+            },
+            "latency_ms": {"chosen": float(chosen["latency_ms"]), "fixed_full_ensemble": float(baseline["latency_ms"])},
+        }
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        (chunk_dir / ENSEMBLE_CONFIG_FILE).write_text(json.dumps(config, indent=2), encoding="utf-8")
+        meta_path = chunk_dir / "ensemble_meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["ensemble_weights"] = bundle["ensemble_weights"]
+            meta["ensemble_config"] = bundle["ensemble_config"]
+            meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        print("Updated bundle ->", bundle_path)
+
+    if reports:
+        pareto_csv = Path(args.pareto_csv)
+        pareto_csv.parent.mkdir(parents=True, exist_ok=True)
+        pd.concat(reports, ignore_index=True).to_csv(pareto_csv, index=False)
+        print("Saved Pareto report ->", pareto_csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,14 @@ import numpy as np
 import pandas as pd
 import joblib
 
+try:
+    from src.labels.segment_events import segment_events
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.labels.segment_events import segment_events
+
 MAX_ALERTS = {"RED": 1, "ORANGE": 3}
 WINDOW_HOURS = 24
 
@@ -38,20 +46,35 @@ def find_threshold(prob_series: pd.Series, time_index: pd.Series, max_alerts_per
 
 
 def event_recall(df: pd.DataFrame, tiers: list[str]) -> float:
-    event_times = pd.to_datetime(df.loc[df["true_label"] == 1, "time"])
-    if len(event_times) == 0:
+    """Share of labeled events with an alert of ``tiers`` in the same district within WINDOW_HOURS of the event."""
+    group_cols = [col for col in ("district_id", "district_name") if col in df.columns]
+    events = segment_events(df, label_col="true_label", group_cols=group_cols)
+    if events.empty:
         return float("nan")
 
-    hits = 0
-    local = df.sort_values("time").copy()
-    local["time"] = pd.to_datetime(local["time"])
-    local = local.set_index("time")
-
-    for event_time in event_times:
-        window = local.loc[event_time - pd.Timedelta(hours=WINDOW_HOURS): event_time + pd.Timedelta(hours=WINDOW_HOURS)]
-        if window["risk_tier"].isin(tiers).any():
-            hits += 1
-    return hits / len(event_times)
+    if group_cols:
+        districts = pd.MultiIndex.from_frame(df[group_cols].astype(str))
+        known = districts.unique()
+        row_codes = known.get_indexer(districts)
+        event_codes = known.get_indexer(pd.MultiIndex.from_frame(events[group_cols].astype(str)))
+    else:
+        row_codes = np.zeros(len(df), dtype=np.int64)
+        event_codes = np.zeros(len(events), dtype=np.int64)
+
+    # One time axis per district (district code x span + seconds), so the alert search for an
+    # event never reaches the alerts of another district.
+    window = WINDOW_HOURS * 3600
+    times = pd.to_datetime(df["time"]).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    origin = times.min() - window
+    span = times.max() + window - origin + 1
+    alert = df["risk_tier"].isin(tiers).to_numpy()
+    alert_keys = np.sort(row_codes[alert] * span + (times[alert] - origin))
+
+    starts = events["start_time"].to_numpy(dtype="datetime64[s]").astype(np.int64) - origin
+    ends = events["end_time"].to_numpy(dtype="datetime64[s]").astype(np.int64) - origin
+    lo = np.searchsorted(alert_keys, event_codes * span + starts - window, side="left")
+    hi = np.searchsorted(alert_keys, event_codes * span + ends + window, side="right")
+    return float((hi > lo).mean())
 
 
 def assign_tier(probability: float, red_th: float, orange_th: float, yellow_th: float) -> str:
@@ -86,7 +109,8 @@ def main():
         orange_th = min(find_threshold(pd.Series(probs), group["time"], MAX_ALERTS["ORANGE"]), red_th)
         yellow_th = min(float(np.quantile(probs, 0.80)), orange_th)
 
-        result = group[[args.group_col, "time"]].copy()
+        keys = [args.group_col, *(col for col in ("district_id",) if col in group.columns and col != args.group_col)]
+        result = group[[*keys, "time"]].copy()
         result["probability"] = probs
         result["true_label"] = y
         result["risk_tier"] = result["probability"].apply(
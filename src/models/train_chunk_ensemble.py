@@ -30,6 +30,11 @@ FEATURES = [
     "t2m_grad",
 ]
 TARGET = "cloudburst"
+ENSEMBLE_WEIGHTS = {"rf": 0.5, "xgb": 0.5}
+RF_PARAMS = {"n_estimators": 300, "max_depth": 12, "min_samples_leaf": 50}
+XGB_PARAMS = {"n_estimators": 400, "max_depth": 6, "learning_rate": 0.05, "subsample": 0.8, "colsample_bytree": 0.8}
+TUNED_PARAMS_FILE = "tuned_params.json"
+ENSEMBLE_CONFIG_FILE = "ensemble_config.json"
 
 
 def parse_args():
@@ -47,6 +52,16 @@ def parse_args():
     parser.add_argument("--split_ratio", type=float, default=0.8)
     parser.add_argument("--min_rows", type=int, default=500)
     parser.add_argument("--min_positive", type=int, default=25)
+    parser.add_argument(
+        "--ignore_tuned",
+        action="store_true",
+        help=f"Use the default hyperparameters even when <models_dir>/<chunk>/{TUNED_PARAMS_FILE} exists.",
+    )
+    parser.add_argument(
+        "--ignore_ensemble_config",
+        action="store_true",
+        help=f"Train the full 0.5/0.5 ensemble even when <models_dir>/<chunk>/{ENSEMBLE_CONFIG_FILE} exists.",
+    )
     return parser.parse_args()
 
 
@@ -72,6 +87,99 @@ def split_time_per_district(df: pd.DataFrame, ratio: float) -> tuple[pd.DataFram
     return train, test
 
 
+def build_rf(n_jobs: int = -1, params: dict | None = None) -> RandomForestClassifier:
+    return RandomForestClassifier(
+        **{**RF_PARAMS, **(params or {})},
+        class_weight="balanced",
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+
+
+def build_xgb(y_train, n_jobs: int = -1, params: dict | None = None) -> XGBClassifier:
+    y_train = np.asarray(y_train)
+    scale_pos_weight = max((y_train == 0).sum() / max((y_train == 1).sum(), 1), 1.0)
+    return XGBClassifier(
+        **{**XGB_PARAMS, **(params or {})},
+        scale_pos_weight=scale_pos_weight,
+        eval_metric="logloss",
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+
+
+def fit_ensemble(
+    x_train, y_train, n_jobs: int = -1, params: dict | None = None
+) -> tuple[RandomForestClassifier, XGBClassifier]:
+    """Fit both members; ``params`` may override either one as ``{"rf": {...}, "xgb": {...}}``."""
+    params = params or {}
+    rf = build_rf(n_jobs, params.get("rf"))
+    rf.fit(x_train, y_train)
+    xgb = build_xgb(y_train, n_jobs, params.get("xgb"))
+    xgb.fit(x_train, y_train)
+    return rf, xgb
+
+
+def load_tuned_params(chunk_dir: Path) -> dict | None:
+    """Best configuration written by ``tune_chunk_ensemble.py``, if the chunk has been tuned."""
+    path = Path(chunk_dir) / TUNED_PARAMS_FILE
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {"rf": payload.get("rf", {}), "xgb": payload.get("xgb", {})}
+
+
+def load_ensemble_config(chunk_dir: Path) -> dict | None:
+    """Blend weights and member shapes chosen by ``optimize_chunk_ensemble.py``, if any."""
+    path = Path(chunk_dir) / ENSEMBLE_CONFIG_FILE
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {key: payload[key] for key in ("ensemble_weights", "rf", "xgb") if key in payload}
+
+
+def configured_params(params: dict | None, config: dict | None) -> dict:
+    """``params`` with the chosen tree/round counts and depths of an ensemble config applied.
+
+    A forest or booster fitted with ``k`` trees/rounds equals the first ``k`` of a larger
+    fit with the same seed, so this reproduces the pruned members the optimizer scored.
+    """
+    params, config = params or {}, config or {}
+    rf_params, xgb_params = dict(params.get("rf", {})), dict(params.get("xgb", {}))
+    if "rf" in config:
+        rf_params.update(n_estimators=config["rf"]["n_trees"], max_depth=config["rf"]["max_depth"])
+    if "xgb" in config:
+        xgb_params.update(n_estimators=config["xgb"]["rounds"], max_depth=config["xgb"]["max_depth"])
+    return {"rf": rf_params, "xgb": xgb_params}
+
+
+def fit_configured_ensemble(
+    x_train, y_train, params: dict | None = None, config: dict | None = None, n_jobs: int = -1
+) -> tuple[RandomForestClassifier | None, XGBClassifier | None, dict]:
+    """Fit the members an ensemble config keeps, shaped as it chose; returns ``(rf, xgb, weights)``.
+
+    Without a config this is the full ensemble with ``ENSEMBLE_WEIGHTS``. A member whose
+    weight is 0 is not fitted and comes back as ``None``.
+    """
+    config = config or {}
+    weights = config.get("ensemble_weights", ENSEMBLE_WEIGHTS)
+    params = configured_params(params, config)
+    rf = xgb = None
+    if weights.get("rf", 0) > 0:
+        rf = build_rf(n_jobs, params["rf"]).fit(x_train, y_train)
+    if weights.get("xgb", 0) > 0:
+        xgb = build_xgb(y_train, n_jobs, params["xgb"]).fit(x_train, y_train)
+    return rf, xgb, weights
+
+
+def ensemble_probability(
+    rf_prob: np.ndarray | None, xgb_prob: np.ndarray | None, weights: dict = ENSEMBLE_WEIGHTS
+) -> np.ndarray:
+    """Weighted blend of the member probabilities; a ``None`` member is left out."""
+    parts = [(weights[name], prob) for name, prob in (("rf", rf_prob), ("xgb", xgb_prob)) if prob is not None]
+    return sum(weight * prob for weight, prob in parts)
+
+
 def evaluate(y_true: np.ndarray, probs: np.ndarray, threshold: float = 0.5) -> dict:
     preds = (probs >= threshold).astype(int)
     return {
@@ -121,66 +229,55 @@ def main():
         x_train, y_train = train_df[FEATURES], train_df[TARGET]
         x_test, y_test = test_df[FEATURES], test_df[TARGET]
 
-        rf = RandomForestClassifier(
-            n_estimators=300,
-            max_depth=12,
-            min_samples_leaf=50,
-            class_weight="balanced",
-            random_state=42,
-            n_jobs=-1,
-        )
-        rf.fit(x_train, y_train)
-        rf_prob = rf.predict_proba(x_test)[:, 1]
-
-        scale_pos_weight = max((y_train == 0).sum() / max((y_train == 1).sum(), 1), 1.0)
-        xgb = XGBClassifier(
-            n_estimators=400,
-            max_depth=6,
-            learning_rate=0.05,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            scale_pos_weight=scale_pos_weight,
-            eval_metric="logloss",
-            random_state=42,
-            n_jobs=-1,
-        )
-        xgb.fit(x_train, y_train)
-        xgb_prob = xgb.predict_proba(x_test)[:, 1]
-
-        ensemble_prob = 0.5 * rf_prob + 0.5 * xgb_prob
-
         chunk_dir = models_dir / chunk
+        tuned = None if args.ignore_tuned else load_tuned_params(chunk_dir)
+        params = tuned or {}
+        ensemble_config = None if args.ignore_ensemble_config else load_ensemble_config(chunk_dir)
+        rf, xgb, weights = fit_configured_ensemble(x_train, y_train, params=params, config=ensemble_config)
+        members = {name: model for name, model in (("rf", rf), ("xgb", xgb)) if model is not None}
+        test_probs = {name: model.predict_proba(x_test)[:, 1] for name, model in members.items()}
+        ensemble_prob = ensemble_probability(test_probs.get("rf"), test_probs.get("xgb"), weights)
+
         chunk_dir.mkdir(parents=True, exist_ok=True)
-        joblib.dump(rf, chunk_dir / "rf_early_warning.pkl")
-        joblib.dump(xgb, chunk_dir / "xgb_early_warning.pkl")
+        for name in ("rf", "xgb"):
+            member_path = chunk_dir / f"{name}_early_warning.pkl"
+            if name in members:
+                joblib.dump(members[name], member_path)
+            else:
+                member_path.unlink(missing_ok=True)
         joblib.dump(FEATURES, chunk_dir / "feature_list.pkl")
         # Requested deployment artifact names.
-        joblib.dump(
-            {
-                "chunk": chunk,
-                "rf_model": rf,
-                "xgb_model": xgb,
-                "ensemble_weights": {"rf": 0.5, "xgb": 0.5},
-                "features": FEATURES,
-            },
-            Path("models") / f"{chunk}_model.pkl",
-        )
+        bundle = {
+            "chunk": chunk,
+            **{f"{name}_model": model for name, model in members.items()},
+            "ensemble_weights": weights,
+            "features": FEATURES,
+        }
+        if ensemble_config is not None:
+            bundle["ensemble_config"] = ensemble_config
+        joblib.dump(bundle, Path("models") / f"{chunk}_model.pkl")
 
+        effective = configured_params(params, ensemble_config)
         meta = {
             "chunk": chunk,
-            "ensemble_weights": {"rf": 0.5, "xgb": 0.5},
+            "ensemble_weights": weights,
             "features": FEATURES,
+            "params": {
+                "rf": {**RF_PARAMS, **effective["rf"]},
+                "xgb": {**XGB_PARAMS, **effective["xgb"]},
+            },
+            "tuned": tuned is not None,
             "train_rows": int(len(train_df)),
             "test_rows": int(len(test_df)),
         }
+        if ensemble_config is not None:
+            meta["ensemble_config"] = ensemble_config
         (chunk_dir / "ensemble_meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
 
-        rf_metrics = evaluate(y_test.to_numpy(), rf_prob)
-        rf_metrics.update({"chunk": chunk, "model": "rf"})
-        perf_records.append(rf_metrics)
-        xgb_metrics = evaluate(y_test.to_numpy(), xgb_prob)
-        xgb_metrics.update({"chunk": chunk, "model": "xgb"})
-        perf_records.append(xgb_metrics)
+        for name, prob in test_probs.items():
+            member_metrics = evaluate(y_test.to_numpy(), prob)
+            member_metrics.update({"chunk": chunk, "model": name})
+            perf_records.append(member_metrics)
         ens_metrics = evaluate(y_test.to_numpy(), ensemble_prob)
         ens_metrics.update({"chunk": chunk, "model": "ensemble"})
         perf_records.append(ens_metrics)
@@ -203,12 +300,10 @@ def main():
         if "district_name" not in latest.columns:
             latest["district_name"] = latest[latest_group_col].astype(str)
         latest["chunk"] = chunk
-        rf_latest = rf.predict_proba(latest[FEATURES])[:, 1]
-        xgb_latest = xgb.predict_proba(latest[FEATURES])[:, 1]
-        ens_latest = 0.5 * rf_latest + 0.5 * xgb_latest
-        latest["rf_probability"] = rf_latest
-        latest["xgb_probability"] = xgb_latest
-        latest["ensemble_probability"] = ens_latest
+        latest_probs = {name: model.predict_proba(latest[FEATURES])[:, 1] for name, model in members.items()}
+        latest["rf_probability"] = latest_probs.get("rf", np.nan)
+        latest["xgb_probability"] = latest_probs.get("xgb", np.nan)
+        latest["ensemble_probability"] = ensemble_probability(latest_probs.get("rf"), latest_probs.get("xgb"), weights)
         latest["risk_level"] = latest["ensemble_probability"].apply(_risk_level)
         latest_rows.append(latest)
 
@@ -221,7 +316,8 @@ def main():
             for feature in FEATURES
         }
 
-        print(f"Trained chunk={chunk} | train={len(train_df)} test={len(test_df)}")
+        shape = f" | config weights={weights}" if ensemble_config is not None else ""
+        print(f"Trained chunk={chunk} | train={len(train_df)} test={len(test_df)}{shape}")
 
     perf_df = pd.DataFrame(perf_records)
     results_csv = Path(args.results_csv)
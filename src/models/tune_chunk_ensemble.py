@@ -0,0 +1,315 @@
+"""Budgeted hyperparameter search for the chunk ensemble.
+
+RF and XGB configurations are searched independently with successive halving: every
+sampled configuration is scored on the most recent ``1 / eta**k`` of the training rows,
+the best ``1 / eta`` advance to ``eta`` times more rows, and only the finalists see the
+whole training set. Validation is the time-ordered tail of each district's training
+history, so later hours never leak into fitting.
+
+XGBoost trials train with ``xgboost.train`` on a ``QuantileDMatrix`` built once per rung
+and shared by every trial in it (the quantile sketch is the expensive part of dataset
+construction), and stop early on validation AUC-PR. Trials run on a thread pool sized to
+``--cores // --threads_per_trial``; both libraries release the GIL while fitting.
+
+The winners are written to ``<models_dir>/<chunk>/tuned_params.json``, which
+``train_chunk_ensemble.py`` picks up on its next run.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost
+from sklearn.metrics import average_precision_score
+
+try:
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.models.train_chunk_ensemble import (
+        FEATURES,
+        RF_PARAMS,
+        TARGET,
+        TUNED_PARAMS_FILE,
+        XGB_PARAMS,
+        build_rf,
+        split_time_per_district,
+    )
+except ModuleNotFoundError:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common.himalaya_chunks import list_chunks, normalize_chunks
+    from src.models.train_chunk_ensemble import (
+        FEATURES,
+        RF_PARAMS,
+        TARGET,
+        TUNED_PARAMS_FILE,
+        XGB_PARAMS,
+        build_rf,
+        split_time_per_district,
+    )
+
+RF_SPACE = {
+    "n_estimators": [100, 200, 300, 400],
+    "max_depth": [8, 10, 12, 16],
+    "min_samples_leaf": [10, 25, 50, 100],
+    "max_features": ["sqrt", 0.5, 0.8],
+}
+XGB_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": [0.02, 0.05, 0.1, 0.2],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "min_child_weight": [1, 5, 20],
+    "reg_lambda": [1.0, 5.0, 10.0],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Successive-halving search over RF and XGB settings per chunk.")
+    parser.add_argument("--chunks", nargs="+", default=list_chunks())
+    parser.add_argument(
+        "--labeled_pattern",
+        type=str,
+        default="data/processed/labeled_cloudburst_district_{chunk}.csv",
+    )
+    parser.add_argument("--models_dir", type=str, default="models/chunks")
+    parser.add_argument("--trials_csv", type=str, default="results/chunk_tuning_trials.csv")
+    parser.add_argument("--split_ratio", type=float, default=0.8, help="Same train/test split as train_chunk_ensemble.py.")
+    parser.add_argument("--valid_ratio", type=float, default=0.8, help="Fit/validation split inside the training rows.")
+    parser.add_argument("--n_trials", type=int, default=27, help="Configurations sampled per model, defaults included.")
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--max_rounds", type=int, default=1000)
+    parser.add_argument("--early_stopping_rounds", type=int, default=50)
+    parser.add_argument("--max_bin", type=int, default=256)
+    parser.add_argument("--cores", type=int, default=None, help="Core budget for the search (default: all cores).")
+    parser.add_argument("--threads_per_trial", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min_positive", type=int, default=25)
+    return parser.parse_args()
+
+
+def sample_configs(space: dict, defaults: dict, n_trials: int, rng: np.random.Generator) -> list[dict]:
+    """The current defaults plus ``n_trials - 1`` distinct random draws from the grid."""
+    configs = [{key: defaults[key] for key in space if key in defaults}]
+    seen = {json.dumps(configs[0], sort_keys=True)}
+    attempts = 0
+    while len(configs) < n_trials and attempts < n_trials * 20:
+        attempts += 1
+        config = {key: values[rng.integers(len(values))] for key, values in space.items()}
+        config = {key: value.item() if isinstance(value, np.generic) else value for key, value in config.items()}
+        marker = json.dumps(config, sort_keys=True)
+        if marker not in seen:
+            seen.add(marker)
+            configs.append(config)
+    return configs
+
+
+def rung_fractions(rungs: int, eta: int) -> list[float]:
+    return [float(eta) ** -(rungs - 1 - k) for k in range(rungs)]
+
+
+def recent_rows(fit_df: pd.DataFrame, fraction: float) -> pd.DataFrame:
+    if fraction >= 1.0:
+        return fit_df
+    cutoff = fit_df["time"].quantile(1.0 - fraction)
+    return fit_df[fit_df["time"] >= cutoff]
+
+
+def successive_halving(
+    configs: list[dict],
+    fractions: list[float],
+    evaluate,
+    eta: int,
+    workers: int,
+) -> list[dict]:
+    """Run rungs of ``evaluate(config, fraction) -> (score, extra)``; returns one record per trial
+    and rung, best score first within each rung.
+
+    Trial 0 (the current defaults) always advances so the winner is compared with it on the
+    same rows.
+    """
+    alive = list(range(len(configs)))
+    records: list[dict] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for rung, fraction in enumerate(fractions):
+            results = list(pool.map(lambda idx: evaluate(configs[idx], fraction), alive))
+            ranked = sorted(zip(alive, results), key=lambda item: item[1][0], reverse=True)
+            for trial, (score, extra) in ranked:
+                records.append({"trial": trial, "rung": rung, "fraction": fraction, "score": score, **extra})
+            keep = max(1, len(alive) // eta)
+            alive = [trial for trial, _ in ranked[:keep]]
+            if 0 not in alive:
+                alive.append(0)
+    return records
+
+
+class XGBTrials:
+    """Evaluates XGB configurations on per-rung quantized matrices shared across trials."""
+
+    def __init__(self, fit_df: pd.DataFrame, valid_df: pd.DataFrame, args: argparse.Namespace, threads: int) -> None:
+        self.fit_df = fit_df
+        self.valid_df = valid_df
+        self.args = args
+        self.threads = threads
+        self._matrices: dict[float, tuple] = {}
+        self._lock = threading.Lock()
+
+    def matrices(self, fraction: float) -> tuple:
+        # Trials of one rung start together in the pool; the first builds, the rest wait and reuse.
+        with self._lock:
+            if fraction not in self._matrices:
+                self._matrices[fraction] = self._build(fraction)
+            return self._matrices[fraction]
+
+    def _build(self, fraction: float) -> tuple:
+        rows = recent_rows(self.fit_df, fraction)
+        dtrain = xgboost.QuantileDMatrix(
+            rows[FEATURES], label=rows[TARGET], max_bin=self.args.max_bin, nthread=self.threads
+        )
+        dvalid = xgboost.QuantileDMatrix(
+            self.valid_df[FEATURES], label=self.valid_df[TARGET], ref=dtrain, nthread=self.threads
+        )
+        y = rows[TARGET].to_numpy()
+        scale_pos_weight = max((y == 0).sum() / max((y == 1).sum(), 1), 1.0)
+        return dtrain, dvalid, scale_pos_weight
+
+    def __call__(self, config: dict, fraction: float) -> tuple[float, dict]:
+        dtrain, dvalid, scale_pos_weight = self.matrices(fraction)
+        params = {
+            "objective": "binary:logistic",
+            "eval_metric": "aucpr",
+            "tree_method": "hist",
+            "max_bin": self.args.max_bin,
+            "scale_pos_weight": scale_pos_weight,
+            "nthread": self.threads,
+            "seed": self.args.seed,
+            **config,
+        }
+        started = time.perf_counter()
+        booster = xgboost.train(
+            params,
+            dtrain,
+            num_boost_round=self.args.max_rounds,
+            evals=[(dvalid, "valid")],
+            early_stopping_rounds=self.args.early_stopping_rounds,
+            verbose_eval=False,
+        )
+        return float(booster.best_score), {
+            "n_estimators": int(booster.best_iteration) + 1,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+
+
+def rf_trial(fit_df: pd.DataFrame, valid_df: pd.DataFrame, threads: int):
+    def evaluate(config: dict, fraction: float) -> tuple[float, dict]:
+        rows = recent_rows(fit_df, fraction)
+        started = time.perf_counter()
+        model = build_rf(threads, config).fit(rows[FEATURES], rows[TARGET])
+        score = average_precision_score(valid_df[TARGET], model.predict_proba(valid_df[FEATURES])[:, 1])
+        return float(score), {"seconds": round(time.perf_counter() - started, 2)}
+
+    return evaluate
+
+
+def _trial_rows(chunk: str, model: str, configs: list[dict], records: list[dict]) -> list[dict]:
+    return [{"chunk": chunk, "model": model, **record, **configs[record["trial"]]} for record in records]
+
+
+def _best(configs: list[dict], records: list[dict]) -> tuple[dict, dict]:
+    final_rung = max(record["rung"] for record in records)
+    best = max((r for r in records if r["rung"] == final_rung), key=lambda r: r["score"])
+    return configs[best["trial"]], best
+
+
+def _baseline_score(records: list[dict]) -> float | None:
+    scores = [r for r in records if r["trial"] == 0]
+    return max(scores, key=lambda r: r["rung"])["score"] if scores else None
+
+
+def main():
+    args = parse_args()
+    chunks = normalize_chunks(args.chunks)
+    cores = args.cores or os.cpu_count() or 1
+    threads = max(1, min(args.threads_per_trial, cores))
+    workers = max(1, cores // threads)
+    fractions = rung_fractions(args.rungs, args.eta)
+    rng = np.random.default_rng(args.seed)
+    trial_rows: list[dict] = []
+
+    print(f"Core budget {cores}: {workers} parallel trials x {threads} threads; rungs {[round(f, 3) for f in fractions]}")
+    for chunk in chunks:
+        csv_path = Path(args.labeled_pattern.format(chunk=chunk))
+        if not csv_path.exists():
+            print(f"Skipping {chunk}: missing {csv_path}")
+            continue
+
+        df = pd.read_csv(csv_path, parse_dates=["time"]).sort_values("time")
+        train_df, _ = split_time_per_district(df, args.split_ratio)
+        fit_df, valid_df = split_time_per_district(train_df, args.valid_ratio)
+        if int(fit_df[TARGET].sum()) < args.min_positive or int(valid_df[TARGET].sum()) == 0:
+            print(f"Skipping {chunk}: fit positives={int(fit_df[TARGET].sum())} valid positives={int(valid_df[TARGET].sum())}")
+            continue
+
+        started = time.perf_counter()
+        rf_configs = sample_configs(RF_SPACE, RF_PARAMS, args.n_trials, rng)
+        rf_records = successive_halving(rf_configs, fractions, rf_trial(fit_df, valid_df, threads), args.eta, workers)
+        xgb_configs = sample_configs(XGB_SPACE, XGB_PARAMS, args.n_trials, rng)
+        xgb_records = successive_halving(
+            xgb_configs, fractions, XGBTrials(fit_df, valid_df, args, threads), args.eta, workers
+        )
+
+        best_rf, rf_best = _best(rf_configs, rf_records)
+        best_xgb, xgb_best = _best(xgb_configs, xgb_records)
+        payload = {
+            "chunk": chunk,
+            "rf": best_rf,
+            "xgb": {**best_xgb, "n_estimators": xgb_best["n_estimators"], "max_bin": args.max_bin},
+            "validation": {
+                "metric": "average_precision",
+                "rf": rf_best["score"],
+                "xgb": xgb_best["score"],
+                "rf_default": _baseline_score(rf_records),
+                "xgb_default": _baseline_score(xgb_records),
+            },
+            "search": {
+                "n_trials": args.n_trials,
+                "eta": args.eta,
+                "rung_fractions": fractions,
+                "early_stopping_rounds": args.early_stopping_rounds,
+                "fit_rows": int(len(fit_df)),
+                "valid_rows": int(len(valid_df)),
+                "seconds": round(time.perf_counter() - started, 1),
+            },
+            "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+        chunk_dir = Path(args.models_dir) / chunk
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        (chunk_dir / TUNED_PARAMS_FILE).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        trial_rows += _trial_rows(chunk, "rf", rf_configs, rf_records)
+        trial_rows += _trial_rows(chunk, "xgb", xgb_configs, xgb_records)
+
+        print(
+            f"Tuned chunk={chunk} in {payload['search']['seconds']}s | "
+            f"rf AP {rf_best['score']:.4f} (default {payload['validation']['rf_default']:.4f}) | "
+            f"xgb AP {xgb_best['score']:.4f} (default {payload['validation']['xgb_default']:.4f}) "
+            f"at {xgb_best['n_estimators']} rounds"
+        )
+        print("Saved ->", chunk_dir / TUNED_PARAMS_FILE)
+
+    if trial_rows:
+        trials_csv = Path(args.trials_csv)
+        trials_csv.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(trial_rows).to_csv(trials_csv, index=False)
+        print("Saved trials ->", trials_csv)
+
+
+if __name__ == "__main__":
+    main()
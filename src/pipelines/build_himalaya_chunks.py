@@ -4,16 +4,18 @@ import sys
 from pathlib import Path
 
 try:
+    from src.common import profiling
     from src.common.himalaya_chunks import list_chunks, normalize_chunks
 except ModuleNotFoundError:
     sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.common import profiling
     from src.common.himalaya_chunks import list_chunks, normalize_chunks
 
 ROOT = Path(__file__).resolve().parents[2]
 
 
 def run(script: str, *args: str):
-    cmd = [sys.executable, script, *args]
+    cmd = profiling.stage_command(script, *args)
     print("Running:", " ".join(cmd))
     result = subprocess.run(cmd, cwd=ROOT)
     if result.returncode != 0:
@@ -89,6 +91,14 @@ def main():
             *("--monsoon_only",) if args.monsoon_only else (),
         )
 
+    # Event records cover the full labeled history of every chunk built so far, not just this run's.
+    label_files = [f"data/processed/labeled_cloudburst_district_{chunk}.csv" for chunk in list_chunks()]
+    label_files = [path for path in label_files if (ROOT / path).exists()]
+    if label_files:
+        run("src/labels/segment_events.py", "--input_csv", *label_files)
+    else:
+        print("Skipping event segmentation: no labeled district files found.")
+
     run(
         "src/models/train_chunk_ensemble.py",
         "--chunks",
@@ -18,6 +18,12 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build compact latest feature tables per chunk.")
     parser.add_argument("--days", type=int, default=10)
     parser.add_argument("--output_dir", default="data/processed")
+    parser.add_argument(
+        "--input_pattern",
+        default=None,
+        help="Labeled dataset per chunk, e.g. 'data/processed/labeled_{chunk}.csv'. Defaults to the district datasets.",
+    )
+    parser.add_argument("--chunks", nargs="+", default=list(CHUNK_INPUTS), choices=list(CHUNK_INPUTS))
     return parser.parse_args()
 
 
@@ -114,7 +120,10 @@ def main() -> None:
 
     district_lookup = _district_lookup_by_chunk()
 
-    for chunk, input_path in CHUNK_INPUTS.items():
+    for chunk in args.chunks:
+        input_path = Path(args.input_pattern.format(chunk=chunk)) if args.input_pattern else CHUNK_INPUTS[chunk]
+        if not input_path.is_absolute():
+            input_path = ROOT / input_path
         if not input_path.exists():
             raise FileNotFoundError(f"Missing chunk source dataset: {input_path}")
 
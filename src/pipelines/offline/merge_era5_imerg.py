@@ -5,6 +5,12 @@ import subprocess
 import sys
 from pathlib import Path
 
+try:
+    from src.common import profiling
+except ModuleNotFoundError:
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.common import profiling
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Merge processed ERA5 and IMERG files.")
@@ -15,12 +21,11 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
     root = Path(__file__).resolve().parents[3]
-    cmd = [
-        sys.executable,
+    cmd = profiling.stage_command(
         "src/data/imerg/merge_era5_imerg.py",
         "--regions",
         *args.regions,
-    ]
+    )
     result = subprocess.run(cmd, cwd=root, check=False)
     if result.returncode != 0:
         raise SystemExit(result.returncode)
@@ -6,6 +6,12 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    from src.common import profiling
+except ModuleNotFoundError:
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.common import profiling
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Preprocess ERA5 for one region and latest time window.")
@@ -20,8 +26,7 @@ def main() -> None:
     start = (now - timedelta(days=max(1, args.days))).strftime("%Y-%m-%d")
     end = now.strftime("%Y-%m-%d")
 
-    cmd = [
-        sys.executable,
+    cmd = profiling.stage_command(
         "src/data/era5/preprocess_era5.py",
         "--region",
         args.region,
@@ -29,7 +34,7 @@ def main() -> None:
         start,
         "--end",
         end,
-    ]
+    )
     result = subprocess.run(cmd, cwd=Path(__file__).resolve().parents[3], check=False)
     if result.returncode != 0:
         raise SystemExit(result.returncode)
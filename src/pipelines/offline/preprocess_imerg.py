@@ -5,6 +5,12 @@ import subprocess
 import sys
 from pathlib import Path
 
+try:
+    from src.common import profiling
+except ModuleNotFoundError:
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.common import profiling
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Preprocess IMERG and aggregate to hourly.")
@@ -16,18 +22,16 @@ def main() -> None:
     args = parse_args()
     root = Path(__file__).resolve().parents[3]
 
-    preprocess_cmd = [
-        sys.executable,
+    preprocess_cmd = profiling.stage_command(
         "src/data/imerg/preprocess_imerg.py",
         "--region",
         args.region,
-    ]
-    aggregate_cmd = [
-        sys.executable,
+    )
+    aggregate_cmd = profiling.stage_command(
         "src/data/imerg/aggregate_imerg.py",
         "--region",
         args.region,
-    ]
+    )
 
     for cmd in (preprocess_cmd, aggregate_cmd):
         result = subprocess.run(cmd, cwd=root, check=False)
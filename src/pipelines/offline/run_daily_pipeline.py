@@ -6,6 +6,12 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    from src.common import profiling
+except ModuleNotFoundError:
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from src.common import profiling
+
 CHUNKS = ["western", "central", "eastern"]
 DISTRICTS_FILE = "data/processed/himalaya_districts_with_chunks.geojson"
 
@@ -14,11 +20,16 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run daily offline batch updates for latest features.")
     parser.add_argument("--days", type=int, default=10)
     parser.add_argument("--skip_download", action="store_true")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile every stage into results/profiles/<run_id>/ (same as CLOUDBURST_PROFILE=1).",
+    )
     return parser.parse_args()
 
 
-def run(root: Path, *args: str) -> None:
-    cmd = [sys.executable, *args]
+def run(root: Path, script: str, *args: str, profile: bool = True) -> None:
+    cmd = profiling.stage_command(script, *args, profile=profile)
     result = subprocess.run(cmd, cwd=root, check=False)
     if result.returncode != 0:
         raise RuntimeError(f"Failed: {' '.join(cmd)}")
@@ -26,6 +37,8 @@ def run(root: Path, *args: str) -> None:
 
 def main() -> None:
     args = parse_args()
+    if args.profile or profiling.profiling_enabled():
+        print("Profiling run:", profiling.enable())
     root = Path(__file__).resolve().parents[3]
     now = datetime.utcnow()
     start = (now - timedelta(days=max(1, args.days))).strftime("%Y-%m-%d")
@@ -38,8 +51,17 @@ def main() -> None:
         run(root, "src/pipelines/offline/download_imerg.py", "--days", str(args.days))
 
     for chunk in CHUNKS:
-        run(root, "src/pipelines/offline/preprocess_era5.py", "--region", chunk, "--days", str(args.days))
-        run(root, "src/pipelines/offline/preprocess_imerg.py", "--region", chunk)
+        # Pass-through wrappers: the data/ stages they start are profiled themselves.
+        run(
+            root,
+            "src/pipelines/offline/preprocess_era5.py",
+            "--region",
+            chunk,
+            "--days",
+            str(args.days),
+            profile=False,
+        )
+        run(root, "src/pipelines/offline/preprocess_imerg.py", "--region", chunk, profile=False)
         run(
             root,
             "src/data/district/build_district_dataset.py",
@@ -56,6 +78,8 @@ def main() -> None:
         )
 
     run(root, "src/pipelines/offline/generate_latest_features.py", "--days", str(args.days))
+    if profiling.profiling_enabled():
+        profiling.print_summary()
 
 
 if __name__ == "__main__":